@@ -0,0 +1,98 @@
+"""
+Microbenchmark do custo de montar agentes, tarefas e crews do CodeWise, sem chamar o LLM.
+
+Compara o fluxo antigo do CodewiseRunner (um Codewise novo e Task/Crew recriados a cada modo)
+com o atual (instância reaproveitada e crews memorizadas).
+
+Uso (na raiz do repositório):
+    python benchmarks/bench_construcao_crew.py --repeticoes 20 > bench_output.txt
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#nenhuma chamada sai para a rede; as chaves só precisam existir para os objetos serem validados
+os.environ.setdefault("AI_PROVIDER", "GEMINI")
+os.environ.setdefault("AI_MODEL", "gemini-2.0-flash")
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("CREWAI_TELEMETRY_OPT_OUT", "1")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from crewai import Task, Crew, Process
+from codewise_lib.crew import Codewise
+
+MODOS = ("titulo", "descricao", "lint", "analise")
+
+
+def montar_antes(modo):
+    """Reproduz a montagem feita pelo runner antes da memorização: tudo recriado a cada execução."""
+    instancia = Codewise()
+    if modo in ("titulo", "descricao"):
+        agente = instancia.summary_specialist()
+        Crew(agents=[agente], tasks=[Task(description="contexto", expected_output="saida", agent=agente)])
+    elif modo == "lint":
+        agente = instancia.quality_consultant()
+        Crew(agents=[agente], tasks=[Task(description="contexto", expected_output="saida", agent=agente)])
+    else:
+        #a crew principal de então: as quatro análises e a mentoria numa crew só
+        tarefas = [instancia.task_estrutura(), instancia.task_heuristicas(), instancia.task_solid(), instancia.task_padroes(), instancia.task_mentoring()]
+        Crew(agents=[t.agent for t in tarefas], tasks=tarefas, process=Process.sequential)
+        agente = instancia.summary_specialist()
+        Crew(agents=[agente], tasks=[Task(description="resumo", expected_output="saida", agent=agente, context=tarefas[:4])])
+        instancia.code_review_crew()
+
+
+def montar_depois(instancia, modo):
+    """Montagem atual: a instância é do runner e as crews ficam memorizadas nela."""
+    if modo == "titulo":
+        instancia.titulo_crew()
+    elif modo == "descricao":
+        instancia.descricao_crew()
+    elif modo == "lint":
+        instancia.lint_crew()
+    else:
+        instancia.analise_crew()
+        instancia.resumo_crew()
+        instancia.mentoria_crew()
+        instancia.code_review_crew()
+
+
+def medir(funcao, repeticoes):
+    """
+    Returns:
+        tuple: (mediana, máximo) em milissegundos
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), max(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo de construção de agentes, tarefas e crews do CodeWise.")
+    parser.add_argument("--repeticoes", type=int, default=20, help="Execuções medidas por modo (padrão: 20).")
+    args = parser.parse_args()
+
+    #aquece imports e caches internos do crewai antes de medir
+    montar_antes("analise")
+    instancia = Codewise()
+
+    print(f"{'modo':<10} {'antes (ms)':>12} {'depois (ms)':>12} {'ganho':>8}")
+    for modo in MODOS:
+        antes, _ = medir(lambda: montar_antes(modo), args.repeticoes)
+        depois, _ = medir(lambda: montar_depois(instancia, modo), args.repeticoes)
+        print(f"{modo:<10} {antes:>12.2f} {depois:>12.3f} {antes / max(depois, 1e-6):>7.0f}x")
+
+    primeira, _ = medir(lambda: montar_depois(Codewise(), "analise"), max(1, args.repeticoes // 4))
+    print(f"\nPrimeira execução em instância nova (analise): {primeira:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import unicodedata
+from .entradagit import obter_dir_codewise
+from .indice_codigo import listar_arvore
+
+# ===================================================================
+# ACHADOS DA ANÁLISE TÉCNICA: ITENS ESTRUTURADOS E ANÁLISE INCREMENTAL
+# ===================================================================
+
+#a tarefa de resumo fecha a resposta com esta seção, uma linha por achado:
+#'- [alta|media|baixa] (categoria) caminho/do/arquivo: mensagem'
+TITULO_ACHADOS = "### Achados"
+SEVERIDADES = ("alta", "media", "baixa")
+
+_PADRAO_TITULO = re.compile(r"^\s*(?:#+\s*|\*\*)achados(?:\*\*)?\s*:?\s*$", re.IGNORECASE)
+_PADRAO_ACHADO = re.compile(r"^\s*[-*]\s*\[(alta|m[eé]dia|baixa)\]\s*\(([^)]+)\)\s*([^:]+?)\s*:\s*(.+?)\s*$", re.IGNORECASE)
+_PADRAO_NENHUM = re.compile(r"^\s*[-*]\s*nenhum\.?\s*$", re.IGNORECASE)
+
+
+def _normalizar(texto: str) -> str:
+    #sem acentos, pontuação e caixa: 'Persistência.' e 'persistencia' geram a mesma chave
+    sem_acentos = "".join(c for c in unicodedata.normalize("NFKD", texto.lower()) if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", sem_acentos).split())
+
+
+def criar_achado(arquivo: str, categoria: str, severidade: str, mensagem: str) -> dict:
+    """
+    Args:
+        arquivo: Caminho relativo à raiz ou 'geral'
+        categoria: Categoria do achado (ex: 'solid')
+        severidade: 'alta', 'media' ou 'baixa'
+        mensagem: Texto do achado
+
+    Returns:
+        dict: {"chave", "arquivo", "categoria", "severidade", "mensagem"}; a chave é o hash
+            dos campos com a mensagem normalizada, então acentos, pontuação e caixa não a alteram
+    """
+    severidade = severidade.lower().replace("é", "e")
+    categoria = _normalizar(categoria)
+    base = f"{arquivo}|{categoria}|{severidade}|{_normalizar(mensagem)}"
+    return {
+        "chave": hashlib.sha256(base.encode("utf-8")).hexdigest()[:16],
+        "arquivo": arquivo,
+        "categoria": categoria,
+        "severidade": severidade,
+        "mensagem": mensagem.strip(),
+    }
+
+
+def separar_achados(texto: str) -> tuple:
+    """
+    Separa o resumo executivo da seção de achados.
+
+    Args:
+        texto: Saída do modo 'analise'
+
+    Returns:
+        tuple: (resumo, lista de achados), com None no lugar da lista se o texto não trouxer a seção
+            (tarefa personalizada ou resposta fora do formato)
+    """
+    resumo, achados, encontrou = [], [], False
+    for linha in (texto or "").splitlines():
+        if _PADRAO_TITULO.match(linha) or _PADRAO_NENHUM.match(linha):
+            encontrou = True
+            continue
+        match = _PADRAO_ACHADO.match(linha)
+        if match:
+            encontrou = True
+            severidade, categoria, arquivo, mensagem = match.groups()
+            arquivo = arquivo.strip().strip("'\"")
+            achados.append(criar_achado(arquivo, categoria, severidade, mensagem))
+            continue
+        resumo.append(linha)
+    if not encontrou:
+        return (texto or "").strip(), None
+    #a mesma linha repetida pelo LLM vira um só achado
+    unicos = list({a["chave"]: a for a in achados}.values())
+    return "\n".join(resumo).strip(), unicos
+
+
+def formatar_achado(achado: dict) -> str:
+    return f"- [{achado['severidade']}] ({achado['categoria']}) {achado['arquivo']}: {achado['mensagem']}"
+
+
+def formatar_achados(achados: list) -> str:
+    """
+    Returns:
+        str: Seção de achados no formato lido por 'separar_achados', da maior severidade para a menor
+    """
+    ordenados = sorted(achados, key=lambda a: (SEVERIDADES.index(a["severidade"]) if a["severidade"] in SEVERIDADES else len(SEVERIDADES), a["arquivo"]))
+    linhas = [formatar_achado(a) for a in ordenados] or ["- nenhum"]
+    return TITULO_ACHADOS + "\n" + "\n".join(linhas)
+
+
+def diferenca_achados(anteriores: list, atuais: list) -> tuple:
+    """
+    Compara dois conjuntos de achados pela chave.
+
+    Returns:
+        tuple: (novos, resolvidos, mantidos)
+    """
+    chaves_anteriores = {a["chave"] for a in anteriores}
+    chaves_atuais = {a["chave"] for a in atuais}
+    novos = [a for a in atuais if a["chave"] not in chaves_anteriores]
+    resolvidos = [a for a in anteriores if a["chave"] not in chaves_atuais]
+    mantidos = [a for a in atuais if a["chave"] in chaves_anteriores]
+    return novos, resolvidos, mantidos
+
+
+# ===================================================================
+# ÚLTIMA ANÁLISE DE CADA BRANCH (.git/codewise/achados)
+# ===================================================================
+
+def _caminho_analise_branch(repo_path, branch):
+    """
+    Returns:
+        str ou None: Caminho do estado da branch, None se não for um repositório Git
+    """
+    dir_codewise = obter_dir_codewise(repo_path)
+    if not dir_codewise:
+        return None
+    dir_achados = os.path.join(dir_codewise, "achados")
+    os.makedirs(dir_achados, exist_ok=True)
+    #o hash evita colisão entre nomes que só diferem nos caracteres trocados
+    legivel = re.sub(r"[^A-Za-z0-9._-]", "_", branch)
+    return os.path.join(dir_achados, f"{legivel}-{hashlib.sha256(branch.encode('utf-8')).hexdigest()[:8]}.json")
+
+
+def carregar_analise_branch(repo_path, branch) -> dict:
+    """
+    Returns:
+        dict: Última análise da branch ({"head", "blobs", "resumo", "achados"}), vazio se não houver
+    """
+    caminho = _caminho_analise_branch(repo_path, branch)
+    if not caminho:
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def salvar_analise_branch(repo_path, branch, analise) -> None:
+    """
+    Grava a análise da branch de forma atômica; o pre-push e o pré-cálculo podem gravar ao mesmo tempo.
+    """
+    caminho = _caminho_analise_branch(repo_path, branch)
+    if not caminho:
+        return
+    temp = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(analise, f, ensure_ascii=False, indent=2)
+        os.replace(temp, caminho)
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar os achados da análise: {e}", file=sys.stderr)
+
+
+def analise_incremental_ativa() -> bool:
+    """
+    Returns:
+        bool: False se CODEWISE_ANALISE_INCREMENTAL=0 no .env
+    """
+    return os.getenv("CODEWISE_ANALISE_INCREMENTAL", "1") != "0"
+
+
+def blobs_alterados(repo_path, revisao, caminhos: list) -> dict:
+    """
+    Returns:
+        dict: {caminho: sha do blob na revisão ou None se o arquivo não existir nela}
+    """
+    arvore = listar_arvore(repo_path, revisao)
+    return {caminho: (arvore.get(caminho) or (None,))[0] for caminho in caminhos}
+
+
+def arquivos_inalterados(anterior: dict, blobs: dict) -> list:
+    """
+    Arquivos cujo conteúdo é o mesmo da última análise da branch: os achados deles continuam
+    valendo e o arquivo não precisa ir de novo ao LLM.
+
+    Args:
+        anterior: Retorno de 'carregar_analise_branch'
+        blobs: Retorno de 'blobs_alterados' para a revisão atual
+
+    Returns:
+        list: Caminhos inalterados, na ordem de 'blobs'
+    """
+    blobs_anteriores = anterior.get("blobs") or {}
+    return [c for c, blob in blobs.items() if c in blobs_anteriores and blobs_anteriores[c] == blob]
+
+
+def combinar_achados(novos: list, anterior: dict, reanalisados: list) -> list:
+    """
+    Junta os achados gerados agora com os da análise anterior da branch. O intervalo do pre-push
+    só traz os arquivos tocados desde o último push, então os achados dos demais arquivos continuam
+    valendo: só o que foi reanalisado pode ter achados resolvidos. Para um arquivo já analisado e
+    não reanalisado vale sempre o achado anterior, mesmo que o LLM tenha repetido outro texto.
+
+    Args:
+        novos: Achados da resposta atual do LLM
+        anterior: Retorno de 'carregar_analise_branch'
+        reanalisados: Caminhos enviados ao LLM nesta execução
+
+    Returns:
+        list: Achados da revisão atual
+    """
+    reanalisados = set(reanalisados)
+    #achados 'geral' não têm arquivo: são refeitos a cada análise
+    mantidos = [a for a in anterior.get("achados") or [] if a["arquivo"] != "geral" and a["arquivo"] not in reanalisados]
+    ja_analisados = set(anterior.get("blobs") or {}) | {a["arquivo"] for a in mantidos}
+    gerados = [a for a in novos if a["arquivo"] in reanalisados or a["arquivo"] not in ja_analisados]
+    return list({a["chave"]: a for a in mantidos + gerados}.values())
+
+
+def anotar_arquivos_mantidos(texto: str, inalterados: list) -> str:
+    """
+    Returns:
+        str: Contexto da análise com a lista dos arquivos já analisados que ficaram de fora
+    """
+    return (
+        f"{texto}\n\n{'='*80}\n"
+        "Arquivos também alterados no PR, mas sem mudança desde a análise anterior (achados mantidos; não reanalise):\n"
+        + "\n".join(f"  {c}" for c in inalterados)
+    )
@@ -0,0 +1,202 @@
+import os
+import sys
+import math
+import time
+import sqlite3
+import hashlib
+from array import array
+from contextlib import contextmanager
+from typing import Any
+from pydantic import PrivateAttr
+from crewai_tools import WebsiteSearchTool
+from crewai_tools.tools.rag.rag_tool import Adapter
+from .cache_usuario import obter_dir_cache_usuario
+
+# ===================================================================
+# BASE VETORIAL PERSISTENTE DAS PÁGINAS BUSCADAS PELA CREW LGPD
+# ===================================================================
+
+#páginas buscadas há menos que isso não são baixadas de novo
+TTL_PADRAO_PAGINAS_DIAS = 30
+MODELO_EMBEDDING = "text-embedding-3-small"
+ARQUIVO_BASE = "paginas.sqlite3"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS paginas (url TEXT PRIMARY KEY, hash_conteudo TEXT NOT NULL, buscada_em REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS trechos (url TEXT NOT NULL, indice INTEGER NOT NULL, hash_trecho TEXT NOT NULL, conteudo TEXT NOT NULL, PRIMARY KEY (url, indice));
+CREATE TABLE IF NOT EXISTS embeddings (modelo TEXT NOT NULL, hash_texto TEXT NOT NULL, vetor BLOB NOT NULL, PRIMARY KEY (modelo, hash_texto));
+"""
+
+
+def _hash(texto: str) -> str:
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _pontuacao(a, b) -> float:
+    """
+    Returns:
+        float: Similaridade de cosseno levada para [0, 1], na mesma escala do cliente Chroma do CrewAI
+    """
+    produto = sum(x * y for x, y in zip(a, b))
+    normas = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return 0.5 + 0.5 * (produto / normas) if normas else 0.0
+
+
+def pagina_expirada(buscada_em: float) -> bool:
+    """
+    Verifica se a cópia local da página passou da validade (CODEWISE_PAGINAS_TTL_DIAS no .env).
+
+    Args:
+        buscada_em: Momento (epoch) da última busca da página
+
+    Returns:
+        bool: True se a página deve ser buscada de novo
+    """
+    try:
+        ttl_dias = float(os.getenv("CODEWISE_PAGINAS_TTL_DIAS", TTL_PADRAO_PAGINAS_DIAS))
+    except ValueError:
+        #valor inválido no .env não derruba a busca
+        ttl_dias = TTL_PADRAO_PAGINAS_DIAS
+    return (time.time() - buscada_em) > ttl_dias * 86400
+
+
+class AdaptadorPaginasPersistente(Adapter):
+    """
+    Adapter do RagTool que guarda páginas, trechos e embeddings em SQLite no cache do usuário.
+    A página é identificada pela URL e pelo hash do conteúdo; embeddings, pelo modelo e pelo
+    hash do texto, então trechos iguais nunca são enviados de novo ao provedor de embedding.
+    """
+    caminho_base: str = ""
+    modelo_embedding: str = MODELO_EMBEDDING
+    similarity_threshold: float = 0.6
+    limit: int = 5
+    _urls_sessao: list = PrivateAttr(default_factory=list)
+    _funcao_embedding: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        if not self.caminho_base:
+            self.caminho_base = os.path.join(obter_dir_cache_usuario("rag"), ARQUIVO_BASE)
+        with self._conectar() as conexao:
+            conexao.executescript(_ESQUEMA)
+
+    @contextmanager
+    def _conectar(self):
+        #várias crews (pre-push, pré-cálculo, servidor) podem usar a mesma base ao mesmo tempo
+        conexao = sqlite3.connect(self.caminho_base, timeout=30)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def _embeddings(self, conexao, textos: list) -> list:
+        """
+        Retorna os vetores dos textos, chamando o provedor só para os que ainda não estão na base.
+        """
+        hashes = [_hash(t) for t in textos]
+        vetores = {}
+        for hash_texto in set(hashes):
+            linha = conexao.execute(
+                "SELECT vetor FROM embeddings WHERE modelo = ? AND hash_texto = ?", (self.modelo_embedding, hash_texto)
+            ).fetchone()
+            if linha:
+                vetores[hash_texto] = array("f", linha[0])
+
+        faltando = [(h, t) for h, t in dict(zip(hashes, textos)).items() if h not in vetores]
+        if faltando:
+            if self._funcao_embedding is None:
+                from chromadb.utils.embedding_functions.openai_embedding_function import OpenAIEmbeddingFunction
+                self._funcao_embedding = OpenAIEmbeddingFunction(api_key=os.getenv("OPENAI_API_KEY"), model_name=self.modelo_embedding)
+            novos = self._funcao_embedding([t for _, t in faltando])
+            for (hash_texto, _), vetor in zip(faltando, novos):
+                vetores[hash_texto] = array("f", [float(x) for x in vetor])
+                conexao.execute(
+                    "INSERT OR REPLACE INTO embeddings (modelo, hash_texto, vetor) VALUES (?, ?, ?)",
+                    (self.modelo_embedding, hash_texto, vetores[hash_texto].tobytes()),
+                )
+        return [vetores[h] for h in hashes]
+
+    def add(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Registra as páginas para a busca. Dentro da validade a cópia local é usada sem rede; depois
+        dela a página é baixada de novo e só é re-embedada se o conteúdo mudou. Sem rede, a cópia
+        local é usada mesmo vencida.
+        """
+        from crewai_tools.rag.data_types import DataType
+        from crewai_tools.rag.source_content import SourceContent
+
+        data_type = kwargs.get("data_type") or DataType.WEBSITE
+        with self._conectar() as conexao:
+            for url in map(str, args):
+                if url not in self._urls_sessao:
+                    self._urls_sessao.append(url)
+                salva = conexao.execute("SELECT hash_conteudo, buscada_em FROM paginas WHERE url = ?", (url,)).fetchone()
+                if salva and not pagina_expirada(salva[1]):
+                    continue
+
+                try:
+                    resultado = data_type.get_loader().load(SourceContent(url))
+                except Exception as e:
+                    if salva:
+                        print(f"⚠️ Não foi possível atualizar '{url}' ({e}); usando a cópia local.", file=sys.stderr)
+                        continue
+                    raise
+
+                hash_conteudo = _hash(resultado.content)
+                if salva and salva[0] == hash_conteudo:
+                    conexao.execute("UPDATE paginas SET buscada_em = ? WHERE url = ?", (time.time(), url))
+                    continue
+
+                trechos = data_type.get_chunker().chunk(resultado.content)
+                if trechos:
+                    self._embeddings(conexao, trechos)
+                conexao.execute("DELETE FROM trechos WHERE url = ?", (url,))
+                conexao.executemany(
+                    "INSERT INTO trechos (url, indice, hash_trecho, conteudo) VALUES (?, ?, ?, ?)",
+                    [(url, i, _hash(t), t) for i, t in enumerate(trechos)],
+                )
+                conexao.execute(
+                    "INSERT OR REPLACE INTO paginas (url, hash_conteudo, buscada_em) VALUES (?, ?, ?)",
+                    (url, hash_conteudo, time.time()),
+                )
+                print(f"🌐 Página '{url}' indexada ({len(trechos)} trecho(s)).", file=sys.stderr)
+
+    def query(self, question: str, similarity_threshold: float | None = None, limit: int | None = None) -> str:
+        """
+        Busca os trechos mais parecidos com a pergunta nas páginas registradas nesta sessão
+        (ou em todas, se nenhuma foi registrada).
+
+        Returns:
+            str: Trechos encontrados separados por linha em branco
+        """
+        limiar = similarity_threshold if similarity_threshold is not None else self.similarity_threshold
+        quantidade = limit if limit is not None else self.limit
+        with self._conectar() as conexao:
+            if self._urls_sessao:
+                marcadores = ",".join("?" * len(self._urls_sessao))
+                linhas = conexao.execute(
+                    f"SELECT t.conteudo, e.vetor FROM trechos t JOIN embeddings e ON e.hash_texto = t.hash_trecho AND e.modelo = ? WHERE t.url IN ({marcadores})",
+                    [self.modelo_embedding] + self._urls_sessao,
+                ).fetchall()
+            else:
+                linhas = conexao.execute(
+                    "SELECT t.conteudo, e.vetor FROM trechos t JOIN embeddings e ON e.hash_texto = t.hash_trecho AND e.modelo = ?",
+                    (self.modelo_embedding,),
+                ).fetchall()
+            if not linhas:
+                return "No relevant content found."
+            #a pergunta também fica em cache: repetir a verificação não chama o provedor de embedding
+            vetor_pergunta = self._embeddings(conexao, [question])[0]
+
+        pontuados = sorted(((_pontuacao(vetor_pergunta, array("f", vetor)), conteudo) for conteudo, vetor in linhas), reverse=True)
+        conteudos = [conteudo for nota, conteudo in pontuados[:quantidade] if nota >= limiar]
+        return "\n\n".join(conteudos) if conteudos else "No relevant content found."
+
+
+def criar_busca_site() -> WebsiteSearchTool:
+    """
+    Returns:
+        WebsiteSearchTool: Ferramenta de busca em sites com páginas e embeddings persistidos
+            em '~/.cache/codewise/rag/', compartilhados entre provedores, modelos e repositórios
+    """
+    return WebsiteSearchTool(adapter=AdaptadorPaginasPersistente())
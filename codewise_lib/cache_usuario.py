@@ -0,0 +1,20 @@
+import os
+
+
+def obter_dir_cache_usuario(*partes: str) -> str:
+    """
+    Retorna (e cria) um diretório dentro do cache do usuário do CodeWise, compartilhado entre repositórios.
+    Usa CODEWISE_CACHE_DIR se definido, senão '$XDG_CACHE_HOME/codewise' ou '~/.cache/codewise'.
+    
+    Args:
+        partes: Subdiretórios dentro do cache (ex: 'lgpd', 'llm')
+        
+    Returns:
+        str: Caminho absoluto do diretório
+    """
+    base = os.getenv("CODEWISE_CACHE_DIR")
+    if not base:
+        base = os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "codewise")
+    caminho = os.path.join(base, *partes)
+    os.makedirs(caminho, exist_ok=True)
+    return caminho
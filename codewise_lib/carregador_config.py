@@ -0,0 +1,202 @@
+import os
+import re
+import sys
+import pickle
+import hashlib
+import yaml
+from .cache_usuario import obter_dir_cache_usuario
+
+# ===================================================================
+# CARREGADOR DE CONFIGURAÇÃO (agents.yaml / tasks.yaml) VALIDADO E EM CACHE
+# ===================================================================
+
+#muda quando o formato do bundle ou as regras de validação mudam, invalidando os compilados antigos
+VERSAO_BUNDLE = 2
+DIR_CONFIG_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+DIR_CONFIG_REPO = ".codewise"
+ARQUIVOS_CONFIG = {"agentes": "agents.yaml", "tarefas": "tasks.yaml"}
+
+CAMPOS_AGENTE = ("role", "goal", "backstory")
+CAMPOS_TAREFA = ("description", "expected_output")
+
+#tarefas usadas pelo Codewise e os placeholders que cada uma recebe na execução
+PLACEHOLDERS_TAREFAS = {
+    "analise_estrutura": {"input"},
+    "analise_heuristicas": {"input"},
+    "analise_solid": {"input"},
+    "padroes_projeto": {"input"},
+    "mentoring_task": set(),
+    "policy_analytics": {"IA_PROVIDER", "IA_MODEL"},
+    "lgpd_judging": set(),
+    "code_review_scoring": {"input"},
+    "pr_titulo": {"input"},
+    "pr_descricao": {"input"},
+    "resumo_executivo": set(),
+    "lint_rapido": {"input"},
+}
+
+#placeholders preenchidos na execução mas que um override do repositório pode deixar de usar
+PLACEHOLDERS_OPCIONAIS = {
+    "analise_estrutura": {"estrutura"},
+}
+
+AGENTES_USADOS = (
+    "senior_architect", "senior_analytics", "quality_consultant", "quality_control_manager",
+    "summary_specialist", "code_mentor", "dataCollect_policy_analytics", "lgpd_judge", "code_reviewer",
+)
+
+#mesmo padrão de variável que o crewai interpola; chaves de JSON ({"a": 1}) não casam
+_PADRAO_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_\-]*)\}")
+
+_bundles_em_memoria = {}
+
+
+class ErroConfiguracao(Exception):
+    """Configuração de agentes/tarefas ausente, malformada ou com placeholders inválidos."""
+
+
+def extrair_placeholders(texto) -> set:
+    """
+    Args:
+        texto: Descrição ou saída esperada de uma tarefa
+
+    Returns:
+        set: Nomes dos placeholders '{nome}' presentes no texto
+    """
+    return set(_PADRAO_PLACEHOLDER.findall(texto or ""))
+
+
+def validar_config(agentes, tarefas) -> list:
+    """
+    Valida a configuração mesclada de agentes e tarefas.
+
+    Args:
+        agentes: Conteúdo de agents.yaml (com overrides aplicados)
+        tarefas: Conteúdo de tasks.yaml (com overrides aplicados)
+
+    Returns:
+        list: Mensagens de erro; vazia se a configuração for válida
+    """
+    erros = []
+    for nome in AGENTES_USADOS:
+        cfg = agentes.get(nome)
+        if not isinstance(cfg, dict):
+            erros.append(f"agents.yaml: agente '{nome}' ausente.")
+            continue
+        for campo in CAMPOS_AGENTE:
+            if not cfg.get(campo):
+                erros.append(f"agents.yaml: agente '{nome}' sem o campo '{campo}'.")
+
+    for nome, esperados in PLACEHOLDERS_TAREFAS.items():
+        cfg = tarefas.get(nome)
+        if not isinstance(cfg, dict):
+            erros.append(f"tasks.yaml: tarefa '{nome}' ausente.")
+            continue
+        for campo in CAMPOS_TAREFA:
+            if not cfg.get(campo):
+                erros.append(f"tasks.yaml: tarefa '{nome}' sem o campo '{campo}'.")
+        encontrados = extrair_placeholders(cfg.get("description")) | extrair_placeholders(cfg.get("expected_output"))
+        for faltando in sorted(esperados - encontrados):
+            erros.append(f"tasks.yaml: tarefa '{nome}' não usa o placeholder obrigatório '{{{faltando}}}'.")
+        for desconhecido in sorted(encontrados - esperados - PLACEHOLDERS_OPCIONAIS.get(nome, set())):
+            erros.append(f"tasks.yaml: tarefa '{nome}' usa o placeholder '{{{desconhecido}}}', que não é preenchido na execução.")
+        if cfg.get("agent") and cfg["agent"] not in agentes:
+            erros.append(f"tasks.yaml: tarefa '{nome}' aponta para o agente inexistente '{cfg['agent']}'.")
+    return erros
+
+
+def _arquivos_fonte(caminho_repo):
+    """
+    Returns:
+        list: Pares (tipo, caminho) dos arquivos existentes, padrão primeiro e overrides do repositório depois
+    """
+    fontes = [(tipo, os.path.join(DIR_CONFIG_PADRAO, arquivo)) for tipo, arquivo in ARQUIVOS_CONFIG.items()]
+    if caminho_repo:
+        for tipo, arquivo in ARQUIVOS_CONFIG.items():
+            caminho = os.path.join(caminho_repo, DIR_CONFIG_REPO, arquivo)
+            if os.path.isfile(caminho):
+                fontes.append((tipo, caminho))
+    return fontes
+
+
+def _chave_bundle(fontes) -> str:
+    """
+    Calcula a chave do bundle compilado a partir de caminho, mtime e tamanho de cada fonte.
+
+    Returns:
+        str: Hash que identifica o bundle
+    """
+    h = hashlib.sha256(f"{VERSAO_BUNDLE}|{sys.version_info[:2]}".encode("utf-8"))
+    for tipo, caminho in fontes:
+        stat = os.stat(caminho)
+        h.update(f"|{tipo}|{os.path.abspath(caminho)}|{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def _compilar(fontes) -> dict:
+    """
+    Lê os YAMLs, aplica os overrides do repositório entrada a entrada e valida o resultado.
+
+    Returns:
+        dict: {"agentes": dict, "tarefas": dict}
+    """
+    bundle = {"agentes": {}, "tarefas": {}}
+    for tipo, caminho in fontes:
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                conteudo = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise ErroConfiguracao(f"YAML inválido em '{caminho}': {e}") from e
+        if not isinstance(conteudo, dict):
+            raise ErroConfiguracao(f"'{caminho}' deve conter um mapeamento de nomes para configurações.")
+        for nome, cfg in conteudo.items():
+            base = bundle[tipo].get(nome)
+            #o override pode trocar só alguns campos (ex: apenas a 'description' de uma tarefa)
+            if isinstance(base, dict) and isinstance(cfg, dict):
+                bundle[tipo][nome] = {**base, **cfg}
+            else:
+                bundle[tipo][nome] = cfg
+
+    erros = validar_config(bundle["agentes"], bundle["tarefas"])
+    if erros:
+        raise ErroConfiguracao("Configuração do CodeWise inválida:\n  - " + "\n  - ".join(erros))
+    return bundle
+
+
+def carregar_config(caminho_repo=None) -> dict:
+    """
+    Retorna a configuração de agentes e tarefas validada, com os overrides de '<repo>/.codewise/' aplicados.
+    O resultado compilado fica em memória e em '~/.cache/codewise/config/', identificado pelo
+    mtime/tamanho das fontes; os YAMLs só são lidos e validados de novo quando algum deles muda.
+
+    Args:
+        caminho_repo: Repositório cujos overrides devem ser aplicados (opcional)
+
+    Returns:
+        dict: {"agentes": dict, "tarefas": dict}; não deve ser alterado por quem chama
+    """
+    fontes = _arquivos_fonte(caminho_repo)
+    try:
+        chave = _chave_bundle(fontes)
+    except FileNotFoundError as e:
+        raise ErroConfiguracao(f"Arquivo de configuração não encontrado: {e}") from e
+
+    if chave in _bundles_em_memoria:
+        return _bundles_em_memoria[chave]
+
+    caminho_compilado = os.path.join(obter_dir_cache_usuario("config"), f"{chave}.pickle")
+    try:
+        with open(caminho_compilado, "rb") as f:
+            bundle = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        bundle = _compilar(fontes)
+        temp = f"{caminho_compilado}.{os.getpid()}.tmp"
+        try:
+            with open(temp, "wb") as f:
+                pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, caminho_compilado)
+        except OSError as e:
+            print(f"⚠️ Não foi possível gravar a configuração compilada: {e}", file=sys.stderr)
+
+    _bundles_em_memoria[chave] = bundle
+    return bundle
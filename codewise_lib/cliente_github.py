@@ -0,0 +1,421 @@
+import os
+import sys
+import re
+import json
+import shutil
+import subprocess
+import requests
+from requests.adapters import HTTPAdapter
+
+# ===================================================================
+# CLIENTE GITHUB: UMA SESSÃO HTTP (API) OU O 'gh' COMO ALTERNATIVA
+# ===================================================================
+
+URL_API_PADRAO = "https://api.github.com"
+TIMEOUT_API_S = 20
+
+CONSULTA_REPOSITORIO_E_PR = """
+query($dono: String!, $nome: String!, $branch: String!) {
+  repository(owner: $dono, name: $nome) {
+    defaultBranchRef { name }
+    pullRequests(headRefName: $branch, states: OPEN, first: 20) {
+      nodes { id number body url headRepositoryOwner { login } }
+    }
+  }
+}
+"""
+
+#só usada quando o identificador do comentário do CodeWise não está salvo localmente
+CONSULTA_COMENTARIOS_PR = """
+query($dono: String!, $nome: String!, $numero: Int!) {
+  repository(owner: $dono, name: $nome) {
+    pullRequest(number: $numero) {
+      comments(last: 50) { nodes { id viewerDidAuthor body } }
+    }
+  }
+}
+"""
+
+MUTACAO_EDITAR_COMENTARIO = """
+mutation($id: ID!, $comentario: String!) {
+  updateIssueComment(input: {id: $id, body: $comentario}) { issueComment { id } }
+}
+"""
+
+
+class ErroGitHub(Exception):
+    """Falha em uma operação no GitHub, pela API ou pelo 'gh'."""
+
+
+def _separar_slug(repo_slug):
+    """
+    Args:
+        repo_slug: Identificador no formato 'usuario/repo'
+
+    Returns:
+        tuple: (dono, nome)
+    """
+    dono, nome = repo_slug.split("/", 1)
+    return dono, nome
+
+
+def _interpretar_repositorio(repositorio, repo_slug, dono_head):
+    """
+    Converte o resultado de CONSULTA_REPOSITORIO_E_PR.
+
+    Args:
+        repositorio: Campo 'repository' da resposta GraphQL
+        repo_slug: Repositório consultado, para a mensagem de erro
+        dono_head: Dono do repositório de onde vem a branch
+
+    Returns:
+        dict: {"branch_padrao": str ou None, "pr": dict ou None}, com o PR em {"id", "numero", "body", "url"}
+    """
+    if not repositorio:
+        raise ErroGitHub(f"Repositório '{repo_slug}' não encontrado.")
+
+    pr = None
+    for no in repositorio["pullRequests"]["nodes"]:
+        #a mesma branch pode existir em vários forks; só interessa a do dono da head
+        if (no.get("headRepositoryOwner") or {}).get("login", "").lower() == dono_head.lower():
+            pr = {"id": no["id"], "numero": no["number"], "body": no.get("body") or "", "url": no.get("url")}
+            break
+
+    return {"branch_padrao": (repositorio.get("defaultBranchRef") or {}).get("name"), "pr": pr}
+
+
+def _interpretar_comentarios(repositorio, marcador):
+    """
+    Converte o resultado de CONSULTA_COMENTARIOS_PR.
+
+    Args:
+        repositorio: Campo 'repository' da resposta GraphQL
+        marcador: Texto que identifica o comentário procurado
+
+    Returns:
+        str ou None: Identificador GraphQL do comentário mais recente do usuário que contém o marcador
+    """
+    comentarios = (((repositorio or {}).get("pullRequest") or {}).get("comments") or {}).get("nodes") or []
+    for no in reversed(comentarios):
+        #só comentários do próprio usuário podem ser editados
+        if no.get("viewerDidAuthor") and marcador in (no.get("body") or ""):
+            return no["id"]
+    return None
+
+
+class ClienteGitHubApi:
+    """
+    Cliente da API do GitHub com uma única sessão keep-alive para todas as operações do hook.
+    Repositório, branch padrão e PR aberto vêm em uma só consulta GraphQL; edição e comentário
+    do PR vão em uma só mutação.
+    """
+    def __init__(self, token, url_api=None):
+        """
+        Inicializa o cliente.
+
+        Args:
+            token: Token de acesso ao GitHub
+            url_api: URL base da API REST (CODEWISE_GITHUB_API_URL; permite apontar para um servidor falso nos testes)
+        """
+        self.url_api = (url_api or os.getenv("CODEWISE_GITHUB_API_URL") or URL_API_PADRAO).rstrip("/")
+        #no GitHub Enterprise a REST fica em '/api/v3' e o GraphQL em '/api/graphql'
+        if self.url_api.endswith("/api/v3"):
+            self.url_graphql = self.url_api[:-len("/v3")] + "/graphql"
+        else:
+            self.url_graphql = self.url_api + "/graphql"
+
+        self.sessao = requests.Session()
+        self.sessao.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.sessao.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.sessao.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "codewise",
+        })
+
+    def _graphql(self, consulta, variaveis):
+        """
+        Executa uma consulta ou mutação GraphQL.
+
+        Returns:
+            dict: Campo 'data' da resposta
+        """
+        try:
+            resposta = self.sessao.post(self.url_graphql, json={"query": consulta, "variables": variaveis}, timeout=TIMEOUT_API_S)
+        except requests.RequestException as e:
+            raise ErroGitHub(f"Falha de conexão com a API do GitHub: {e}") from e
+        if resposta.status_code != 200:
+            raise ErroGitHub(f"API do GitHub respondeu {resposta.status_code}: {resposta.text[:300]}")
+        dados = resposta.json()
+        if dados.get("errors"):
+            raise ErroGitHub("; ".join(erro.get("message", str(erro)) for erro in dados["errors"]))
+        return dados.get("data") or {}
+
+    def _rest(self, metodo, caminho, corpo):
+        """
+        Executa uma chamada REST.
+
+        Returns:
+            dict: Corpo JSON da resposta
+        """
+        try:
+            resposta = self.sessao.request(metodo, f"{self.url_api}{caminho}", json=corpo, timeout=TIMEOUT_API_S)
+        except requests.RequestException as e:
+            raise ErroGitHub(f"Falha de conexão com a API do GitHub: {e}") from e
+        if resposta.status_code >= 400:
+            raise ErroGitHub(f"API do GitHub respondeu {resposta.status_code}: {resposta.text[:300]}")
+        return resposta.json() if resposta.content else {}
+
+    def consultar_repositorio(self, repo_slug, dono_head, branch):
+        """
+        Busca a branch padrão e o PR aberto da branch em uma única chamada.
+
+        Args:
+            repo_slug: Repositório alvo do PR ('usuario/repo')
+            dono_head: Dono do repositório de onde vem a branch (fork ou o próprio alvo)
+            branch: Nome da branch enviada
+
+        Returns:
+            dict: {"branch_padrao": str ou None, "pr": dict ou None}, com o PR em {"id", "numero", "body", "url"}
+        """
+        dono, nome = _separar_slug(repo_slug)
+        dados = self._graphql(CONSULTA_REPOSITORIO_E_PR, {"dono": dono, "nome": nome, "branch": branch})
+        return _interpretar_repositorio(dados.get("repository"), repo_slug, dono_head)
+
+    def criar_pr(self, repo_slug, base, head_completa, titulo, body):
+        """
+        Cria um Pull Request.
+
+        Args:
+            repo_slug: Repositório alvo ('usuario/repo')
+            base: Branch de destino
+            head_completa: Branch de origem no formato 'dono:branch'
+            titulo: Título do PR
+            body: Descrição do PR
+
+        Returns:
+            dict: PR criado em {"id", "numero", "body", "url"}
+        """
+        criado = self._rest("POST", f"/repos/{repo_slug}/pulls", {"title": titulo, "body": body, "base": base, "head": head_completa})
+        return {"id": criado.get("node_id"), "numero": criado["number"], "body": body, "url": criado.get("html_url")}
+
+    def localizar_comentario(self, repo_slug, pr, marcador):
+        """
+        Procura entre os últimos comentários do PR o comentário do usuário que contém o marcador.
+
+        Args:
+            repo_slug: Repositório alvo ('usuario/repo')
+            pr: PR retornado por 'consultar_repositorio' ou 'criar_pr'
+            marcador: Texto que identifica o comentário
+
+        Returns:
+            str ou None: Identificador GraphQL do comentário, None se não houver
+        """
+        dono, nome = _separar_slug(repo_slug)
+        dados = self._graphql(CONSULTA_COMENTARIOS_PR, {"dono": dono, "nome": nome, "numero": int(pr["numero"])})
+        return _interpretar_comentarios(dados.get("repository"), marcador)
+
+    def publicar_no_pr(self, repo_slug, pr, titulo=None, body=None, comentario=None, id_comentario=None):
+        """
+        Atualiza título/descrição e/ou comenta no PR em uma única mutação GraphQL.
+
+        Args:
+            repo_slug: Repositório alvo ('usuario/repo')
+            pr: PR retornado por 'consultar_repositorio' ou 'criar_pr'
+            titulo: Novo título (opcional)
+            body: Nova descrição (opcional)
+            comentario: Comentário a adicionar (opcional)
+            id_comentario: Comentário existente a editar com o texto de 'comentario' em vez de criar outro (opcional)
+
+        Returns:
+            str ou None: Identificador GraphQL do comentário criado ou editado
+        """
+        #o GraphQL rejeita variáveis declaradas e não usadas; editar só o comentário dispensa o '$id' do PR
+        usa_id_pr = titulo is not None or body is not None or (comentario is not None and not id_comentario)
+        if usa_id_pr and not pr.get("id"):
+            raise ErroGitHub(f"PR #{pr.get('numero')} sem identificador GraphQL.")
+
+        campos, declaracoes, variaveis = [], [], {}
+        if usa_id_pr:
+            declaracoes.append("$id: ID!")
+            variaveis["id"] = pr["id"]
+        if titulo is not None or body is not None:
+            entrada = ["pullRequestId: $id"]
+            if titulo is not None:
+                declaracoes.append("$titulo: String!")
+                entrada.append("title: $titulo")
+                variaveis["titulo"] = titulo
+            if body is not None:
+                declaracoes.append("$body: String!")
+                entrada.append("body: $body")
+                variaveis["body"] = body
+            campos.append(f"editar: updatePullRequest(input: {{{', '.join(entrada)}}}) {{ pullRequest {{ number }} }}")
+        if comentario is not None:
+            declaracoes.append("$comentario: String!")
+            variaveis["comentario"] = comentario
+            if id_comentario:
+                declaracoes.append("$idComentario: ID!")
+                variaveis["idComentario"] = id_comentario
+                campos.append("comentar: updateIssueComment(input: {id: $idComentario, body: $comentario}) { issueComment { id } }")
+            else:
+                campos.append("comentar: addComment(input: {subjectId: $id, body: $comentario}) { commentEdge { node { id } } }")
+        if not campos:
+            return None
+
+        mutacao = f"mutation({', '.join(declaracoes)}) {{ {' '.join(campos)} }}"
+        dados = self._graphql(mutacao, variaveis)
+        comentar = dados.get("comentar") or {}
+        if id_comentario:
+            return (comentar.get("issueComment") or {}).get("id")
+        return ((comentar.get("commentEdge") or {}).get("node") or {}).get("id")
+
+
+class ClienteGitHubCli:
+    """
+    Alternativa ao cliente da API quando não há token disponível: mesmas operações pelo 'gh'.
+    """
+    def __init__(self, repo_path):
+        """
+        Args:
+            repo_path: Diretório do repositório local, usado como cwd do 'gh'
+        """
+        self.repo_path = repo_path
+
+    def _gh(self, argumentos):
+        """
+        Executa um comando do 'gh'.
+
+        Returns:
+            str: Saída padrão do comando
+        """
+        try:
+            result = subprocess.run(["gh"] + argumentos, check=True, capture_output=True, text=True, encoding='utf-8', cwd=self.repo_path)
+        except subprocess.CalledProcessError as e:
+            raise ErroGitHub(e.stderr.strip() if e.stderr else str(e)) from e
+        except FileNotFoundError as e:
+            raise ErroGitHub("GitHub CLI ('gh') não encontrado.") from e
+        return result.stdout
+
+    def _gh_graphql(self, consulta, variaveis):
+        """
+        Executa uma consulta ou mutação GraphQL pelo 'gh api', com a requisição pela stdin
+        para textos longos não esbarrarem no limite da linha de comando.
+
+        Returns:
+            dict: Campo 'data' da resposta
+        """
+        try:
+            result = subprocess.run(["gh", "api", "graphql", "--input", "-"], input=json.dumps({"query": consulta, "variables": variaveis}),
+                                    check=True, capture_output=True, text=True, encoding='utf-8', cwd=self.repo_path)
+        except subprocess.CalledProcessError as e:
+            raise ErroGitHub(e.stderr.strip() if e.stderr else str(e)) from e
+        except FileNotFoundError as e:
+            raise ErroGitHub("GitHub CLI ('gh') não encontrado.") from e
+        try:
+            return json.loads(result.stdout).get("data") or {}
+        except (json.JSONDecodeError, AttributeError) as e:
+            raise ErroGitHub(f"Resposta inesperada do 'gh api graphql': {e}") from e
+
+    def consultar_repositorio(self, repo_slug, dono_head, branch):
+        dono, nome = _separar_slug(repo_slug)
+        saida = self._gh([
+            "api", "graphql", "-f", f"query={CONSULTA_REPOSITORIO_E_PR}",
+            "-f", f"dono={dono}", "-f", f"nome={nome}", "-f", f"branch={branch}",
+        ])
+        try:
+            repositorio = json.loads(saida)["data"]["repository"]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise ErroGitHub(f"Resposta inesperada do 'gh api graphql': {e}") from e
+        return _interpretar_repositorio(repositorio, repo_slug, dono_head)
+
+    def criar_pr(self, repo_slug, base, head_completa, titulo, body):
+        pr_url = self._gh(["pr", "create", "--repo", repo_slug, "--base", base, "--head", head_completa, "--title", titulo, "--body", body]).strip()
+        match = re.search(r"/pull/(\d+)", pr_url)
+        if not match:
+            raise ErroGitHub(f"Não foi possível extrair o número do PR da URL: {pr_url}")
+        return {"id": None, "numero": int(match.group(1)), "body": body, "url": pr_url}
+
+    def localizar_comentario(self, repo_slug, pr, marcador):
+        dono, nome = _separar_slug(repo_slug)
+        dados = self._gh_graphql(CONSULTA_COMENTARIOS_PR, {"dono": dono, "nome": nome, "numero": int(pr["numero"])})
+        return _interpretar_comentarios(dados.get("repository"), marcador)
+
+    def publicar_no_pr(self, repo_slug, pr, titulo=None, body=None, comentario=None, id_comentario=None):
+        numero = str(pr["numero"])
+        if titulo is not None or body is not None:
+            argumentos = ["pr", "edit", numero, "--repo", repo_slug]
+            if titulo is not None:
+                argumentos += ["--title", titulo]
+            if body is not None:
+                argumentos += ["--body", body]
+            self._gh(argumentos)
+        if comentario is not None and id_comentario:
+            dados = self._gh_graphql(MUTACAO_EDITAR_COMENTARIO, {"id": id_comentario, "comentario": comentario})
+            return ((dados.get("updateIssueComment") or {}).get("issueComment") or {}).get("id")
+        if comentario is not None:
+            #o corpo vai pela stdin para não esbarrar no limite de tamanho da linha de comando
+            #o 'gh pr comment' não devolve o identificador GraphQL; a próxima publicação localiza o comentário pelo marcador
+            try:
+                subprocess.run(["gh", "pr", "comment", numero, "--repo", repo_slug, "--body-file", "-"], input=comentario,
+                               check=True, capture_output=True, text=True, encoding='utf-8', cwd=self.repo_path)
+            except subprocess.CalledProcessError as e:
+                raise ErroGitHub(e.stderr.strip() if e.stderr else str(e)) from e
+        return None
+
+
+def erro_branch_head_inexistente(erro):
+    """
+    Indica se a criação do PR falhou porque a branch de origem ainda não existe no remote,
+    o que é esperado no pre-push do primeiro push de uma branch.
+
+    Args:
+        erro: ErroGitHub levantado por 'criar_pr'
+
+    Returns:
+        bool: True se a mensagem aponta a branch 'head' como inválida ou inexistente
+    """
+    mensagem = str(erro).lower()
+    #REST: 422 com {"field": "head", "code": "invalid"}; 'gh': "Head ref must be a branch" / "Head sha can't be blank"
+    return bool(re.search(r'"field"\s*:\s*"head"|head ref must be a branch|head sha can\'t be blank|head branch .*(not found|does not exist)', mensagem))
+
+
+def obter_token_github():
+    """
+    Obtém o token do GitHub: GITHUB_TOKEN/GH_TOKEN no ambiente ou o token já salvo pelo 'gh auth login'.
+
+    Returns:
+        str ou None: Token encontrado, None caso contrário
+    """
+    token = os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")
+    if token:
+        return token.strip()
+    if not shutil.which("gh"):
+        return None
+    try:
+        token = subprocess.check_output(["gh", "auth", "token"], text=True, encoding='utf-8', stderr=subprocess.DEVNULL).strip()
+        return token or None
+    except subprocess.CalledProcessError:
+        return None
+
+
+def obter_cliente_github(repo_path):
+    """
+    Cria o cliente do GitHub: a API com sessão persistente quando há token, o 'gh' caso contrário.
+    CODEWISE_GITHUB_CLIENTE=gh força o uso do 'gh'.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+
+    Returns:
+        ClienteGitHubApi ou ClienteGitHubCli: Cliente pronto para uso
+    """
+    if os.getenv("CODEWISE_GITHUB_CLIENTE", "").lower() != "gh":
+        token = obter_token_github()
+        if token:
+            return ClienteGitHubApi(token)
+
+    if not shutil.which("gh"):
+        raise ErroGitHub("Nenhum token do GitHub encontrado (GITHUB_TOKEN) e o GitHub CLI ('gh') não está instalado.")
+    print("ℹ️ Sem token do GitHub disponível. Usando o 'gh' para as operações do PR.", file=sys.stderr)
+    return ClienteGitHubCli(repo_path)
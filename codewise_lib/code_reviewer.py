@@ -1,75 +1,41 @@
-import os
 import subprocess
 
 
-def coletar_dados_git(repo_path: str, commits_limit: int = 3) -> str:
+def montar_dados_avaliacao(contexto_git) -> str:
     """
-    Coleta informações detalhadas do repositório Git para análise de código.
-    
+    Monta o texto de entrada da avaliação de código a partir do contexto Git já coletado na execução.
+    Usa o mesmo intervalo de commits enviado no push, sem uma nova leitura do histórico.
+
     Args:
-        repo_path: Caminho para o repositório Git local
-        commits_limit: Número máximo de commits a analisar (padrão: 3)
-        
+        contexto_git: GitContext da execução atual
+
     Returns:
         str: Texto formatado com informações dos commits e diffs para análise
     """
     try:
-        try:
-            result = subprocess.run(
-                ['git', '-C', repo_path, 'config', 'user.email'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            user_email = result.stdout.strip()
-        except:
-            user_email = "Desenvolvedor"
-        
-        #coleta de logs dos commits anteriores
-        git_log_cmd = [
-            'git', '-C', repo_path, 'log',
-            f'-{commits_limit}',
-            '--pretty=format:%H|%an|%ae|%ad|%s',
-            '--date=iso',
-            '--numstat',
-            'HEAD'
-        ]
-        
-        log_output = subprocess.check_output(
-            git_log_cmd,
-            stderr=subprocess.STDOUT,
-            text=True
+        result = subprocess.run(
+            ['git', '-C', contexto_git.caminho_repo, 'config', 'user.email'],
+            capture_output=True,
+            text=True,
+            check=True
         )
-        
-        #formatação do resultado final
-        resultado = []
-        resultado.append("=" * 80)
-        resultado.append(f"ANÁLISE DE CÓDIGO - {user_email}")
-        resultado.append("=" * 80)
-        resultado.append("")
-        resultado.append(f"Últimos {commits_limit} commits:")
-        resultado.append("")
-        resultado.append(log_output)
-        resultado.append("")
-        
-        #coleta de diffs dos commits anteriores
-        for i in range(commits_limit):
-            try:
-                diff_cmd = ['git', '-C', repo_path, 'show', f'HEAD~{i}', '--unified=3']
-                diff_output = subprocess.check_output(
-                    diff_cmd,
-                    stderr=subprocess.STDOUT,
-                    text=True
-                )
-                resultado.append(f"--- Mudanças do commit HEAD~{i} ---")
-                resultado.append(diff_output[:3000])  # Limita tamanho
-                resultado.append("")
-            except:
-                pass
-        
-        return "\n".join(resultado)
-        
-    except subprocess.CalledProcessError as e:
-        return f"Erro ao coletar dados Git: {e.output}"
-    except Exception as e:
-        return f"Erro: {str(e)}"
+        user_email = result.stdout.strip()
+    except Exception:
+        user_email = "Desenvolvedor"
+
+    #o contexto compacto vem primeiro para manter o mesmo prefixo de prompt das outras tarefas
+    resultado = []
+    resultado.append(contexto_git.texto_compacto())
+    resultado.append("")
+    resultado.append("=" * 80)
+    resultado.append(f"ANÁLISE DE CÓDIGO - {user_email}")
+    resultado.append("=" * 80)
+    resultado.append(f"Intervalo avaliado: {contexto_git.base_ref}..{contexto_git.head_ref}")
+    resultado.append("")
+
+    for commit in contexto_git.commits_detalhados:
+        if len(commit) == 5:
+            hash_commit, autor, email, data, mensagem = commit
+            resultado.append(f"{hash_commit[:10]} | {autor} <{email}> | {data} | {mensagem}")
+
+    return "\n".join(resultado)
@@ -0,0 +1,259 @@
+import os
+import re
+import fnmatch
+from collections import deque
+
+#limites usados para manter o contexto enviado à IA compacto
+LINHAS_CONTEXTO_DIFF = 1
+LIMITE_LINHAS_HUNK = 60
+LIMITE_LINHAS_ARQUIVO = 300
+LIMITE_CARACTERES_LINHA = 500
+#limites em bytes: acima deles o arquivo (ou o restante do diff) vira só um resumo 'arquivo alterado, N linhas'
+LIMITE_BYTES_ARQUIVO = 24 * 1024
+LIMITE_BYTES_TOTAL = 256 * 1024
+
+#arquivos gerados ou de dependências entram só com as estatísticas
+PADROES_SOMENTE_ESTATISTICA = [
+    "*.lock", "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock",
+    "*.min.js", "*.min.css", "*.map", "*.svg", "*.pb.go", "*_pb2.py",
+]
+
+
+class ArquivoAlterado:
+    """
+    Representa um arquivo alterado no intervalo analisado, com estatísticas e trechos do diff.
+    """
+    def __init__(self, caminho: str, adicionadas: int = 0, removidas: int = 0, binario: bool = False):
+        """
+        Inicializa o arquivo alterado.
+
+        Args:
+            caminho: Caminho do arquivo relativo à raiz do repositório
+            adicionadas: Quantidade de linhas adicionadas
+            removidas: Quantidade de linhas removidas
+            binario: True se o Git considerou o arquivo binário
+        """
+        self.caminho = caminho
+        self.adicionadas = adicionadas
+        self.removidas = removidas
+        self.binario = binario
+        self.hunks = []
+        self.linhas_omitidas = 0
+        self.linhas_diff = 0
+        self.bytes_mantidos = 0
+        #preenchidos pelo diff semântico (diff_semantico.py) quando a linguagem é suportada
+        self.resumo_semantico = []
+        self.trechos_sem_logica = 0
+
+    def somente_estatistica(self) -> bool:
+        """
+        Indica se o arquivo deve aparecer apenas na lista de estatísticas, sem trechos.
+
+        Returns:
+            bool: True para binários e arquivos gerados/de dependências
+        """
+        nome = os.path.basename(self.caminho)
+        return self.binario or any(fnmatch.fnmatch(nome, p) for p in PADROES_SOMENTE_ESTATISTICA)
+
+
+class GitContext:
+    """
+    Representação compacta e única das mudanças de um intervalo de commits.
+    Montada uma vez por execução e compartilhada entre todas as tarefas da IA.
+    """
+    def __init__(self, caminho_repo: str, base_ref: str, head_ref: str, commits: list, arquivos: list, commits_detalhados: list = None):
+        """
+        Inicializa o contexto Git.
+
+        Args:
+            caminho_repo: Caminho para o repositório Git
+            base_ref: Referência base do intervalo (ex: 'origin/main')
+            head_ref: Referência final do intervalo (ex: nome da branch)
+            commits: Lista com as mensagens dos commits do intervalo
+            arquivos: Lista de ArquivoAlterado do intervalo
+            commits_detalhados: Lista de [hash, autor, email, data, mensagem] dos commits (opcional)
+        """
+        self.caminho_repo = caminho_repo
+        self.base_ref = base_ref
+        self.head_ref = head_ref
+        self.commits = commits
+        self.arquivos = arquivos
+        self.commits_detalhados = commits_detalhados or []
+
+    def total_adicionadas(self) -> int:
+        return sum(a.adicionadas for a in self.arquivos)
+
+    def total_removidas(self) -> int:
+        return sum(a.removidas for a in self.arquivos)
+
+    def lista_arquivos(self) -> str:
+        """
+        Monta a lista de arquivos alterados com as estatísticas de cada um.
+
+        Returns:
+            str: Uma linha por arquivo no formato 'caminho (+a -r)'
+        """
+        linhas = [f"Arquivos alterados ({len(self.arquivos)} arquivo(s), +{self.total_adicionadas()} -{self.total_removidas()}):"]
+        for arquivo in self.arquivos:
+            if arquivo.binario:
+                linhas.append(f"  {arquivo.caminho} (binário)")
+            else:
+                linhas.append(f"  {arquivo.caminho} (+{arquivo.adicionadas} -{arquivo.removidas})")
+        return "\n".join(linhas)
+
+    def trechos_alterados(self) -> str:
+        """
+        Monta os trechos do diff com contexto reduzido, já cortados pelos limites.
+
+        Returns:
+            str: Trechos agrupados por arquivo
+        """
+        blocos = []
+        for arquivo in self.arquivos:
+            if arquivo.somente_estatistica():
+                continue
+            if not arquivo.hunks and not arquivo.resumo_semantico:
+                if arquivo.linhas_omitidas:
+                    #passou dos limites de tamanho: só o resumo do arquivo
+                    blocos.append(f"### {arquivo.caminho}\n(arquivo alterado, {arquivo.linhas_diff} linha(s) no diff, trechos omitidos pelo limite de tamanho)")
+                continue
+            bloco = [f"### {arquivo.caminho}"]
+            if arquivo.resumo_semantico:
+                bloco.append("Mudanças semânticas:")
+                bloco.extend(f"  {linha}" for linha in arquivo.resumo_semantico)
+            if arquivo.trechos_sem_logica:
+                bloco.append(f"({arquivo.trechos_sem_logica} trecho(s) sem mudança de lógica omitido(s))")
+            bloco.extend(arquivo.hunks)
+            if arquivo.linhas_omitidas:
+                bloco.append(f"... ({arquivo.linhas_omitidas} linha(s) omitida(s) neste arquivo)")
+            blocos.append("\n".join(bloco))
+        return "\n\n".join(blocos)
+
+    def texto_compacto(self, incluir_commits: bool = True) -> str:
+        """
+        Gera o texto único enviado às tarefas: commits, lista de arquivos e trechos alterados.
+        A ordem é fixa para que o prefixo do prompt seja o mesmo entre chamadas (cache de prompt).
+
+        Args:
+            incluir_commits: Se False, omite o cabeçalho de commits (ex: mudanças staged do lint, que ainda não têm commit)
+
+        Returns:
+            str: Representação compacta das mudanças
+        """
+        entrada = []
+        if incluir_commits:
+            entrada.append(f"Analisando {len(self.commits)} novo(s) commit(s).\n\nMensagens de commit:")
+            entrada.extend(f"- {c}" for c in self.commits)
+            entrada.append(f"\n{'='*80}")
+        entrada.append(self.lista_arquivos())
+        entrada.append(f"\n{'='*80}\nTrechos alterados (contexto reduzido):\n{self.trechos_alterados()}")
+        return "\n".join(entrada)
+
+
+def parsear_numstat(linhas_numstat) -> list:
+    """
+    Converte a saída de 'git diff --numstat' em objetos ArquivoAlterado.
+
+    Args:
+        linhas_numstat: Iterável com as linhas retornadas pelo git
+
+    Returns:
+        list: Lista de ArquivoAlterado na ordem do git
+    """
+    arquivos = []
+    for linha in linhas_numstat:
+        partes = linha.split("\t", 2)
+        if len(partes) != 3:
+            continue
+        adicionadas, removidas, caminho = partes
+        if adicionadas == "-" and removidas == "-":
+            arquivos.append(ArquivoAlterado(caminho, binario=True))
+        else:
+            arquivos.append(ArquivoAlterado(caminho, int(adicionadas), int(removidas)))
+    return arquivos
+
+
+class _HunkEmAndamento:
+    """
+    Acumula um hunk em memória limitada: guarda só o começo e o fim, contando o que ficou no meio.
+    """
+    def __init__(self, cabecalho: str):
+        self.cabecalho = cabecalho
+        self.metade = (LIMITE_LINHAS_HUNK - 1) // 2
+        self.inicio = []
+        self.fim = deque(maxlen=self.metade)
+        self.total = 0
+
+    def adicionar(self, linha: str) -> None:
+        self.total += 1
+        if len(self.inicio) < self.metade:
+            self.inicio.append(linha)
+        else:
+            self.fim.append(linha)
+
+    def linhas(self) -> tuple:
+        """
+        Returns:
+            tuple: (linhas mantidas com cabeçalho, quantidade de linhas omitidas)
+        """
+        omitidas = self.total - len(self.inicio) - len(self.fim)
+        mantidas = [self.cabecalho] + self.inicio
+        if omitidas:
+            mantidas.append(f"... ({omitidas} linha(s) omitida(s))")
+        mantidas.extend(self.fim)
+        return mantidas, omitidas
+
+
+def anexar_hunks(arquivos: list, linhas_diff) -> None:
+    """
+    Percorre as linhas de um diff unificado em streaming e anexa os hunks aparados a cada arquivo.
+    A memória usada não depende do tamanho do diff: hunks longos guardam só começo e fim, e
+    arquivos (ou o diff inteiro) que passam dos limites em bytes viram apenas contagem de linhas.
+
+    Args:
+        arquivos: Lista de ArquivoAlterado vinda do numstat
+        linhas_diff: Iterável com as linhas do diff unificado (pode ser um gerador)
+    """
+    por_caminho = {a.caminho: a for a in arquivos}
+    atual = None
+    hunk = None
+    linhas_no_arquivo = 0
+    bytes_total = 0
+
+    def fechar_hunk():
+        nonlocal hunk, linhas_no_arquivo, bytes_total
+        if atual is not None and hunk is not None and not atual.somente_estatistica():
+            mantidas, omitidas = hunk.linhas()
+            tamanho = sum(len(l) + 1 for l in mantidas)
+            estourou = (
+                linhas_no_arquivo + len(mantidas) > LIMITE_LINHAS_ARQUIVO
+                or atual.bytes_mantidos + tamanho > LIMITE_BYTES_ARQUIVO
+                or bytes_total + tamanho > LIMITE_BYTES_TOTAL
+            )
+            if estourou:
+                atual.linhas_omitidas += hunk.total
+            else:
+                atual.hunks.extend(mantidas)
+                atual.linhas_omitidas += omitidas
+                atual.bytes_mantidos += tamanho
+                linhas_no_arquivo += len(mantidas)
+                bytes_total += tamanho
+        hunk = None
+
+    for linha in linhas_diff:
+        if linha.startswith("diff --git "):
+            fechar_hunk()
+            match = re.match(r"diff --git a/(.*) b/(.*)$", linha)
+            caminho = match.group(2) if match else ""
+            atual = por_caminho.get(caminho)
+            linhas_no_arquivo = 0
+        elif linha.startswith("@@"):
+            fechar_hunk()
+            hunk = _HunkEmAndamento(linha)
+        elif hunk is not None:
+            if atual is not None:
+                atual.linhas_diff += 1
+            if len(linha) > LIMITE_CARACTERES_LINHA:
+                linha = linha[:LIMITE_CARACTERES_LINHA] + " [...]"
+            hunk.adicionar(linha)
+    fechar_hunk()
@@ -1,26 +1,25 @@
 import sys
 import os
 import re
-import yaml
+import copy
 from dotenv import load_dotenv
 from crewai import Agent, Crew, Process, Task, LLM
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, task
 from .select_llm import create_llm
-
-from crewai_tools import (
-    WebsiteSearchTool
-)
+from .carregador_config import carregar_config, ErroConfiguracao
+from .base_vetorial import criar_busca_site
 
 
 @CrewBase
-class Codewise:
-    """Classe principal da crew Codewise"""
-    def __init__(self, commit_message: str = ""):
+class _CrewCodewise:
+    """Agentes, tarefas e crews do Codewise; a configuração é carregada por 'Codewise.load_configurations'"""
+    def __init__(self, commit_message: str = "", caminho_repo: str = None):
         """
         Inicializa a crew Codewise com agentes e configurações.
         
         Args:
             commit_message: Mensagem de commit ou contexto para análise (opcional)
+            caminho_repo: Repositório cujos overrides em '.codewise/' são aplicados (opcional)
         """
         load_dotenv()
         #configurações iniciais da llm e agentes
@@ -29,23 +28,32 @@ class Codewise:
         self.model = os.getenv("AI_MODEL")
         self.llm = create_llm(self.provider,self.model)
 
-        #tools iniciais
-        self.web_search_tool = WebsiteSearchTool()
+        #tools iniciais; páginas e embeddings da busca ficam em cache entre execuções
+        self.web_search_tool = criar_busca_site()
         
-        #carregamento de configurações de agentes e tarefas
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        config_path = os.path.join(base_dir, "config")
-        agents_path = os.path.join(config_path, "agents.yaml")
-        tasks_path = os.path.join(config_path, "tasks.yaml")
+        #repositório dos overrides, lido pelo load_configurations que o CrewBase chama logo após este __init__
+        self.caminho_repo = caminho_repo
 
-        try:
-            with open(agents_path, "r", encoding="utf-8") as f:
-                self.agents_config = yaml.safe_load(f)
-            with open(tasks_path, "r", encoding="utf-8") as f:
-                self.tasks_config = yaml.safe_load(f)
-        except FileNotFoundError as e:
-            print(f"Erro: Arquivo de configuração não encontrado: {e}")
-            sys.exit(1)
+        #crews montadas uma vez por instância; agentes e tarefas já são memorizados pelos decorators
+        self._crews = {}
+
+    def _crew_memorizada(self, nome: str, agentes, tarefas) -> Crew:
+        """
+        Retorna a crew 'nome' desta instância, montando na primeira chamada.
+        As tarefas guardam a descrição original e são reinterpoladas a cada kickoff(inputs=...),
+        então a mesma crew serve para execuções seguidas com contextos diferentes.
+        
+        Args:
+            nome: Identificador da crew
+            agentes: Agentes da crew (memorizados pelo decorator @agent)
+            tarefas: Tarefas da crew (memorizadas pelo decorator @task)
+            
+        Returns:
+            Crew: Instância memorizada da crew
+        """
+        if nome not in self._crews:
+            self._crews[nome] = Crew(agents=agentes, tasks=tarefas, process=Process.sequential)
+        return self._crews[nome]
 
     #definição dos agentes disponíveis
     @agent
@@ -88,14 +96,11 @@ class Codewise:
         cfg = self.tasks_config['padroes_projeto']
         return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.quality_control_manager())
     @task
-    def task_summarize(self) -> Task:
-        cfg = self.tasks_config['summarize_analysis']
-        return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.summary_specialist())
-    
-    @task
     def task_mentoring(self) -> Task:
         cfg = self.tasks_config['mentoring_task']
-        return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.code_mentor())
+        #contexto fixo: a mentoria pode rodar numa crew própria, depois das análises e só se houver tempo
+        return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.code_mentor(),
+                    context=[self.task_estrutura(), self.task_heuristicas(), self.task_solid(), self.task_padroes()])
     
     @task
     def task_policy(self) -> Task:
@@ -118,28 +123,44 @@ class Codewise:
         cfg = self.tasks_config['code_review_scoring']
         return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.code_reviewer())
 
+    @task
+    def task_titulo(self) -> Task:
+        cfg = self.tasks_config['pr_titulo']
+        return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.summary_specialist())
+    @task
+    def task_descricao(self) -> Task:
+        cfg = self.tasks_config['pr_descricao']
+        return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.summary_specialist())
+    @task
+    def task_resumo_executivo(self) -> Task:
+        cfg = self.tasks_config['resumo_executivo']
+        #o resumo lê só as quatro análises técnicas, não a mentoria
+        return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.summary_specialist(),
+                    context=[self.task_estrutura(), self.task_heuristicas(), self.task_solid(), self.task_padroes()])
+    @task
+    def task_lint(self) -> Task:
+        cfg = self.tasks_config['lint_rapido']
+        return Task(description=cfg['description'], expected_output=cfg['expected_output'], agent=self.quality_consultant())
+
 
-    #definição da crew principal
-    @crew
-    def crew(self) -> Crew:
-        return Crew(
-            agents=[self.senior_architect(), self.senior_analytics(), self.quality_consultant(), self.quality_control_manager(),self.code_mentor()],
-            tasks=[self.task_estrutura(), self.task_heuristicas(), self.task_solid(), self.task_padroes(),self.task_mentoring()],
-            process=Process.sequential
-        )
+    def analise_crew(self) -> Crew:
+        """
+        Cria a crew das quatro análises técnicas, sem a mentoria.
+        
+        Returns:
+            Crew: Instância da crew de análise técnica
+        """
+        return self._crew_memorizada("analise", [self.senior_architect(), self.senior_analytics(), self.quality_consultant(), self.quality_control_manager()],
+                                     [self.task_estrutura(), self.task_heuristicas(), self.task_solid(), self.task_padroes()])
 
-    def summary_crew(self) -> Crew:
+    def mentoria_crew(self) -> Crew:
         """
-        Cria uma crew especializada em gerar resumos executivos.
+        Cria a crew de mentoria, que usa as saídas das análises técnicas.
         
         Returns:
-            Crew: Instância da crew de resumo
+            Crew: Instância da crew de mentoria
         """
-        return Crew(
-            agents=[self.summary_specialist()],
-            tasks=[self.task_summarize()],
-            process=Process.sequential
-        )
+        return self._crew_memorizada("mentoria", [self.code_mentor()], [self.task_mentoring()])
 
     def lgpd_crew(self) -> Crew:
         """
@@ -148,11 +169,7 @@ class Codewise:
         Returns:
             Crew: Instância da crew de análise LGPD
         """
-        return Crew(
-            agents=[self.dataCollect_policy_analytics(), self.lgpd_judge()],
-            tasks=[self.task_policy(), self.task_judging()],
-            process=Process.sequential
-        )
+        return self._crew_memorizada("lgpd", [self.dataCollect_policy_analytics(), self.lgpd_judge()], [self.task_policy(), self.task_judging()])
     
     def code_review_crew(self) -> Crew:
         """
@@ -161,8 +178,57 @@ class Codewise:
         Returns:
             Crew: Instância da crew de code review
         """
-        return Crew(
-            agents=[self.code_reviewer()],
-            tasks=[self.task_code_review()],
-            process=Process.sequential
-        )
\ No newline at end of file
+        return self._crew_memorizada("code_review", [self.code_reviewer()], [self.task_code_review()])
+
+    def titulo_crew(self) -> Crew:
+        """
+        Cria a crew que gera o título do PR a partir do contexto em 'input'.
+        
+        Returns:
+            Crew: Instância da crew de título
+        """
+        return self._crew_memorizada("titulo", [self.summary_specialist()], [self.task_titulo()])
+
+    def descricao_crew(self) -> Crew:
+        """
+        Cria a crew que gera a descrição do PR a partir do contexto em 'input'.
+        
+        Returns:
+            Crew: Instância da crew de descrição
+        """
+        return self._crew_memorizada("descricao", [self.summary_specialist()], [self.task_descricao()])
+
+    def resumo_crew(self) -> Crew:
+        """
+        Cria a crew do resumo executivo, que usa as saídas das análises técnicas da crew principal.
+        
+        Returns:
+            Crew: Instância da crew de resumo executivo
+        """
+        return self._crew_memorizada("resumo", [self.summary_specialist()], [self.task_resumo_executivo()])
+
+    def lint_crew(self) -> Crew:
+        """
+        Cria a crew da análise rápida pré-commit sobre o diff em 'input'.
+        
+        Returns:
+            Crew: Instância da crew de lint
+        """
+        return self._crew_memorizada("lint", [self.quality_consultant()], [self.task_lint()])
+
+
+class Codewise(_CrewCodewise):
+    """Classe principal da crew Codewise"""
+    def load_configurations(self) -> None:
+        """
+        Sobrescreve o carregamento do CrewBase, que parsearia 'config/agents.yaml' e 'config/tasks.yaml'
+        do pacote: agentes e tarefas vêm do bundle já validado, mesclado com os overrides do repositório
+        e em cache. O CrewBase chama este método antes de mapear os agentes das tarefas.
+        """
+        try:
+            config = carregar_config(self.caminho_repo)
+        except ErroConfiguracao as e:
+            print(f"Erro: {e}")
+            sys.exit(1)
+        self.agents_config = copy.deepcopy(config["agentes"])
+        self.tasks_config = copy.deepcopy(config["tarefas"])
@@ -1,12 +1,22 @@
 import os
 import sys
 import re
+import time
+import subprocess
+from dotenv import load_dotenv
 from .crew import Codewise
-from .entradagit import gerar_entrada_automatica, obter_mudancas_staged
-from crewai import Task, Crew
-from .lgpd import *
-from .code_reviewer import coletar_dados_git
-from .notificacao_gestor import processar_avaliacao_e_notificar
+from .entradagit import obter_contexto_git, obter_mudancas_staged
+from .contexto_git import GitContext
+from .lgpd import obter_caminhos_cache_lgpd, verify_lgpd, verifica_se_existe_analise_lgpd
+from .code_reviewer import montar_dados_avaliacao
+from .notificacao_gestor import processar_avaliacao_e_notificar, extrair_nota_e_justificativa
+from .historico import registrar_execucao, extrair_criterios
+from .entradagit import resolver_sha
+from .orcamento_tempo import cabe_no_prazo, tempo_limite_llm
+from .sintese_local import modo_textos_pr, gerar_titulo_local, gerar_descricao_local, anexar_rascunho
+from .indice_codigo import contexto_estrutura
+from .achados import (separar_achados, formatar_achados, combinar_achados, analise_incremental_ativa, carregar_analise_branch,
+                      salvar_analise_branch, blobs_alterados, arquivos_inalterados, anotar_arquivos_mantidos)
 
 
 class CodewiseRunner:
@@ -17,11 +27,87 @@ class CodewiseRunner:
     def __init__(self):
         """
         Inicializa o CodewiseRunner com os caminhos necessários.
+        O contexto das mudanças fica só em memória, então várias execuções podem rodar ao mesmo tempo.
+        A instância do Codewise (agentes, tarefas e crews) é criada na primeira execução e reaproveitada
+        nas seguintes; use um runner por thread.
         """
         self.BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-        self.caminho_entrada = os.path.join(self.BASE_DIR, ".entrada_temp.txt")
+        self._codewise = {}
 
-    def executar(self, caminho_repo: str, nome_branch: str, modo: str):
+    def obter_codewise(self, caminho_repo: str) -> Codewise:
+        """
+        Args:
+            caminho_repo: Repositório analisado (cada um pode ter overrides em '.codewise/')
+            
+        Returns:
+            Codewise: Instância compartilhada pelas execuções deste runner no repositório
+        """
+        if caminho_repo not in self._codewise:
+            self._codewise[caminho_repo] = Codewise(caminho_repo=caminho_repo)
+        return self._codewise[caminho_repo]
+
+    def _kickoff(self, crew, uso: list, inputs: dict = None):
+        """
+        Executa a crew somando ao 'uso' os tokens gastos só neste kickoff (as crews são memorizadas
+        e os agentes acumulam o uso de execuções anteriores).
+
+        Args:
+            crew: Crew a executar
+            uso: Lista [tokens_prompt, tokens_resposta] acumulada na execução
+            inputs: Valores dos placeholders das tarefas (opcional)
+
+        Returns:
+            CrewOutput: Saída do kickoff
+        """
+        antes = crew.calculate_usage_metrics()
+        saida = crew.kickoff(inputs=inputs) if inputs is not None else crew.kickoff()
+        depois = crew.calculate_usage_metrics()
+        uso[0] += depois.prompt_tokens - antes.prompt_tokens
+        uso[1] += depois.completion_tokens - antes.completion_tokens
+        return saida
+
+    def _registrar_historico(self, caminho_repo, nome_branch, modo, contexto_git, uso, inicio, nota=None, criterios=None, repo_historico=None):
+        """
+        Grava a execução no histórico local (codewise_lib/historico.py).
+        O repositório registrado é 'repo_historico' quando informado (ex: origem do clone temporário do servidor).
+        """
+        try:
+            email_dev = subprocess.check_output(['git', '-C', caminho_repo, 'config', 'user.email'], text=True).strip()
+        except (subprocess.CalledProcessError, OSError):
+            email_dev = None
+        base_sha = resolver_sha(contexto_git.base_ref, caminho_repo) if contexto_git else None
+        head_sha = resolver_sha(contexto_git.head_ref if contexto_git else "HEAD", caminho_repo)
+        registrar_execucao(
+            repo_historico or os.path.abspath(caminho_repo), modo, branch=nome_branch, base_sha=base_sha, head_sha=head_sha,
+            email_dev=email_dev, nota=nota, criterios=criterios, tokens_prompt=uso[0], tokens_resposta=uso[1],
+            duracao=round(time.monotonic() - inicio, 3),
+        )
+
+    def _consolidar_achados(self, caminho_repo, nome_branch, contexto_git, texto, anterior, blobs, reanalisados):
+        """
+        Separa os achados do resumo executivo, junta os dos arquivos que ficaram fora da análise
+        (inalterados ou fora do intervalo) e grava a análise da branch para a próxima execução
+        (codewise_lib/achados.py).
+
+        Returns:
+            str: Resumo seguido da seção de achados da revisão atual
+        """
+        resumo, novos = separar_achados(texto.replace('`', ''))
+        if novos is None:
+            #tarefa de resumo personalizada, sem a seção de achados: o texto segue como veio
+            return texto
+        achados = combinar_achados(novos, anterior, reanalisados)
+        if analise_incremental_ativa():
+            salvar_analise_branch(caminho_repo, nome_branch, {
+                "head": resolver_sha(contexto_git.head_ref, caminho_repo),
+                #arquivos de pushes anteriores seguem com o blob da última vez em que foram analisados
+                "blobs": {**(anterior.get("blobs") or {}), **blobs},
+                "resumo": resumo,
+                "achados": achados,
+            })
+        return f"{resumo}\n\n{formatar_achados(achados)}"
+
+    def executar(self, caminho_repo: str, nome_branch: str, modo: str, base_ref: str = None, head_ref: str = None, notificar: bool = True, liberacao=None, repo_historico: str = None):
         """
         Executa a análise de código no modo especificado.
         
@@ -29,20 +115,32 @@ class CodewiseRunner:
             caminho_repo: Caminho para o repositório Git
             nome_branch: Nome da branch a ser analisada
             modo: Modo de operação ('lint', 'titulo', 'descricao', 'analise', 'lgpd_verify')
+            base_ref: Referência base fixa do intervalo (opcional, usada na execução em segundo plano)
+            head_ref: Referência final fixa do intervalo (opcional)
+            notificar: Se False, não envia a avaliação de código ao gestor
+            liberacao: Função chamada depois de coletar o contexto e montar as crews e antes da
+                primeira chamada ao LLM (ex: aguardar o consentimento LGPD do hook)
+            repo_historico: Repositório gravado no histórico no lugar de 'caminho_repo' (opcional)
+            
+        Returns:
+            str: Resultado final exibido no terminal
         """
 
-        caminho_dir_lgpd = os.path.join(caminho_repo, "analises-julgamento-lgpd")
-        policy_file_path = os.path.join(caminho_dir_lgpd, "analise_politica_coleta_de_dados.md")
-        lgpd_judge_file_path = os.path.join(caminho_dir_lgpd, "julgamento_lgpd.md")
-
 
         if(modo == 'lgpd_verify'):
+            #o julgamento fica no cache do usuário, por provedor+modelo, e vale para todos os repositórios
+            load_dotenv()
+            caminho_dir_lgpd, policy_file_path, lgpd_judge_file_path = obter_caminhos_cache_lgpd()
             if not(verifica_se_existe_analise_lgpd(policy_file_path, lgpd_judge_file_path)):
                 print("Iniciando análise e julgamento LGPD...",file=sys.stderr)
                 verify_lgpd(caminho_dir_lgpd, policy_file_path, lgpd_judge_file_path)
             return 0
 
+        inicio = time.monotonic()
+        uso = [0, 0]
+        nota, criterios = None, None
         contexto_para_ia = ""
+        contexto_git = None
         if modo == 'lint':
             resultado_git = obter_mudancas_staged(caminho_repo)
             
@@ -56,29 +154,78 @@ class CodewiseRunner:
             
             contexto_para_ia = resultado_git
         else:
-            if not gerar_entrada_automatica(caminho_repo, self.caminho_entrada, nome_branch):
+            try:
+                contexto_git = obter_contexto_git(caminho_repo, nome_branch, base_ref, head_ref)
+            except Exception as e:
+                print(f"Ocorreu um erro inesperado ao coletar as mudanças: {e}", file=sys.stderr)
+                contexto_git = None
+            if contexto_git is None:
                 sys.exit(0)
-            contexto_para_ia = self._ler_arquivo(self.caminho_entrada)
+            contexto_para_ia = contexto_git.texto_compacto()
+
+        estrutura = ""
+        anterior, blobs, inalterados = {}, {}, []
+        if modo == 'analise':
+            #arquivos com o mesmo conteúdo da última análise da branch não voltam ao LLM; os achados deles são mantidos
+            if analise_incremental_ativa():
+                anterior = carregar_analise_branch(caminho_repo, nome_branch)
+                blobs = blobs_alterados(caminho_repo, contexto_git.head_ref, [a.caminho for a in contexto_git.arquivos])
+                inalterados = arquivos_inalterados(anterior, blobs)
+            alterados = [a for a in contexto_git.arquivos if a.caminho not in inalterados]
+
+            if inalterados and not alterados and anterior.get("resumo"):
+                if liberacao:
+                    liberacao()
+                print("♻️ Nenhum arquivo mudou desde a última análise desta branch; resumo e achados reaproveitados.", file=sys.stderr)
+                resultado_texto = f"{anterior['resumo']}\n\n{formatar_achados(anterior.get('achados') or [])}"
+                print(resultado_texto)
+                self._registrar_historico(caminho_repo, nome_branch, modo, contexto_git, uso, inicio, repo_historico=repo_historico)
+                return resultado_texto
+
+            if inalterados:
+                print(f"♻️ {len(inalterados)} arquivo(s) sem mudança desde a última análise desta branch ficam fora da análise técnica.", file=sys.stderr)
+                contexto_analise = GitContext(caminho_repo, contexto_git.base_ref, contexto_git.head_ref, contexto_git.commits, alterados, contexto_git.commits_detalhados)
+                contexto_para_ia = anotar_arquivos_mantidos(contexto_analise.texto_compacto(), inalterados)
+
+            #vizinhança dos arquivos alterados no índice local do repositório (só Git, nada sai da máquina)
+            estrutura = contexto_estrutura(caminho_repo, contexto_git.head_ref, [a.caminho for a in alterados])
+
+        if modo in ('titulo', 'descricao'):
+            #gerador local determinístico: resposta imediata ('local') ou rascunho para o LLM ('refinar')
+            modo_textos = modo_textos_pr()
+            rascunho = gerar_titulo_local(contexto_git) if modo == 'titulo' else gerar_descricao_local(contexto_git)
+            if modo_textos == 'local':
+                print(rascunho)
+                self._registrar_historico(caminho_repo, nome_branch, modo, contexto_git, uso, inicio, repo_historico=repo_historico)
+                return rascunho
+            if modo_textos == 'refinar':
+                contexto_para_ia = anexar_rascunho(contexto_para_ia, rascunho)
         
-        codewise_instance = Codewise(commit_message=contexto_para_ia)
+        codewise_instance = self.obter_codewise(caminho_repo)
+        codewise_instance.commit_message = contexto_para_ia
+
+        if liberacao:
+            #contexto e crews já estão prontos; nada é enviado ao provedor antes da liberação
+            liberacao()
         resultado_final = ""
 
 
         if modo == 'titulo':
-            agent = codewise_instance.summary_specialist()
-            task = Task(description=f"Crie um título de PR conciso no padrão Conventional Commits para as seguintes mudanças. A resposta deve ser APENAS o título, **obrigatoriamente em Português do Brasil**, sem aspas, acentos graves ou qualquer outro texto:\n{contexto_para_ia}", expected_output="Um único título de PR.", agent=agent)
-            resultado_final = Crew(agents=[agent], tasks=[task]).kickoff()
+            resultado_final = self._kickoff(codewise_instance.titulo_crew(), uso, {'input': contexto_para_ia})
 
 
         elif modo == 'descricao':
-            agent = codewise_instance.summary_specialist()
-            task = Task(description=f"Crie uma descrição de um parágrafo **obrigatoriamente em Português do Brasil** para um Pull Request para as seguintes mudanças:\n{contexto_para_ia}", expected_output="Um único parágrafo de texto.", agent=agent)
-            resultado_final = Crew(agents=[agent], tasks=[task]).kickoff()
+            resultado_final = self._kickoff(codewise_instance.descricao_crew(), uso, {'input': contexto_para_ia})
 
 
         elif modo == 'analise':
-            analysis_crew = codewise_instance.crew()
-            analysis_crew.kickoff(inputs={'input': contexto_para_ia})
+            #com o orçamento do hook no fim, a análise nem começa; o hook publica sem ela
+            if not cabe_no_prazo(tempo_limite_llm()):
+                print("⏱️ Orçamento de tempo esgotado antes da análise técnica; etapa ignorada.", file=sys.stderr)
+                return ""
+
+            analysis_crew = codewise_instance.analise_crew()
+            self._kickoff(analysis_crew, uso, {'input': contexto_para_ia, 'estrutura': estrutura})
 
             print("Salvando relatórios de análise individuais...", file=sys.stderr)
 
@@ -108,92 +255,77 @@ class CodewiseRunner:
                         except Exception as e:
                             print(f"   - ERRO ao salvar o arquivo '{filename}': {e}", file=sys.stderr)
             
-            resumo_agent = codewise_instance.summary_specialist()
-            resumo_task = Task(
-                description="Com base no contexto da análise completa fornecida, crie um 'Resumo Executivo do Pull Request' **obrigatoriamente em Português do Brasil**, bem formatado em markdown, com 3-4 bullet points detalhados.",
-                expected_output="Um resumo executivo em markdown.",
-                agent=resumo_agent,
-                context=analysis_crew.tasks
-            )
-            resultado_final = Crew(agents=[resumo_agent], tasks=[resumo_task]).kickoff()
-
-            mentor_agent = codewise_instance.code_mentor()
-            mentor_task = Task(
-                description="Com base nas análises técnicas realizadas, comente e sugira recursos educacionais personalizados com base nas mudanças **obrigatoriamente em Português do Brasil**, bem formatado em markdown, com links que possuam conteúdo para melhorar o código.",
-                expected_output="Sugestões de melhoria.",
-                agent=mentor_agent,
-                context=analysis_crew.tasks
-            )
-            resultado_mentor = Crew(agents=[mentor_agent],tasks=[mentor_task]).kickoff()
-            mentor_file_path = os.path.join(output_dir_path, "sugestoes_aprendizado.md")
-            try:
-                with open(mentor_file_path, "w", encoding="utf-8") as f:
-                    f.write(str(resultado_mentor))
-                    print(f"   - Arquivo 'sugestoes_aprendizado.md' salvo com sucesso em '{output_dir_path}'.", file=sys.stderr)
-            except Exception as e:
-                print(f"   - ERRO ao salvar o arquivo 'sugestoes_aprendizado.md': {e}", file=sys.stderr)
-            
+            #a tarefa de resumo tem como contexto as quatro análises técnicas que acabaram de rodar
+            resultado_final = self._kickoff(codewise_instance.resumo_crew(), uso)
+            resultado_final = self._consolidar_achados(caminho_repo, nome_branch, contexto_git, str(resultado_final), anterior, blobs, [a.caminho for a in alterados])
+
+            #mentoria e avaliação são as primeiras etapas descartadas quando o orçamento do hook acaba;
+            #cada uma só começa se ainda couber uma chamada inteira ao LLM
+            if cabe_no_prazo(tempo_limite_llm()):
+                mentoria_crew = codewise_instance.mentoria_crew()
+                self._kickoff(mentoria_crew, uso)
+                resultado_mentor = mentoria_crew.tasks[0].output
+                mentor_file_path = os.path.join(output_dir_path, "sugestoes_aprendizado.md")
+                try:
+                    with open(mentor_file_path, "w", encoding="utf-8") as f:
+                        f.write(str(resultado_mentor))
+                        print(f"   - Arquivo 'sugestoes_aprendizado.md' salvo com sucesso em '{output_dir_path}'.", file=sys.stderr)
+                except Exception as e:
+                    print(f"   - ERRO ao salvar o arquivo 'sugestoes_aprendizado.md': {e}", file=sys.stderr)
+            else:
+                print("⏱️ Orçamento de tempo insuficiente: mentoria ignorada.", file=sys.stderr)
 
             #avaliação de código e notificação para o gestor
-            print("\n🔍 Gerando avaliação de código...", file=sys.stderr)
-            #coleta de dados git para análise
-            try:
-                dados_git = coletar_dados_git(caminho_repo, commits_limit=3)
+            if not cabe_no_prazo(tempo_limite_llm()):
+                print("⏱️ Orçamento de tempo insuficiente: avaliação de código e notificação ignoradas.", file=sys.stderr)
+            else:
+                print("\n🔍 Gerando avaliação de código...", file=sys.stderr)
+                #reaproveita o mesmo contexto (intervalo do push) já usado na análise
+                try:
+                    dados_git = montar_dados_avaliacao(contexto_git)
                 
-                if "Erro" not in dados_git:
-                    code_review_crew = codewise_instance.code_review_crew()
+                    if contexto_git.arquivos:
+                        code_review_crew = codewise_instance.code_review_crew()
                     
-                    code_review_crew.kickoff(inputs={'input': dados_git})
+                        self._kickoff(code_review_crew, uso, {'input': dados_git})
                     
-                    resultado_review = code_review_crew.tasks[0].output
-                    review_file_path = os.path.join(output_dir_path, "avaliacao_codigo.md")
+                        resultado_review = code_review_crew.tasks[0].output
+                        review_file_path = os.path.join(output_dir_path, "avaliacao_codigo.md")
                     
-                    with open(review_file_path, "w", encoding="utf-8") as f:
-                        f.write(str(resultado_review))
+                        with open(review_file_path, "w", encoding="utf-8") as f:
+                            f.write(str(resultado_review))
                     
-                    print(f"   - Arquivo 'avaliacao_codigo.md' salvo com sucesso.", file=sys.stderr)
-
-                    #obtenção do email do desenvolvedor
-                    try:
-                        import subprocess
-                        email_dev = subprocess.check_output(
-                            ['git', '-C', caminho_repo, 'config', 'user.email'],
-                            text=True
-                        ).strip()
-                    except:
-                        email_dev = "desconhecido"
+                        print(f"   - Arquivo 'avaliacao_codigo.md' salvo com sucesso.", file=sys.stderr)
+
+                        #nota e breakdown também vão para o histórico local
+                        nota, breakdown = extrair_nota_e_justificativa(review_file_path)
+                        criterios = extrair_criterios(breakdown)
+
+                        #obtenção do email do desenvolvedor
+                        try:
+                            email_dev = subprocess.check_output(
+                                ['git', '-C', caminho_repo, 'config', 'user.email'],
+                                text=True
+                            ).strip()
+                        except:
+                            email_dev = "desconhecido"
                     
-                    print("\n📤 Enviando avaliação para o gestor...", file=sys.stderr)
-                    processar_avaliacao_e_notificar(review_file_path, email_dev, caminho_repo)
+                        if notificar:
+                            print("\n📤 Enviando avaliação para o gestor...", file=sys.stderr)
+                            processar_avaliacao_e_notificar(review_file_path, email_dev, caminho_repo)
                     
-                else:
-                    print(f"   - Aviso: {dados_git}", file=sys.stderr)
+                    else:
+                        print("   - Aviso: Nenhuma mudança de código no intervalo para avaliar.", file=sys.stderr)
                     
-            except Exception as e:
-                print(f"   - Aviso: Não foi possível gerar avaliação de código: {str(e)}", file=sys.stderr)
+                except Exception as e:
+                    print(f"   - Aviso: Não foi possível gerar avaliação de código: {str(e)}", file=sys.stderr)
         
 
         elif modo == 'lint':
-            agent = codewise_instance.quality_consultant()
-            task = Task(description=f"Analise rapidamente as seguintes mudanças de código ('git diff') e aponte APENAS problemas óbvios ou code smells. A resposta deve ser **obrigatoriamente em Português do Brasil**. Seja conciso. Se não houver problemas, retorne 'Nenhum problema aparente detectado.'.\n\nCódigo a ser analisado:\n{contexto_para_ia}", expected_output="Uma lista curta em bullet points com sugestões, ou uma mensagem de que está tudo ok.", agent=agent)
-            resultado_final = Crew(agents=[agent], tasks=[task]).kickoff()
+            resultado_final = self._kickoff(codewise_instance.lint_crew(), uso, {'input': contexto_para_ia})
         
-        if os.path.exists(self.caminho_entrada):
-            os.remove(self.caminho_entrada)
+        resultado_texto = str(resultado_final).strip().replace('`', '')
+        print(resultado_texto)
+        self._registrar_historico(caminho_repo, nome_branch, modo, contexto_git, uso, inicio, nota, criterios, repo_historico)
+        return resultado_texto
 
-        print(str(resultado_final).strip().replace('`', ''))
-
-        
-    def _ler_arquivo(self, file_path: str) -> str:
-        """
-        Lê o conteúdo de um arquivo de texto.
-        
-        Args:
-            file_path: Caminho do arquivo a ser lido
-            
-        Returns:
-            str: Conteúdo do arquivo ou string vazia se não encontrado
-        """
-        try:
-            with open(file_path, "r", encoding="utf-8") as f: return f.read()
-        except FileNotFoundError: return ""
@@ -0,0 +1,435 @@
+import os
+import re
+import ast
+import sys
+import subprocess
+from bisect import bisect_left
+
+# ===================================================================
+# RESUMO SEMÂNTICO DO DIFF (AST) PARA ENCOLHER O CONTEXTO DA IA
+# ===================================================================
+
+#arquivos maiores que isso ficam só com os trechos do diff
+LIMITE_BYTES_SEMANTICO = 512 * 1024
+
+_PADRAO_CABECALHO_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+#extensão -> função(fonte_antiga, fonte_nova) que devolve a análise ou None se não conseguir analisar
+_analisadores = {}
+
+
+def registrar_analisador(extensoes, analisador) -> None:
+    """
+    Registra o analisador semântico de uma linguagem.
+
+    O analisador recebe o conteúdo antigo e o novo do arquivo (str ou None se não existir
+    naquele lado) e devolve None, se não conseguir interpretar, ou um dict com:
+        "resumo": list de linhas descrevendo as mudanças semânticas
+        "faixas_novas": list de (inicio, fim) de linhas da versão nova com mudança de lógica
+        "faixas_antigas": list de (inicio, fim) de linhas da versão antiga com mudança de lógica
+        "arquivo_inteiro": True (opcional) se o arquivo foi criado ou removido
+
+    Args:
+        extensoes: Extensões atendidas (ex: ('.py', '.pyi'))
+        analisador: Função com a assinatura acima
+    """
+    for extensao in extensoes:
+        _analisadores[extensao.lower()] = analisador
+
+
+def analisador_para(caminho: str):
+    """
+    Returns:
+        função ou None: Analisador registrado para a extensão do arquivo
+    """
+    return _analisadores.get(os.path.splitext(caminho)[1].lower())
+
+
+# ===================================================================
+# PYTHON
+# ===================================================================
+
+def _inicio_definicao(no) -> int:
+    """
+    Returns:
+        int: Primeira linha da definição, contando os decorators
+    """
+    return min([no.lineno] + [d.lineno for d in no.decorator_list])
+
+
+def _definicoes_python(arvore) -> dict:
+    """
+    Mapeia funções, classes e métodos pelo nome qualificado ('Classe.metodo').
+    Funções aninhadas fazem parte do corpo de quem as contém.
+
+    Returns:
+        dict: {nome: {"tipo", "assinatura", "decoradores", "corpo", "faixa", "faixas_corpo", "pai"}}
+    """
+    definicoes = {}
+
+    def visitar(nos, prefixo, tipo_funcao):
+        for no in nos:
+            if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                prefixo_async = "async " if isinstance(no, ast.AsyncFunctionDef) else ""
+                retorno = f" -> {ast.unparse(no.returns)}" if no.returns else ""
+                definicoes[prefixo + no.name] = {
+                    "tipo": tipo_funcao,
+                    "assinatura": f"{prefixo_async}def {no.name}({ast.unparse(no.args)}){retorno}",
+                    "decoradores": [ast.dump(d) for d in no.decorator_list],
+                    #sem posições: formatação, comentários e linhas em branco não mudam o dump
+                    "corpo": ast.dump(ast.Module(body=no.body, type_ignores=[])),
+                    "faixa": (_inicio_definicao(no), no.end_lineno),
+                    "faixas_corpo": [(_inicio_definicao(no), no.end_lineno)],
+                    "pai": prefixo,
+                }
+            elif isinstance(no, ast.ClassDef):
+                bases = [ast.unparse(b) for b in no.bases] + [ast.unparse(k) for k in no.keywords]
+                proprios = [s for s in no.body if not isinstance(s, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+                definicoes[prefixo + no.name] = {
+                    "tipo": "classe",
+                    "assinatura": f"class {no.name}({', '.join(bases)})" if bases else f"class {no.name}",
+                    "decoradores": [ast.dump(d) for d in no.decorator_list],
+                    #o corpo próprio da classe exclui os métodos, comparados um a um
+                    "corpo": ast.dump(ast.Module(body=proprios, type_ignores=[])),
+                    "faixa": (_inicio_definicao(no), no.end_lineno),
+                    "faixas_corpo": [(s.lineno, s.end_lineno) for s in proprios],
+                    "pai": prefixo,
+                }
+                visitar(no.body, f"{prefixo}{no.name}.", "método")
+
+    visitar(arvore.body, "", "função")
+    return definicoes
+
+
+def _modulo_python(arvore) -> tuple:
+    """
+    Returns:
+        tuple: (set de imports normalizados, list de (dump, faixa) das demais instruções de módulo)
+    """
+    imports = set()
+    instrucoes = []
+    for no in arvore.body:
+        if isinstance(no, (ast.Import, ast.ImportFrom)):
+            imports.add(ast.unparse(no))
+        elif not isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            instrucoes.append((ast.dump(no), (no.lineno, no.end_lineno)))
+    return imports, instrucoes
+
+
+def _fora_de_ordem(nomes_antigos: list, nomes_novos: list) -> list:
+    """
+    Encontra as definições movidas: as que ficam fora da maior sequência que manteve a ordem.
+
+    Returns:
+        list: Nomes que mudaram de posição
+    """
+    posicao_nova = {nome: i for i, nome in enumerate(nomes_novos)}
+    sequencia = [posicao_nova[n] for n in nomes_antigos]
+    #maior subsequência crescente (O(n log n)) com reconstrução pelos predecessores
+    finais, indices_finais, anteriores = [], [], [None] * len(sequencia)
+    for i, valor in enumerate(sequencia):
+        pos = bisect_left(finais, valor)
+        anteriores[i] = indices_finais[pos - 1] if pos else None
+        if pos == len(finais):
+            finais.append(valor)
+            indices_finais.append(i)
+        else:
+            finais[pos] = valor
+            indices_finais[pos] = i
+    mantidos = set()
+    i = indices_finais[-1] if indices_finais else None
+    while i is not None:
+        mantidos.add(nomes_antigos[i])
+        i = anteriores[i]
+    return [n for n in nomes_antigos if n not in mantidos]
+
+
+def analisar_python(fonte_antiga, fonte_nova):
+    """
+    Compara as duas versões de um arquivo Python pela AST.
+
+    Args:
+        fonte_antiga: Conteúdo antes da mudança (None se o arquivo foi criado)
+        fonte_nova: Conteúdo depois da mudança (None se o arquivo foi removido)
+
+    Returns:
+        dict ou None: Análise no formato de 'registrar_analisador', None se alguma versão não compilar
+    """
+    try:
+        arvore_antiga = ast.parse(fonte_antiga) if fonte_antiga is not None else ast.Module(body=[], type_ignores=[])
+        arvore_nova = ast.parse(fonte_nova) if fonte_nova is not None else ast.Module(body=[], type_ignores=[])
+    except (SyntaxError, ValueError):
+        return None
+
+    antigas, novas = _definicoes_python(arvore_antiga), _definicoes_python(arvore_nova)
+    resumo, faixas_novas, faixas_antigas = [], [], []
+
+    if fonte_antiga is None or fonte_nova is None:
+        #arquivo criado ou removido: a lista de definições resume, os trechos ficam como estão
+        lado, verbo = (novas, "criado") if fonte_antiga is None else (antigas, "removido")
+        resumo.append(f"arquivo {verbo}" + (f"; define: {', '.join(f'`{n}`' for n in lado)}" if lado else ""))
+        return {"resumo": resumo, "faixas_novas": [(1, 10 ** 9)], "faixas_antigas": [(1, 10 ** 9)], "arquivo_inteiro": True}
+
+    removidas = [n for n in antigas if n not in novas]
+    adicionadas = [n for n in novas if n not in antigas]
+
+    #mesmo corpo com outro nome no mesmo nível: renomeação, não remoção + criação
+    renomeadas = []
+    for nome in list(adicionadas):
+        par = next((r for r in removidas if antigas[r]["tipo"] == novas[nome]["tipo"]
+                    and antigas[r]["pai"] == novas[nome]["pai"] and antigas[r]["corpo"] == novas[nome]["corpo"]), None)
+        if par:
+            renomeadas.append(f"`{par}` → `{nome}`")
+            removidas.remove(par)
+            adicionadas.remove(nome)
+
+    for nome in adicionadas:
+        faixas_novas.append(novas[nome]["faixa"])
+    for nome in removidas:
+        faixas_antigas.append(antigas[nome]["faixa"])
+
+    comuns = [n for n in antigas if n in novas]
+    assinaturas, com_logica = [], []
+    for nome in comuns:
+        antiga, nova = antigas[nome], novas[nome]
+        if antiga["assinatura"] != nova["assinatura"] or antiga["decoradores"] != nova["decoradores"]:
+            assinaturas.append(f"`{nome}`")
+            faixas_novas.append((nova["faixa"][0], nova["faixa"][0]))
+            faixas_antigas.append((antiga["faixa"][0], antiga["faixa"][0]))
+        if antiga["corpo"] != nova["corpo"]:
+            com_logica.append(f"`{nome}`")
+            faixas_novas.extend(nova["faixas_corpo"])
+            faixas_antigas.extend(antiga["faixas_corpo"])
+
+    #ordem comparada entre irmãos (mesmo pai), para um método movido não acusar a classe inteira
+    movidas = []
+    for pai in sorted({antigas[n]["pai"] for n in comuns}):
+        irmaos_antigos = [n for n in comuns if antigas[n]["pai"] == pai]
+        irmaos_novos = sorted(irmaos_antigos, key=lambda n: novas[n]["faixa"][0])
+        movidas.extend(f"`{n}`" for n in _fora_de_ordem(irmaos_antigos, irmaos_novos))
+
+    if adicionadas:
+        resumo.append("+ adicionadas: " + ", ".join(f"`{n}`" for n in adicionadas))
+    if removidas:
+        resumo.append("- removidas: " + ", ".join(f"`{n}`" for n in removidas))
+    if renomeadas:
+        resumo.append("~ renomeadas (mesmo conteúdo): " + ", ".join(renomeadas))
+    if assinaturas:
+        resumo.append("~ assinatura alterada: " + ", ".join(assinaturas))
+    if com_logica:
+        resumo.append("~ lógica alterada: " + ", ".join(com_logica))
+    if movidas:
+        resumo.append("↕ movidas de posição: " + ", ".join(movidas))
+
+    imports_antigos, instrucoes_antigas = _modulo_python(arvore_antiga)
+    imports_novos, instrucoes_novas = _modulo_python(arvore_nova)
+    if imports_novos - imports_antigos:
+        resumo.append("+ imports: " + "; ".join(f"`{i}`" for i in sorted(imports_novos - imports_antigos)))
+    if imports_antigos - imports_novos:
+        resumo.append("- imports: " + "; ".join(f"`{i}`" for i in sorted(imports_antigos - imports_novos)))
+
+    dumps_antigos = [d for d, _ in instrucoes_antigas]
+    dumps_novos = [d for d, _ in instrucoes_novas]
+    alteradas = [faixa for d, faixa in instrucoes_novas if d not in dumps_antigos]
+    retiradas = [faixa for d, faixa in instrucoes_antigas if d not in dumps_novos]
+    if alteradas or retiradas:
+        resumo.append(f"~ código de módulo: {len(alteradas)} instrução(ões) nova(s) ou alterada(s), {len(retiradas)} removida(s)")
+        faixas_novas.extend(alteradas)
+        faixas_antigas.extend(retiradas)
+
+    if not resumo:
+        resumo.append("sem mudança de lógica (apenas formatação, comentários ou linhas em branco)")
+    return {"resumo": resumo, "faixas_novas": faixas_novas, "faixas_antigas": faixas_antigas}
+
+
+registrar_analisador((".py", ".pyi"), analisar_python)
+
+
+# ===================================================================
+# APLICAÇÃO AO CONTEXTO GIT
+# ===================================================================
+
+def _agrupar_hunks(linhas: list) -> list:
+    """
+    Returns:
+        list: Hunks como listas de linhas, cada uma começando pelo cabeçalho '@@'
+    """
+    grupos = []
+    for linha in linhas:
+        if linha.startswith("@@") or not grupos:
+            grupos.append([linha])
+        else:
+            grupos[-1].append(linha)
+    return grupos
+
+
+def _faixas_do_hunk(cabecalho: str):
+    """
+    Returns:
+        tuple ou None: ((inicio_antigo, fim_antigo), (inicio_novo, fim_novo)); lado vazio vira faixa de um ponto
+    """
+    match = _PADRAO_CABECALHO_HUNK.match(cabecalho)
+    if not match:
+        return None
+    inicio_a, qtd_a, inicio_n, qtd_n = match.groups()
+    qtd_a = int(qtd_a) if qtd_a is not None else 1
+    qtd_n = int(qtd_n) if qtd_n is not None else 1
+    return ((int(inicio_a), int(inicio_a) + max(qtd_a, 1) - 1), (int(inicio_n), int(inicio_n) + max(qtd_n, 1) - 1))
+
+
+def _sobrepoe(faixa, faixas) -> bool:
+    return any(faixa[0] <= fim and inicio <= faixa[1] for inicio, fim in faixas)
+
+
+def _filtrar_hunk(hunk: list, faixas_novas: list, faixas_antigas: list):
+    """
+    Mantém de um hunk só as linhas adicionadas/removidas dentro das faixas com mudança de lógica,
+    com uma linha de contexto em volta; o resto vira uma linha '... (N linha(s) ...)'.
+
+    Args:
+        hunk: Linhas do hunk, começando pelo cabeçalho '@@'
+        faixas_novas: Faixas com lógica alterada na versão nova
+        faixas_antigas: Faixas com lógica alterada na versão antiga
+
+    Returns:
+        list ou None: Linhas mantidas, None se o hunk não toca lógica alterada
+    """
+    faixas = _faixas_do_hunk(hunk[0])
+    if faixas is None:
+        return hunk
+    if not (_sobrepoe(faixas[1], faixas_novas) or _sobrepoe(faixas[0], faixas_antigas)):
+        return None
+    corpo = hunk[1:]
+    if any(not linha.startswith((" ", "+", "-", "\\")) for linha in corpo):
+        #hunk já aparado pelo limite de tamanho: sem a numeração completa, fica inteiro
+        return hunk
+
+    linha_antiga, linha_nova = faixas[0][0], faixas[1][0]
+    relevantes = []
+    for linha in corpo:
+        if linha.startswith("+"):
+            relevantes.append(_sobrepoe((linha_nova, linha_nova), faixas_novas))
+            linha_nova += 1
+        elif linha.startswith("-"):
+            relevantes.append(_sobrepoe((linha_antiga, linha_antiga), faixas_antigas))
+            linha_antiga += 1
+        else:
+            relevantes.append(False)
+            if linha.startswith(" "):
+                linha_antiga += 1
+                linha_nova += 1
+    if not any(relevantes):
+        return None
+
+    manter = [
+        relevante or (i > 0 and relevantes[i - 1]) or (i + 1 < len(relevantes) and relevantes[i + 1])
+        for i, relevante in enumerate(relevantes)
+    ]
+    mantidas, omitidas = [hunk[0]], 0
+    for linha, fica in zip(corpo, manter):
+        if fica:
+            if omitidas:
+                mantidas.append(f"... ({omitidas} linha(s) sem mudança de lógica omitida(s))")
+                omitidas = 0
+            mantidas.append(linha)
+        else:
+            omitidas += 1
+    if omitidas:
+        mantidas.append(f"... ({omitidas} linha(s) sem mudança de lógica omitida(s))")
+    return mantidas
+
+
+class LeitorBlobs:
+    """
+    Lê conteúdos de arquivos em revisões do Git por um único 'git cat-file --batch'.
+    """
+    def __init__(self, caminho_repo: str):
+        self.processo = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=caminho_repo,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+
+    def ler(self, revisao: str, caminho: str):
+        """
+        Args:
+            revisao: Commit ou referência (ex: SHA da base)
+            caminho: Caminho do arquivo na revisão
+
+        Returns:
+            str ou None: Conteúdo do arquivo, None se não existir, for grande demais ou não for texto
+        """
+        self.processo.stdin.write(f"{revisao}:{caminho}\n".encode("utf-8"))
+        self.processo.stdin.flush()
+        cabecalho = self.processo.stdout.readline().decode("utf-8", errors="replace").split()
+        if len(cabecalho) != 3:
+            #'<objeto> missing' ou 'ambiguous': o git não envia conteúdo
+            return None
+        tamanho = int(cabecalho[2])
+        if cabecalho[1] != "blob":
+            #árvore, submódulo etc.: o conteúdo vem mesmo assim e precisa ser consumido para não dessincronizar
+            self.processo.stdout.read(tamanho + 1)
+            return None
+        conteudo = self.processo.stdout.read(tamanho)
+        self.processo.stdout.read(1)
+        if tamanho > LIMITE_BYTES_SEMANTICO:
+            return None
+        try:
+            return conteudo.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+
+    def fechar(self) -> None:
+        try:
+            self.processo.stdin.close()
+        except OSError:
+            pass
+        self.processo.wait()
+
+
+def aplicar_diff_semantico(caminho_repo: str, base_ref: str, head_ref: str, arquivos: list) -> None:
+    """
+    Para cada arquivo de linguagem suportada, anexa o resumo semântico e mantém só as linhas
+    do diff que tocam lógica alterada; mudanças de formatação, imports reordenados e código
+    movido ficam descritos no resumo. Desative com CODEWISE_DIFF_SEMANTICO=0.
+
+    Args:
+        caminho_repo: Caminho para o repositório Git
+        base_ref: Referência base do intervalo
+        head_ref: Referência final do intervalo
+        arquivos: Lista de ArquivoAlterado, alterada no lugar
+    """
+    if os.getenv("CODEWISE_DIFF_SEMANTICO", "1") == "0":
+        return
+    alvos = [a for a in arquivos if not a.somente_estatistica() and analisador_para(a.caminho)]
+    if not alvos:
+        return
+
+    try:
+        leitor = LeitorBlobs(caminho_repo)
+    except OSError as e:
+        print(f"⚠️ Resumo semântico indisponível: {e}", file=sys.stderr)
+        return
+    try:
+        for arquivo in alvos:
+            antiga = leitor.ler(base_ref, arquivo.caminho)
+            nova = leitor.ler(head_ref, arquivo.caminho)
+            if antiga is None and nova is None:
+                continue
+            analise = analisador_para(arquivo.caminho)(antiga, nova)
+            if analise is None:
+                continue
+            if analise.get("arquivo_inteiro") and not arquivo.linhas_omitidas:
+                #arquivo criado/removido que coube inteiro: os trechos já dizem tudo
+                continue
+            arquivo.resumo_semantico = analise["resumo"]
+
+            mantidos = []
+            for hunk in _agrupar_hunks(arquivo.hunks):
+                filtrado = _filtrar_hunk(hunk, analise["faixas_novas"], analise["faixas_antigas"])
+                if filtrado is None:
+                    arquivo.trechos_sem_logica += 1
+                else:
+                    mantidos.extend(filtrado)
+            arquivo.hunks = mantidos
+    finally:
+        leitor.fechar()
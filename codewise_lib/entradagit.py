@@ -1,6 +1,8 @@
 import subprocess
 import os
 import sys
+from .contexto_git import GitContext, parsear_numstat, anexar_hunks, LINHAS_CONTEXTO_DIFF
+from .diff_semantico import aplicar_diff_semantico
 
 def run_git_command(command, repo_path):
     """
@@ -27,60 +29,198 @@ def run_git_command(command, repo_path):
         print("ERRO: O executável 'git' não foi encontrado. Verifique se o Git está instalado e no PATH.", file=sys.stderr)
         return None
 
-def gerar_entrada_automatica(caminho_repo, caminho_saida, nome_branch):
+def stream_git_command(command, repo_path, limite_bytes_linha=8192):
     """
-    Gera automaticamente o arquivo de entrada com commits e diffs para análise.
+    Executa um comando Git e entrega a saída linha a linha, sem carregar tudo em memória.
+    Linhas maiores que o limite (ex: arquivos minificados) são cortadas e o restante é descartado.
+    
+    Args:
+        command: Lista com o comando Git e seus argumentos
+        repo_path: Caminho do repositório onde executar o comando
+        limite_bytes_linha: Máximo de bytes lidos por linha
+        
+    Yields:
+        str: Cada linha da saída, sem a quebra de linha
+    """
+    try:
+        processo = subprocess.Popen(command, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        print("ERRO: O executável 'git' não foi encontrado. Verifique se o Git está instalado e no PATH.", file=sys.stderr)
+        return
+    try:
+        while True:
+            bloco = processo.stdout.readline(limite_bytes_linha)
+            if not bloco:
+                break
+            if not bloco.endswith(b"\n"):
+                #linha gigante: descarta o resto dela sem acumular
+                while True:
+                    resto = processo.stdout.readline(limite_bytes_linha)
+                    if not resto or resto.endswith(b"\n"):
+                        break
+            yield bloco.decode("utf-8", errors="replace").rstrip("\r\n")
+    finally:
+        if processo.poll() is None:
+            processo.kill()
+        processo.stdout.close()
+        processo.wait()
+
+def coletar_arquivos_alterados(caminho_repo, args_diff):
+    """
+    Coleta estatísticas e hunks aparados de um diff em streaming, com memória limitada.
     
     Args:
         caminho_repo: Caminho para o repositório Git
-        caminho_saida: Caminho onde salvar o arquivo de entrada gerado
-        nome_branch: Nome da branch a ser analisada
+        args_diff: Argumentos que definem o diff (ex: ['origin/main..feat'] ou ['--cached'])
+        
+    Returns:
+        list: Lista de ArquivoAlterado
+    """
+    #sem detecção de renomeação para os caminhos do numstat e do diff serem iguais
+    arquivos = parsear_numstat(stream_git_command(["git", "diff", "--numstat", "--no-renames", *args_diff], caminho_repo))
+    anexar_hunks(arquivos, stream_git_command(
+        ["git", "diff", f"--unified={LINHAS_CONTEXTO_DIFF}", "--no-renames", "--no-color", "--no-ext-diff", *args_diff],
+        caminho_repo
+    ))
+    return arquivos
+
+def git_tem_mudancas(args_diff, repo_path):
+    """
+    Verifica, sem gerar o diff, se há mudanças ('git diff --quiet' retorna 1).
+    
+    Args:
+        args_diff: Argumentos do diff (ex: ['--cached'])
+        repo_path: Caminho do repositório
         
     Returns:
-        bool: True se gerado com sucesso, False caso contrário
+        bool: True se houver mudanças
     """
     try:
+        return subprocess.run(["git", "diff", "--quiet", *args_diff], cwd=repo_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 1
+    except FileNotFoundError:
+        return False
+
+def obter_dir_codewise(repo_path):
+    """
+    Retorna o diretório de dados locais do CodeWise dentro do '.git' do repositório, criando se preciso.
+    
+    Args:
+        repo_path: Caminho do repositório
+        
+    Returns:
+        str ou None: Caminho de '.git/codewise', None se não for um repositório Git
+    """
+    git_dir = run_git_command(["git", "rev-parse", "--absolute-git-dir"], repo_path)
+    if not git_dir:
+        return None
+    dir_codewise = os.path.join(git_dir, "codewise")
+    os.makedirs(dir_codewise, exist_ok=True)
+    return dir_codewise
+
+def resolver_sha(ref, repo_path):
+    """
+    Resolve uma referência Git para o SHA completo do commit.
+    
+    Args:
+        ref: Referência a resolver (branch, ref remota ou SHA)
+        repo_path: Caminho do repositório
+        
+    Returns:
+        str: SHA do commit, ou a própria referência se não for possível resolver
+    """
+    sha = run_git_command(["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], repo_path)
+    return sha or ref
+
+def listar_arquivos_intervalo(caminho_repo, base_ref, head_ref):
+    """
+    Args:
+        caminho_repo: Caminho para o repositório Git
+        base_ref: Referência base do intervalo
+        head_ref: Referência final do intervalo
+
+    Returns:
+        list: Caminhos alterados em 'base..head', com os dois lados das renomeações (vazia se o Git falhar)
+    """
+    saida = run_git_command(["git", "diff", "--name-only", "--no-renames", f"{base_ref}..{head_ref}"], caminho_repo)
+    return saida.splitlines() if saida else []
+
+def resolver_intervalo(caminho_repo, nome_branch, buscar_remoto=True, branch_base=None):
+    """
+    Define o intervalo 'base..head' analisado: desde o último push da branch ou desde a branch principal remota.
+    
+    Args:
+        caminho_repo: Caminho para o repositório Git
+        nome_branch: Nome da branch a ser analisada
+        buscar_remoto: Se True, executa 'git fetch' antes de resolver o intervalo
+        branch_base: Branch de destino do PR (opcional); sem ela, a branch padrão do 'origin' em cache
+        
+    Returns:
+        tuple: (base_ref, head_ref) prontos para uso em 'git log'/'git diff'
+    """
+    if buscar_remoto:
         #busca alguma alteração que tiver na branch remota
         print("🔄 Buscando atualizações do repositório remoto...", file=sys.stderr)
         run_git_command(["git", "fetch", "origin", "--prune"], caminho_repo)
 
-        #define a branch remota a ser comparada já verificando se existe
-        branch_remota_str = f'origin/{nome_branch}'
-        remote_branch_exists = run_git_command(["git", "show-ref", "--verify", f"refs/remotes/{branch_remota_str}"], caminho_repo)
-        
-        default_branch_name = "main"
-        base_ref_str = f'origin/{default_branch_name}'
-
-        if remote_branch_exists:
-            base_ref_str = branch_remota_str
-            print(f"✅ Branch '{nome_branch}' já existe no remote. Analisando novos commits desde o último push.", file=sys.stderr)
-        else:
-            print(f"✅ Branch '{nome_branch}' é nova. Comparando com a branch principal remota ('{default_branch_name}').", file=sys.stderr)
-
-        #pega a lista de commits
-        range_commits = f"{base_ref_str}..{nome_branch}"
-        log_commits = run_git_command(["git", "log", "--pretty=format:- %s", range_commits], caminho_repo)
+    #define a branch remota a ser comparada já verificando se existe
+    branch_remota_str = f'origin/{nome_branch}'
+    remote_branch_exists = run_git_command(["git", "show-ref", "--verify", f"refs/remotes/{branch_remota_str}"], caminho_repo)
+    
+    #o pre-push informa a base do PR, que pode vir do 'upstream'; sem ela, a branch padrão do 'origin' em cache
+    if branch_base:
+        default_branch_name = branch_base
+    else:
+        from .metadados_repo import obter_branch_padrao
+        default_branch_name = obter_branch_padrao(caminho_repo, "origin")
+    base_ref_str = f'origin/{default_branch_name}'
+
+    if remote_branch_exists:
+        base_ref_str = branch_remota_str
+        print(f"✅ Branch '{nome_branch}' já existe no remote. Analisando novos commits desde o último push.", file=sys.stderr)
+    else:
+        print(f"✅ Branch '{nome_branch}' é nova. Comparando com a branch principal remota ('{default_branch_name}').", file=sys.stderr)
+
+    return base_ref_str, nome_branch
+
+def obter_contexto_git(caminho_repo, nome_branch, base_ref=None, head_ref=None):
+    """
+    Coleta commits e mudanças da branch e monta o contexto compacto compartilhado pelas tarefas.
+    
+    Args:
+        caminho_repo: Caminho para o repositório Git
+        nome_branch: Nome da branch a ser analisada
+        base_ref: Referência base fixa do intervalo (opcional, ex: SHA registrado no pre-push)
+        head_ref: Referência final fixa do intervalo (opcional, padrão: a própria branch)
         
-        if not log_commits:
-            print("Nenhum commit novo para analisar foi encontrado.", file=sys.stderr)
-            return False
-            
-        commits_pendentes = log_commits.splitlines()
-
-        #pega o diff completo dos commits 
-        diff_completo = run_git_command(["git", "diff", f"{base_ref_str}..{nome_branch}"], caminho_repo)
+    Returns:
+        GitContext ou None: Contexto das mudanças, None se não houver commits novos
+    """
+    if base_ref:
+        base_ref_str = base_ref
+        head_ref = head_ref or nome_branch
+        print(f"✅ Analisando o intervalo informado '{base_ref_str}..{head_ref}'.", file=sys.stderr)
+    else:
+        base_ref_str, head_ref = resolver_intervalo(caminho_repo, nome_branch)
+
+    #pega a lista de commits
+    range_commits = f"{base_ref_str}..{head_ref}"
+    log_commits = run_git_command(["git", "log", "--pretty=format:%H%x1f%an%x1f%ae%x1f%ad%x1f%s", "--date=iso", range_commits], caminho_repo)
+    
+    if not log_commits:
+        print("Nenhum commit novo para analisar foi encontrado.", file=sys.stderr)
+        return None
         
-        #monta o texto final para o arquivo de entrada
-        entrada = [f"Analisando {len(commits_pendentes)} novo(s) commit(s).\n\nMensagens de commit:\n"]
-        entrada.extend(commits_pendentes)
-        entrada.append(f"\n{'='*80}\nDiferenças de código consolidadas a serem analisadas:\n{diff_completo}")
-
-        with open(caminho_saida, "w", encoding="utf-8") as arquivo_saida:
-            arquivo_saida.write("\n".join(entrada))
-        return True
-    except Exception as e:
-        print(f"Ocorreu um erro inesperado em 'entradagit.py': {e}", file=sys.stderr)
-        return False
+    commits_detalhados = [linha.split("\x1f", 4) for linha in log_commits.splitlines()]
+    commits_pendentes = [c[-1] for c in commits_detalhados]
+
+    #estatísticas por arquivo e diff com contexto reduzido, lidos em streaming
+    arquivos = coletar_arquivos_alterados(caminho_repo, [range_commits])
+    #troca reformatações, imports reordenados e código movido por um resumo semântico
+    aplicar_diff_semantico(caminho_repo, base_ref_str, head_ref, arquivos)
+
+    contexto = GitContext(caminho_repo, base_ref_str, head_ref, commits_pendentes, arquivos, commits_detalhados)
+    print(f"📦 Contexto compacto: {len(arquivos)} arquivo(s), {len(contexto.texto_compacto())} caracteres.", file=sys.stderr)
+    return contexto
 
 def obter_mudancas_staged(repo_path="."):
     """
@@ -90,17 +230,16 @@ def obter_mudancas_staged(repo_path="."):
         repo_path: Caminho para o repositório Git (padrão: diretório atual)
         
     Returns:
-        str ou None: Diff das mudanças staged, mensagem de aviso, ou None se não houver mudanças
+        str ou None: Mudanças staged em formato compacto, mensagem de aviso, ou None se não houver mudanças
     """
     try:
         #verifica a área de stage
-        diff_staged = run_git_command(["git", "diff", "--cached"], repo_path)
-        if diff_staged:
-            return diff_staged
+        if git_tem_mudancas(["--cached"], repo_path):
+            arquivos = coletar_arquivos_alterados(repo_path, ["--cached"])
+            return GitContext(repo_path, "HEAD", "index", [], arquivos).texto_compacto(incluir_commits=False)
 
         #se não tiver nada na staging area, verifica se tem mudanças no working dir
-        diff_working_dir = run_git_command(["git", "diff"], repo_path)
-        if diff_working_dir:
+        if git_tem_mudancas([], repo_path):
             return "AVISO: Nenhuma mudança na 'staging area', mas existem modificações não adicionadas.\nUse 'git add <arquivo>' para prepará-las para a análise."
 
         #se ambos estiverem limpos, retorna None
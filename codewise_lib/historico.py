@@ -0,0 +1,220 @@
+import os
+import re
+import sys
+import time
+import sqlite3
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from .cache_usuario import obter_dir_cache_usuario
+
+# ===================================================================
+# HISTÓRICO LOCAL DAS EXECUÇÕES (SQLite, SOMENTE INCLUSÃO)
+# ===================================================================
+
+ARQUIVO_HISTORICO = "historico.sqlite3"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    criado_em REAL NOT NULL,
+    repo TEXT NOT NULL,
+    branch TEXT,
+    base_sha TEXT,
+    head_sha TEXT,
+    email_dev TEXT,
+    modo TEXT NOT NULL,
+    provedor TEXT,
+    modelo TEXT,
+    nota REAL,
+    tokens_prompt INTEGER,
+    tokens_resposta INTEGER,
+    duracao REAL
+);
+CREATE TABLE IF NOT EXISTS criterios (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    criterio TEXT NOT NULL,
+    pontos REAL,
+    maximo REAL
+);
+-- os índices cobrem as consultas do 'codewise-history' (período, por dev e por repositório)
+-- sem ler a tabela: médias por dev no mês saem só do índice de tempo
+CREATE INDEX IF NOT EXISTS idx_execucoes_tempo ON execucoes (criado_em, email_dev, repo, nota);
+CREATE INDEX IF NOT EXISTS idx_execucoes_dev ON execucoes (email_dev, criado_em, nota);
+CREATE INDEX IF NOT EXISTS idx_execucoes_repo ON execucoes (repo, criado_em, nota);
+CREATE INDEX IF NOT EXISTS idx_criterios_execucao ON criterios (execucao_id);
+CREATE TRIGGER IF NOT EXISTS execucoes_sem_update BEFORE UPDATE ON execucoes
+BEGIN SELECT RAISE(ABORT, 'histórico do CodeWise é somente de inclusão'); END;
+CREATE TRIGGER IF NOT EXISTS execucoes_sem_delete BEFORE DELETE ON execucoes
+BEGIN SELECT RAISE(ABORT, 'histórico do CodeWise é somente de inclusão'); END;
+CREATE TRIGGER IF NOT EXISTS criterios_sem_update BEFORE UPDATE ON criterios
+BEGIN SELECT RAISE(ABORT, 'histórico do CodeWise é somente de inclusão'); END;
+CREATE TRIGGER IF NOT EXISTS criterios_sem_delete BEFORE DELETE ON criterios
+BEGIN SELECT RAISE(ABORT, 'histórico do CodeWise é somente de inclusão'); END;
+"""
+
+#linhas do breakdown como '1. Qualidade do Código: 2.0/2.5' ou 'Boas Práticas - 1,5 pontos'
+_PADRAO_CRITERIO = re.compile(r"^(?:[-•]\s*)?(?:\d+[.)]\s*)?([^:\d][^:]*?)\s*(?:\(.*?\))?\s*[:\-–]\s*(\d+(?:[.,]\d+)?)(?:\s*/\s*(\d+(?:[.,]\d+)?))?")
+
+
+def caminho_historico() -> str:
+    """
+    Returns:
+        str: Caminho da base (CODEWISE_HISTORICO_DB ou '~/.cache/codewise/historico/historico.sqlite3')
+    """
+    load_dotenv()
+    return os.getenv("CODEWISE_HISTORICO_DB") or os.path.join(obter_dir_cache_usuario("historico"), ARQUIVO_HISTORICO)
+
+
+@contextmanager
+def conectar_historico(caminho: str = None):
+    """
+    Abre a base do histórico, criando o esquema se preciso. Confirma a transação ao sair.
+
+    Args:
+        caminho: Caminho da base (opcional, padrão: 'caminho_historico()')
+
+    Yields:
+        sqlite3.Connection: Conexão aberta
+    """
+    conexao = sqlite3.connect(caminho or caminho_historico(), timeout=30)
+    try:
+        #WAL: hooks, pré-cálculo e servidor gravam enquanto o CLI lê
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.executescript(_ESQUEMA)
+        with conexao:
+            yield conexao
+    finally:
+        conexao.close()
+
+
+def extrair_criterios(breakdown: str) -> list:
+    """
+    Converte o breakdown de pontos da avaliação em critérios.
+
+    Args:
+        breakdown: Texto do breakdown extraído do relatório de avaliação
+
+    Returns:
+        list: Tuplas (criterio, pontos, maximo ou None)
+    """
+    criterios = []
+    for linha in (breakdown or "").splitlines():
+        match = _PADRAO_CRITERIO.match(linha.strip())
+        if not match or "nota final" in match.group(1).lower():
+            continue
+        pontos = float(match.group(2).replace(",", "."))
+        maximo = float(match.group(3).replace(",", ".")) if match.group(3) else None
+        criterios.append((match.group(1).strip(), pontos, maximo))
+    return criterios
+
+
+def registrar_execucao(repo: str, modo: str, branch: str = None, base_sha: str = None, head_sha: str = None,
+                       email_dev: str = None, nota: float = None, criterios: list = None,
+                       tokens_prompt: int = None, tokens_resposta: int = None, duracao: float = None) -> None:
+    """
+    Acrescenta uma execução ao histórico. Falhas só geram aviso: o histórico nunca interrompe a análise.
+    Desative com CODEWISE_HISTORICO=0.
+
+    Args:
+        repo: Caminho absoluto do repositório
+        modo: Modo executado ('titulo', 'descricao', 'analise', 'lint')
+        branch: Branch analisada
+        base_sha: SHA da base do intervalo
+        head_sha: SHA do HEAD do intervalo
+        email_dev: Email do desenvolvedor
+        nota: Nota da avaliação de código (só no modo 'analise')
+        criterios: Tuplas (criterio, pontos, maximo) do breakdown da nota
+        tokens_prompt: Tokens enviados ao LLM na execução
+        tokens_resposta: Tokens gerados pelo LLM na execução
+        duracao: Duração da execução em segundos
+    """
+    if os.getenv("CODEWISE_HISTORICO", "1") == "0":
+        return
+    try:
+        with conectar_historico() as conexao:
+            cursor = conexao.execute(
+                "INSERT INTO execucoes (criado_em, repo, branch, base_sha, head_sha, email_dev, modo, provedor, modelo,"
+                " nota, tokens_prompt, tokens_resposta, duracao) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), repo, branch, base_sha, head_sha, email_dev, modo, os.getenv("AI_PROVIDER"), os.getenv("AI_MODEL"),
+                 nota, tokens_prompt, tokens_resposta, duracao),
+            )
+            if criterios:
+                conexao.executemany(
+                    "INSERT INTO criterios (execucao_id, criterio, pontos, maximo) VALUES (?, ?, ?, ?)",
+                    [(cursor.lastrowid, c, p, m) for c, p, m in criterios],
+                )
+    except sqlite3.Error as e:
+        print(f"⚠️ Não foi possível gravar o histórico da execução: {e}", file=sys.stderr)
+
+
+def _filtros(desde=None, ate=None, dev=None, repo=None, modo=None) -> tuple:
+    """
+    Returns:
+        tuple: (cláusula WHERE, parâmetros) na ordem que aproveita os índices
+    """
+    condicoes, parametros = [], []
+    if dev:
+        condicoes.append("email_dev = ?")
+        parametros.append(dev)
+    if repo:
+        condicoes.append("repo = ?")
+        parametros.append(repo)
+    if desde is not None:
+        condicoes.append("criado_em >= ?")
+        parametros.append(desde)
+    if ate is not None:
+        condicoes.append("criado_em < ?")
+        parametros.append(ate)
+    if modo:
+        condicoes.append("modo = ?")
+        parametros.append(modo)
+    return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", parametros
+
+
+def medias_por(agrupamento: str, conexao, **filtros) -> list:
+    """
+    Calcula a média das notas agrupada por desenvolvedor ou repositório.
+
+    Args:
+        agrupamento: 'dev' ou 'repo'
+        conexao: Conexão aberta com o histórico
+        filtros: desde/ate (epoch), dev, repo e modo
+
+    Returns:
+        list: Tuplas (grupo, média, avaliações, menor, maior), da maior média para a menor
+    """
+    coluna = {"dev": "email_dev", "repo": "repo"}[agrupamento]
+    where, parametros = _filtros(**filtros)
+    where = (where + " AND" if where else " WHERE") + " nota IS NOT NULL"
+    return conexao.execute(
+        f"SELECT {coluna}, AVG(nota), COUNT(*), MIN(nota), MAX(nota) FROM execucoes{where}"
+        f" GROUP BY {coluna} ORDER BY AVG(nota) DESC",
+        parametros,
+    ).fetchall()
+
+
+def medias_criterios(conexao, **filtros) -> list:
+    """
+    Returns:
+        list: Tuplas (criterio, média dos pontos, máximo, avaliações) no período e filtros informados
+    """
+    where, parametros = _filtros(**filtros)
+    return conexao.execute(
+        "SELECT c.criterio, AVG(c.pontos), MAX(c.maximo), COUNT(*) FROM criterios c"
+        f" JOIN (SELECT id FROM execucoes{where}) e ON e.id = c.execucao_id"
+        " GROUP BY c.criterio ORDER BY c.criterio",
+        parametros,
+    ).fetchall()
+
+
+def ultimas_execucoes(conexao, limite: int = 20, **filtros) -> list:
+    """
+    Returns:
+        list: Tuplas (criado_em, repo, branch, head_sha, email_dev, modo, nota, tokens_prompt, tokens_resposta, duracao)
+    """
+    where, parametros = _filtros(**filtros)
+    return conexao.execute(
+        "SELECT criado_em, repo, branch, head_sha, email_dev, modo, nota, tokens_prompt, tokens_resposta, duracao"
+        f" FROM execucoes{where} ORDER BY criado_em DESC LIMIT ?",
+        parametros + [limite],
+    ).fetchall()
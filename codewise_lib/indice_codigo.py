@@ -0,0 +1,297 @@
+import os
+import re
+import ast
+import sys
+import json
+from collections import Counter
+from .entradagit import run_git_command, obter_dir_codewise, resolver_sha
+from .diff_semantico import LeitorBlobs
+
+# ===================================================================
+# ÍNDICE LOCAL DO REPOSITÓRIO (.git/codewise/indice_codigo.json)
+# ===================================================================
+
+#muda quando o formato das entradas muda, forçando a reindexação completa
+VERSAO_INDICE = 1
+ARQUIVO_INDICE = "indice_codigo.json"
+
+LIMITE_VIZINHOS = 25
+LIMITE_SIMBOLOS_ARQUIVO = 12
+LIMITE_DIRETORIOS = 12
+
+#linguagens sem parser dedicado: símbolos pelas definições de topo, sem grafo de imports
+EXTENSOES_SIMBOLOS = (".js", ".jsx", ".ts", ".tsx", ".go", ".rs", ".rb", ".php", ".kt", ".swift")
+_PADRAO_SIMBOLO = re.compile(r"^(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:def|class|function|func|fn|interface|struct)\s+([A-Za-z_][A-Za-z0-9_]*)", re.MULTILINE)
+
+
+def _caminho_indice(repo_path):
+    """
+    Returns:
+        str ou None: Caminho de '.git/codewise/indice_codigo.json', None se não for um repositório Git
+    """
+    dir_codewise = obter_dir_codewise(repo_path)
+    return os.path.join(dir_codewise, ARQUIVO_INDICE) if dir_codewise else None
+
+
+def carregar_indice(repo_path) -> dict:
+    """
+    Returns:
+        dict: Índice salvo ({"versao", "commit", "arquivos"}), vazio se não existir ou for de outra versão
+    """
+    caminho = _caminho_indice(repo_path)
+    if not caminho:
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            indice = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return indice if indice.get("versao") == VERSAO_INDICE else {}
+
+
+def salvar_indice(repo_path, indice) -> None:
+    """
+    Grava o índice de forma atômica; o pre-push e o pré-cálculo podem atualizar ao mesmo tempo.
+    """
+    caminho = _caminho_indice(repo_path)
+    if not caminho:
+        return
+    temp = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(indice, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp, caminho)
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o índice do repositório: {e}", file=sys.stderr)
+
+
+def modulo_python(caminho: str):
+    """
+    Args:
+        caminho: Caminho de um arquivo .py relativo à raiz (ex: 'codewise_lib/crew.py')
+
+    Returns:
+        str ou None: Nome pontuado do módulo (ex: 'codewise_lib.crew'), None se não for Python
+    """
+    if not caminho.endswith(".py"):
+        return None
+    partes = caminho[:-3].split("/")
+    if partes[-1] == "__init__":
+        partes = partes[:-1]
+    return ".".join(partes) or None
+
+
+def _imports_python(arvore, caminho: str) -> list:
+    """
+    Lista os módulos candidatos de cada import, já com os imports relativos resolvidos.
+    Em 'from x import y' entram 'x.y' (y pode ser submódulo) e 'x'.
+
+    Returns:
+        list: Nomes pontuados, sem repetição
+    """
+    modulo = modulo_python(caminho) or ""
+    pacote = modulo.split(".") if caminho.endswith("__init__.py") else modulo.split(".")[:-1]
+    candidatos = []
+    for no in ast.walk(arvore):
+        if isinstance(no, ast.Import):
+            candidatos.extend(alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom):
+            if no.level:
+                base = pacote[:len(pacote) - (no.level - 1)] if no.level > 1 else list(pacote)
+                base = ".".join(base + ([no.module] if no.module else []))
+            else:
+                base = no.module or ""
+            candidatos.extend(f"{base}.{alias.name}" if base else alias.name for alias in no.names if alias.name != "*")
+            if base:
+                candidatos.append(base)
+    return list(dict.fromkeys(candidatos))
+
+
+def analisar_arquivo(caminho: str, conteudo: str) -> dict:
+    """
+    Extrai símbolos de topo e imports de um arquivo.
+
+    Args:
+        caminho: Caminho relativo à raiz
+        conteudo: Texto do arquivo
+
+    Returns:
+        dict: {"linhas", "simbolos", "imports"}
+    """
+    entrada = {"linhas": conteudo.count("\n") + 1, "simbolos": [], "imports": []}
+    if caminho.endswith(".py"):
+        try:
+            arvore = ast.parse(conteudo)
+        except (SyntaxError, ValueError):
+            return entrada
+        entrada["simbolos"] = [no.name for no in arvore.body if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+        entrada["imports"] = _imports_python(arvore, caminho)
+    elif caminho.endswith(EXTENSOES_SIMBOLOS):
+        entrada["simbolos"] = list(dict.fromkeys(_PADRAO_SIMBOLO.findall(conteudo)))
+    return entrada
+
+
+def listar_arvore(repo_path, revisao) -> dict:
+    """
+    Returns:
+        dict: {caminho: (sha do blob, tamanho em bytes)} de todos os arquivos rastreados na revisão
+    """
+    saida = run_git_command(["git", "ls-tree", "-r", "-l", "-z", revisao], repo_path) or ""
+    arvore = {}
+    for registro in saida.split("\0"):
+        cabecalho, _, caminho = registro.partition("\t")
+        partes = cabecalho.split()
+        if len(partes) == 4 and partes[1] == "blob":
+            arvore[caminho] = (partes[2], int(partes[3]) if partes[3].isdigit() else 0)
+    return arvore
+
+
+def atualizar_indice(repo_path, revisao="HEAD") -> dict:
+    """
+    Atualiza o índice para a revisão informada. Só os blobs que mudaram desde o último commit
+    indexado são lidos e analisados; os demais reaproveitam a entrada salva.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        revisao: Commit a indexar (ex: HEAD do intervalo analisado)
+
+    Returns:
+        dict: Índice atualizado ({"versao", "commit", "arquivos"})
+    """
+    commit = resolver_sha(revisao, repo_path)
+    indice = carregar_indice(repo_path)
+    if indice.get("commit") == commit:
+        return indice
+
+    antigos = indice.get("arquivos", {})
+    arquivos = {}
+    pendentes = []
+    for caminho, (blob, tamanho) in listar_arvore(repo_path, commit).items():
+        entrada = antigos.get(caminho)
+        if entrada and entrada["blob"] == blob:
+            arquivos[caminho] = entrada
+            continue
+        arquivos[caminho] = {"blob": blob, "tamanho": tamanho, "linhas": None, "simbolos": [], "imports": []}
+        if caminho.endswith((".py",) + EXTENSOES_SIMBOLOS):
+            pendentes.append(caminho)
+
+    if pendentes:
+        leitor = LeitorBlobs(repo_path)
+        try:
+            for caminho in pendentes:
+                conteudo = leitor.ler(commit, caminho)
+                if conteudo is not None:
+                    arquivos[caminho].update(analisar_arquivo(caminho, conteudo))
+        finally:
+            leitor.fechar()
+
+    indice = {"versao": VERSAO_INDICE, "commit": commit, "arquivos": arquivos}
+    salvar_indice(repo_path, indice)
+    print(f"🗂️ Índice do repositório: {len(pendentes)} arquivo(s) reindexado(s), {len(arquivos)} no total.", file=sys.stderr)
+    return indice
+
+
+def grafo_imports(arquivos: dict) -> tuple:
+    """
+    Resolve os imports guardados para arquivos do próprio repositório.
+    Layouts com 'src/' são aceitos pelo nome do módulo sem o prefixo.
+
+    Returns:
+        tuple: ({caminho: [importados]}, {caminho: [quem importa]})
+    """
+    modulos = {}
+    for caminho in arquivos:
+        modulo = modulo_python(caminho)
+        if modulo:
+            modulos.setdefault(modulo, caminho)
+            if modulo.startswith("src."):
+                modulos.setdefault(modulo[4:], caminho)
+
+    importa, importado_por = {}, {}
+    for caminho, entrada in arquivos.items():
+        destinos = []
+        for candidato in entrada.get("imports", []):
+            destino = modulos.get(candidato)
+            if destino and destino != caminho and destino not in destinos:
+                destinos.append(destino)
+        if destinos:
+            importa[caminho] = destinos
+            for destino in destinos:
+                importado_por.setdefault(destino, []).append(caminho)
+    return importa, importado_por
+
+
+def _descrever_arquivo(caminho: str, entrada) -> str:
+    """
+    Returns:
+        str: 'caminho (N linhas): simbolo, ...' ou '(removido)' se não estiver no índice
+    """
+    if entrada is None:
+        return f"{caminho} (removido)"
+    tamanho = f"{entrada['linhas']} linhas" if entrada.get("linhas") else f"{entrada['tamanho']} bytes"
+    texto = f"{caminho} ({tamanho})"
+    simbolos = entrada.get("simbolos", [])
+    if simbolos:
+        texto += ": " + ", ".join(simbolos[:LIMITE_SIMBOLOS_ARQUIVO])
+        if len(simbolos) > LIMITE_SIMBOLOS_ARQUIVO:
+            texto += f" e mais {len(simbolos) - LIMITE_SIMBOLOS_ARQUIVO}"
+    return texto
+
+
+def fatia_estrutura(indice: dict, caminhos_alterados: list) -> str:
+    """
+    Monta a visão compacta da estrutura em volta da mudança: diretórios do repositório, arquivos
+    alterados com o que importam e quem os importa, e os vizinhos no grafo com seus símbolos.
+
+    Args:
+        indice: Índice retornado por 'atualizar_indice'
+        caminhos_alterados: Caminhos dos arquivos do intervalo
+
+    Returns:
+        str: Texto para o placeholder '{estrutura}' da tarefa de arquitetura
+    """
+    arquivos = indice.get("arquivos", {})
+    importa, importado_por = grafo_imports(arquivos)
+
+    diretorios = Counter(c.split("/", 1)[0] + "/" if "/" in c else "(raiz)" for c in arquivos)
+    linhas = [
+        f"Repositório com {len(arquivos)} arquivo(s) rastreado(s). Diretórios de topo: "
+        + ", ".join(f"{d} ({n})" for d, n in diretorios.most_common(LIMITE_DIRETORIOS)) + "."
+    ]
+
+    linhas.append("Arquivos alterados:")
+    vizinhos = []
+    for caminho in caminhos_alterados:
+        linhas.append(f"- {_descrever_arquivo(caminho, arquivos.get(caminho))}")
+        if importa.get(caminho):
+            linhas.append(f"    importa: {', '.join(importa[caminho])}")
+        if importado_por.get(caminho):
+            linhas.append(f"    importado por: {', '.join(importado_por[caminho])}")
+        vizinhos.extend(importa.get(caminho, []) + importado_por.get(caminho, []))
+
+    vizinhos = [v for v in dict.fromkeys(vizinhos) if v not in caminhos_alterados]
+    if vizinhos:
+        linhas.append("Vizinhos (importados pelos arquivos alterados ou que os importam):")
+        linhas.extend(f"- {_descrever_arquivo(v, arquivos.get(v))}" for v in vizinhos[:LIMITE_VIZINHOS])
+        if len(vizinhos) > LIMITE_VIZINHOS:
+            linhas.append(f"- ... e mais {len(vizinhos) - LIMITE_VIZINHOS} vizinho(s)")
+    return "\n".join(linhas)
+
+
+def contexto_estrutura(repo_path, revisao, caminhos_alterados: list) -> str:
+    """
+    Atualiza o índice local (só Git, sem rede) e devolve a fatia relevante para a mudança.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        revisao: Commit analisado (HEAD do intervalo)
+        caminhos_alterados: Caminhos dos arquivos do intervalo
+
+    Returns:
+        str: Estrutura em volta da mudança, ou um aviso se o índice não puder ser montado
+    """
+    try:
+        return fatia_estrutura(atualizar_indice(repo_path, revisao), caminhos_alterados)
+    except Exception as e:
+        print(f"⚠️ Índice do repositório indisponível: {e}", file=sys.stderr)
+        return "(estrutura do repositório indisponível)"
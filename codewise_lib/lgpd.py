@@ -1,8 +1,67 @@
 import os
 import sys
 import re
+import time
+import json
+import shutil
+import hashlib
 from dotenv import load_dotenv
-from .crew import Codewise
+from .cache_usuario import obter_dir_cache_usuario
+from .carregador_config import carregar_config, ErroConfiguracao
+
+#validade padrão do julgamento em cache; a política do provedor pode mudar com o tempo
+TTL_PADRAO_LGPD_DIAS = 30
+#quantas linhas com conteúdo são lidas procurando o veredito 'sim'/'não'
+LINHAS_BUSCA_VEREDITO = 5
+
+def obter_caminhos_cache_lgpd(provider: str = None, model: str = None) -> tuple:
+    """
+    Retorna os caminhos do cache LGPD do usuário para o provedor e modelo, compartilhado por todos os repositórios.
+    
+    Args:
+        provider: Provedor de IA (padrão: AI_PROVIDER do .env)
+        model: Modelo de IA (padrão: AI_MODEL do .env)
+        
+    Returns:
+        tuple: (diretório do cache, arquivo de análise de política, arquivo de julgamento)
+    """
+    provider = (provider or os.getenv("AI_PROVIDER", "")).lower()
+    model = (model or os.getenv("AI_MODEL", "")).lower()
+    chave = re.sub(r'[^a-z0-9._-]+', '-', f"{provider}_{model}")
+    caminho_dir_lgpd = obter_dir_cache_usuario("lgpd", chave)
+    policy_file_path = os.path.join(caminho_dir_lgpd, "analise_politica_coleta_de_dados.md")
+    lgpd_judge_file_path = os.path.join(caminho_dir_lgpd, "julgamento_lgpd.md")
+    return caminho_dir_lgpd, policy_file_path, lgpd_judge_file_path
+
+def cache_lgpd_expirado(timestamp: float) -> bool:
+    """
+    Verifica se o julgamento em cache passou da validade (CODEWISE_LGPD_TTL_DIAS no .env).
+    
+    Args:
+        timestamp: Momento (epoch) em que o julgamento foi gerado
+        
+    Returns:
+        bool: True se expirado
+    """
+    try:
+        ttl_dias = float(os.getenv("CODEWISE_LGPD_TTL_DIAS", TTL_PADRAO_LGPD_DIAS))
+    except ValueError:
+        #valor inválido no .env não derruba a verificação LGPD
+        ttl_dias = TTL_PADRAO_LGPD_DIAS
+    return (time.time() - timestamp) > ttl_dias * 86400
+
+def limpar_cache_lgpd(todos: bool = False) -> None:
+    """
+    Remove o cache LGPD do provedor/modelo atual (ou de todos), forçando uma nova verificação.
+    
+    Args:
+        todos: Se True, remove o cache de todos os provedores e modelos
+    """
+    if todos:
+        caminho = obter_dir_cache_usuario("lgpd")
+    else:
+        caminho, _, _ = obter_caminhos_cache_lgpd()
+    shutil.rmtree(caminho, ignore_errors=True)
 
 def verify_lgpd(caminho_dir_lgpd: str, policy_file_path: str, lgpd_judge_file_path: str) -> bool:
     """
@@ -18,6 +77,8 @@ def verify_lgpd(caminho_dir_lgpd: str, policy_file_path: str, lgpd_judge_file_pa
     """
     # Tentativa de colocar a analise lgpd para rodar antes do envio dos dados sensiveis
     # instancia sem passar o commit como contexto
+    # import tardio: a verificação do cache não precisa carregar o crewai
+    from .crew import Codewise
     codewise_instance = Codewise()
 
     print(f"Verificando a política de coleta de dados do provedor com base neste modelo de api key...")
@@ -54,72 +115,129 @@ def verify_lgpd(caminho_dir_lgpd: str, policy_file_path: str, lgpd_judge_file_pa
     except Exception as e:
         print(f"❌ ERRO - Ao salvar o arquivo 'julgamento_lgpd.md': {e}", file=sys.stderr)
 
-    #retorna o resultado do julgamento
-    return verify_result_judgement(lgpd_judge_file_path)
+    #retorna o resultado do julgamento, registrando os metadados usados na consulta ao cache
+    aprovado = verify_result_judgement(lgpd_judge_file_path)
+    if os.path.exists(policy_file_path) and os.path.exists(lgpd_judge_file_path):
+        salvar_metadados_lgpd(lgpd_judge_file_path, aprovado)
+    return aprovado
     
 def verify_result_judgement(lgpd_judge_file_path) -> bool:
     """
     Verifica o resultado do julgamento LGPD no arquivo gerado.
+    A tarefa pede a resposta na primeira linha, então só as primeiras linhas com conteúdo são lidas.
     
     Args:
         lgpd_judge_file_path: Caminho do arquivo de julgamento LGPD
         
     Returns:
-        bool: True se aprovado ('sim'), False se reprovado ('não')
+        bool: True se aprovado ('sim'), False se reprovado ('não') ou se não for possível determinar
     """
     try:
         with open(lgpd_judge_file_path, "r", encoding="utf-8") as julgamento:
-
+            linhas_lidas = 0
             for linha in julgamento:
-                linha_clean = linha.strip().lower()
-
-                linha_clean = re.sub(r'[*_#>`~]', '', linha_clean).strip()
-
-                linha_clean = linha_clean.strip()
+                linha_clean = re.sub(r'[*_#>`~]', '', linha).strip().lower()
+                if not linha_clean:
+                    continue
 
                 if(linha_clean == "sim"):
                     return True
                 if (linha_clean == "não"):
                     return False
+
+                linhas_lidas += 1
+                if linhas_lidas >= LINHAS_BUSCA_VEREDITO:
+                    break
     except FileNotFoundError as e:
         print(f"❌ ERRO - Arquivo 'julgamento_lgpd.md' não existe: {e}", file=sys.stderr)
     except Exception as e:
         print(f"❌ ERRO - ao ler o arquivo 'julgamento_lgpd.md': {e}", file=sys.stderr)
+    return False
+
+def caminho_metadados_lgpd(lgpd_judge_file_path: str) -> str:
+    """
+    Returns:
+        str: Caminho do JSON de metadados gravado ao lado do julgamento ('julgamento_lgpd.json')
+    """
+    return os.path.splitext(lgpd_judge_file_path)[0] + ".json"
+
+def hash_config_lgpd() -> str:
+    """
+    Calcula o hash das tarefas 'policy_analytics' e 'lgpd_judging' do tasks.yaml.
+    Se o prompt dessas tarefas mudar, o julgamento em cache deixa de valer.
+    
+    Returns:
+        str: Hash curto da configuração
+    """
+    tasks_config = carregar_config()["tarefas"]
+    relevante = {nome: tasks_config.get(nome) for nome in ("policy_analytics", "lgpd_judging")}
+    return hashlib.sha256(json.dumps(relevante, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+def salvar_metadados_lgpd(lgpd_judge_file_path: str, aprovado: bool) -> None:
+    """
+    Grava o JSON de metadados do julgamento: provedor, modelo, veredito, data e hash da configuração.
+    
+    Args:
+        lgpd_judge_file_path: Caminho do arquivo de julgamento LGPD
+        aprovado: Veredito extraído do julgamento
+    """
+    metadados = {
+        "provider": os.getenv("AI_PROVIDER", "").lower(),
+        "model": os.getenv("AI_MODEL", "").lower(),
+        "aprovado": aprovado,
+        "timestamp": time.time(),
+        "config_hash": hash_config_lgpd(),
+    }
+    caminho = caminho_metadados_lgpd(lgpd_judge_file_path)
+    temp = caminho + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+    os.replace(temp, caminho)
+
+def ler_metadados_lgpd(lgpd_judge_file_path: str) -> dict:
+    """
+    Lê o JSON de metadados do julgamento.
+    
+    Args:
+        lgpd_judge_file_path: Caminho do arquivo de julgamento LGPD
+        
+    Returns:
+        dict ou None: Metadados, None se não existir ou estiver corrompido
+    """
+    try:
+        with open(caminho_metadados_lgpd(lgpd_judge_file_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
 
 def verifica_se_existe_analise_lgpd(policy_file_path, lgpd_judge_file_path) -> bool:
     """
-    Verifica se já existe uma análise LGPD para o provedor e modelo atuais.
+    Verifica se já existe uma análise LGPD válida para o provedor e modelo atuais, lendo só o JSON de metadados.
     
     Args:
         policy_file_path: Caminho do arquivo de análise de política
         lgpd_judge_file_path: Caminho do arquivo de julgamento LGPD
         
     Returns:
-        bool: True se análise já existe para o provedor/modelo atual, False caso contrário
+        bool: True se a análise existe, é do provedor/modelo atual, está dentro da validade
+            e foi gerada com a mesma configuração das tarefas; False caso contrário
     """
+    metadados = ler_metadados_lgpd(lgpd_judge_file_path)
+    if metadados is None:
+        return False
 
-    provider = os.getenv("AI_PROVIDER").lower()
-    model = os.getenv("AI_MODEL").lower()
-    model = re.sub(r'[*_#>`~]', '', model)
-
-    provider_model = provider + model
+    if metadados.get("provider") != os.getenv("AI_PROVIDER", "").lower() or metadados.get("model") != os.getenv("AI_MODEL", "").lower():
+        return False
 
-    if(os.path.exists(policy_file_path) and os.path.exists(lgpd_judge_file_path)):
-        try:
-            with open(policy_file_path, "r", encoding="utf-8") as f:
-                for linha in f:
-                    linha_clean = linha.strip().lower()
+    if cache_lgpd_expirado(metadados.get("timestamp", 0)):
+        return False
 
-                    linha_clean = re.sub(r'[*_#>`~]', '', linha_clean).strip()
-
-                    linha_clean = linha_clean.strip()
-                    if(linha_clean == provider_model):
-                        return True
-                    if(not linha):
-                        return False
-        except FileNotFoundError as e:
-            print(f"❌ ERRO - Arquivo 'analise_politica_coleta_de_dados.md' não existe: {e}", file=sys.stderr)
-        except Exception as e:
-            print(f"❌ ERRO - ao ler o arquivo 'analise_politica_coleta_de_dados.md': {e}", file=sys.stderr)    
-    else:
-        return False 
\ No newline at end of file
+    try:
+        if metadados.get("config_hash") != hash_config_lgpd():
+            print("ℹ️ Configuração das tarefas LGPD mudou. O julgamento será refeito.", file=sys.stderr)
+            return False
+    except (OSError, ErroConfiguracao) as e:
+        print(f"❌ ERRO - ao ler a configuração das tarefas LGPD: {e}", file=sys.stderr)
+        return False
+
+    return os.path.exists(policy_file_path) and os.path.exists(lgpd_judge_file_path)
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import threading
+import litellm
+from litellm.integrations.custom_logger import CustomLogger
+
+
+class LimitadorTaxa(CustomLogger):
+    """
+    Limitador de requisições por minuto compartilhado por todas as chamadas ao LLM do processo.
+    Registrado como callback do litellm, segura cada chamada até existir uma vaga na janela.
+    """
+    def __init__(self, max_rpm: int):
+        """
+        Inicializa o limitador.
+
+        Args:
+            max_rpm: Máximo de requisições por minuto somando todas as threads
+        """
+        super().__init__()
+        self.intervalo = 60.0 / max_rpm
+        self.proxima_vaga = 0.0
+        self.lock = threading.Lock()
+
+    def aguardar_vaga(self) -> None:
+        """
+        Bloqueia a thread atual até a próxima vaga livre, respeitando o intervalo mínimo entre chamadas.
+        """
+        with self.lock:
+            agora = time.monotonic()
+            espera = self.proxima_vaga - agora
+            self.proxima_vaga = max(agora, self.proxima_vaga) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+    def log_pre_api_call(self, model, messages, kwargs):
+        self.aguardar_vaga()
+
+
+_limitador_ativo = None
+
+
+def configurar_limitador(max_rpm: int) -> LimitadorTaxa:
+    """
+    Ativa (uma única vez por processo) o limitador de requisições compartilhado.
+
+    Args:
+        max_rpm: Máximo de requisições por minuto
+
+    Returns:
+        LimitadorTaxa: Limitador registrado no litellm
+    """
+    global _limitador_ativo
+    if _limitador_ativo is None:
+        _limitador_ativo = LimitadorTaxa(max_rpm)
+        litellm.input_callback.append(_limitador_ativo)
+    return _limitador_ativo
+
+
+def configurar_cache_llm(diretorio_cache: str) -> None:
+    """
+    Ativa o cache de respostas do litellm em disco, compartilhado entre execuções e threads.
+    Sem o pacote 'diskcache', usa o cache em memória do processo.
+
+    Args:
+        diretorio_cache: Diretório onde as respostas ficam armazenadas
+    """
+    os.makedirs(diretorio_cache, exist_ok=True)
+    try:
+        litellm.enable_cache(type="disk", disk_cache_dir=diretorio_cache)
+    except ImportError:
+        print("⚠️ Pacote 'diskcache' não encontrado. Usando cache de respostas em memória.", file=sys.stderr)
+        litellm.enable_cache(type="local")
@@ -1,5 +1,19 @@
 from .cw_runner import CodewiseRunner
+from .orcamento_tempo import registrar_prazo
 import argparse
+import sys
+
+def aguardar_liberacao_stdin():
+    """
+    Bloqueia até o processo do hook confirmar o consentimento LGPD escrevendo 'S' na stdin.
+    Qualquer outra resposta, ou o fim da stdin (hook encerrado), termina sem enviar dados.
+    A linha pode trazer o prazo do hook ('S <epoch>'), contado a partir do consentimento.
+    """
+    resposta = sys.stdin.readline().split()
+    if not resposta or resposta[0].upper() != "S":
+        sys.exit(0)
+    if len(resposta) > 1:
+        registrar_prazo(float(resposta[1]))
 
 def main():
     parser = argparse.ArgumentParser(description="Code Wise - Ferramenta de Análise de Código com IA.")
@@ -12,13 +26,23 @@ def main():
         choices=['descricao', 'analise', 'titulo', 'lint', 'lgpd_verify'],
         help="Modo de operação."
     )
+    parser.add_argument("--base", type=str, required=False, help="Referência base fixa do intervalo analisado (ex: SHA).")
+    parser.add_argument("--head", type=str, required=False, help="Referência final fixa do intervalo analisado (ex: SHA).")
+    parser.add_argument("--sem-notificacao", action="store_true", help="Não envia a avaliação de código ao gestor.")
+    parser.add_argument("--repo-historico", type=str, required=False, help="Repositório gravado no histórico no lugar de '--repo' (ex: origem de um clone temporário).")
+    parser.add_argument("--aguardar-liberacao", action="store_true", help="Prepara o contexto e espera 'S' na stdin antes de chamar o LLM.")
     args = parser.parse_args()
 
     runner = CodewiseRunner()
     runner.executar(
         caminho_repo=args.repo,
         nome_branch=args.branch,
-        modo=args.mode
+        modo=args.mode,
+        base_ref=args.base,
+        head_ref=args.head,
+        notificar=not args.sem_notificacao,
+        liberacao=aguardar_liberacao_stdin if args.aguardar_liberacao else None,
+        repo_historico=args.repo_historico
     )
 
 if __name__ == "__main__":
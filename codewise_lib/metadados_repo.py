@@ -0,0 +1,169 @@
+import os
+import re
+import sys
+import json
+import time
+from functools import lru_cache
+from .entradagit import run_git_command, obter_dir_codewise
+
+# ===================================================================
+# CACHE DE METADADOS DO REPOSITÓRIO (.git/codewise/metadados.json)
+# ===================================================================
+
+#validade padrão da branch padrão em cache; remotes e slugs valem enquanto o '.git/config' não mudar
+TTL_PADRAO_METADADOS_HORAS = 24
+BRANCH_PADRAO_FALLBACK = "main"
+
+
+@lru_cache(maxsize=None)
+def _caminho_metadados(repo_path):
+    """
+    Returns:
+        str ou None: Caminho de '.git/codewise/metadados.json', None se não for um repositório Git
+    """
+    dir_codewise = obter_dir_codewise(repo_path)
+    return os.path.join(dir_codewise, "metadados.json") if dir_codewise else None
+
+
+def carregar_metadados(repo_path):
+    """
+    Lê os metadados em cache do repositório.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+
+    Returns:
+        dict: Metadados em cache (vazio se não existir ou estiver corrompido)
+    """
+    caminho = _caminho_metadados(repo_path)
+    if not caminho:
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def salvar_metadados(repo_path, metadados):
+    """
+    Grava os metadados de forma atômica; hooks e subprocessos podem ler ao mesmo tempo.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        metadados: Dicionário completo a gravar
+    """
+    caminho = _caminho_metadados(repo_path)
+    if not caminho:
+        return
+    temp = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(metadados, f, ensure_ascii=False, indent=2)
+        os.replace(temp, caminho)
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o cache de metadados: {e}", file=sys.stderr)
+
+
+def _mtime_config_git(repo_path):
+    """
+    Returns:
+        float: mtime do '.git/config', que muda sempre que um remote é adicionado, removido ou alterado
+    """
+    caminho = _caminho_metadados(repo_path)
+    try:
+        return os.path.getmtime(os.path.join(os.path.dirname(os.path.dirname(caminho)), "config"))
+    except (OSError, TypeError):
+        return 0.0
+
+
+def extrair_slug_github(url):
+    """
+    Extrai o slug 'usuario/repo' de uma URL de remote do GitHub (HTTPS ou SSH).
+
+    Args:
+        url: URL do remote
+
+    Returns:
+        str ou None: Slug se for uma URL do GitHub, None caso contrário
+    """
+    match = re.search(r'github\.com[/:]([^/]+/[^/]+?)(\.git)?/?$', url or "")
+    return match.group(1) if match else None
+
+
+def obter_remotes(repo_path):
+    """
+    Retorna os remotes do repositório com URL e slug do GitHub, lendo o 'git config' só quando ele mudou.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+
+    Returns:
+        dict: {nome_remote: {"url": str, "slug": str ou None}}
+    """
+    metadados = carregar_metadados(repo_path)
+    mtime_config = _mtime_config_git(repo_path)
+    if metadados.get("remotes_config_mtime") == mtime_config and "remotes" in metadados:
+        return metadados["remotes"]
+
+    saida = run_git_command(["git", "config", "--get-regexp", r"^remote\..*\.url$"], repo_path) or ""
+    remotes = {}
+    for linha in saida.splitlines():
+        chave, _, url = linha.partition(" ")
+        nome = chave[len("remote."):-len(".url")]
+        remotes[nome] = {"url": url.strip(), "slug": extrair_slug_github(url.strip())}
+
+    metadados["remotes"] = remotes
+    metadados["remotes_config_mtime"] = mtime_config
+    salvar_metadados(repo_path, metadados)
+    return remotes
+
+
+def obter_branch_padrao(repo_path, remote="origin"):
+    """
+    Retorna a branch padrão de um remote sem acessar a rede: cache com validade
+    (CODEWISE_METADADOS_TTL_HORAS), depois o 'refs/remotes/<remote>/HEAD' local e, por fim, 'main'.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        remote: Nome do remote
+
+    Returns:
+        str: Nome da branch padrão
+    """
+    metadados = carregar_metadados(repo_path)
+    registro = metadados.get("branch_padrao", {}).get(remote)
+    try:
+        ttl_horas = float(os.getenv("CODEWISE_METADADOS_TTL_HORAS", TTL_PADRAO_METADADOS_HORAS))
+    except ValueError:
+        #valor inválido no .env não derruba o hook
+        ttl_horas = TTL_PADRAO_METADADOS_HORAS
+    if registro and (time.time() - registro.get("timestamp", 0)) <= ttl_horas * 3600:
+        return registro["nome"]
+
+    #o 'git clone' grava o HEAD do remote localmente; não custa uma consulta ao GitHub
+    ref_head = run_git_command(["git", "symbolic-ref", "--quiet", f"refs/remotes/{remote}/HEAD"], repo_path)
+    prefixo = f"refs/remotes/{remote}/"
+    if ref_head and ref_head.startswith(prefixo):
+        nome = ref_head[len(prefixo):]
+        registrar_branch_padrao(repo_path, remote, nome)
+        return nome
+
+    if registro:
+        #cache vencido sem outra fonte local: o último valor conhecido ainda é melhor que o palpite
+        return registro["nome"]
+    return BRANCH_PADRAO_FALLBACK
+
+
+def registrar_branch_padrao(repo_path, remote, nome):
+    """
+    Registra no cache a branch padrão de um remote (ex: obtida na consulta ao GitHub do pre-push).
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        remote: Nome do remote
+        nome: Nome da branch padrão
+    """
+    metadados = carregar_metadados(repo_path)
+    metadados.setdefault("branch_padrao", {})[remote] = {"nome": nome, "timestamp": time.time()}
+    salvar_metadados(repo_path, metadados)
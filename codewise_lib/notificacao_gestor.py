@@ -48,6 +48,55 @@ def enviar_telegram(mensagem: str) -> bool:
         return False
 
 
+def extrair_nota_e_justificativa(caminho_arquivo: str) -> tuple:
+    """
+    Extrai a nota final e o breakdown de pontos do arquivo de avaliação de código.
+    
+    Args:
+        caminho_arquivo: Caminho do arquivo de avaliação gerado
+        
+    Returns:
+        tuple: (nota, justificativa) com a nota em float e o breakdown em texto
+    """
+    nota = 0.0
+    justificativa_linhas = []
+    capturando_breakdown = False
+    
+    with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha_clean = linha.strip()
+            
+            #varre o arquivo gerado procurando a nota final
+            if 'nota final' in linha_clean.lower():
+                linha_limpa = re.sub(r'[*_#>`~]', '', linha_clean)
+                linha_limpa = linha_limpa.strip()
+                
+                #pega a nota
+                nota_match = re.search(r'(\d+\.?\d*)', linha_limpa)
+                if nota_match:
+                    nota = float(nota_match.group(1))
+                    print(f"   ✓ Nota encontrada: {nota}/10", file=sys.stderr)
+            
+            #varre o arquivo procurando o breakdown de pontos
+            if 'breakdown de pontos' in linha_clean.lower():
+                capturando_breakdown = True
+                continue
+            
+            # Para de capturar quando encontrar "Justificativa detalhada"
+            if capturando_breakdown and 'fim justificativa' in linha_clean.lower():
+                break
+            
+            if capturando_breakdown:
+                # Remove caracteres especiais
+                linha_limpa = re.sub(r'[*_#>`~]', '', linha_clean)
+                linha_limpa = linha_limpa.strip()
+                
+                if linha_limpa:
+                    justificativa_linhas.append(linha_limpa)
+    
+    return nota, '\n'.join(justificativa_linhas)
+
+
 def processar_avaliacao_e_notificar(caminho_arquivo: str, email_dev: str, repo_path: str) -> bool:
     """
     Processa o arquivo de avaliação de código e envia notificação ao gestor.
@@ -61,44 +110,8 @@ def processar_avaliacao_e_notificar(caminho_arquivo: str, email_dev: str, repo_p
         bool: True se notificação for enviada com sucesso, False caso contrário
     """
     try:
-        nota = 0.0
-        justificativa_linhas = []
-        capturando_breakdown = False
-        
-        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-            for linha in f:
-                linha_clean = linha.strip()
-                
-                #varre o arquivo gerado procurando a nota final
-                if 'nota final' in linha_clean.lower():
-                    linha_limpa = re.sub(r'[*_#>`~]', '', linha_clean)
-                    linha_limpa = linha_limpa.strip()
-                    
-                    #pega a nota
-                    nota_match = re.search(r'(\d+\.?\d*)', linha_limpa)
-                    if nota_match:
-                        nota = float(nota_match.group(1))
-                        print(f"   ✓ Nota encontrada: {nota}/10", file=sys.stderr)
-                
-                #varre o arquivo procurando o breakdown de pontos
-                if 'breakdown de pontos' in linha_clean.lower():
-                    capturando_breakdown = True
-                    continue
-                
-                # Para de capturar quando encontrar "Justificativa detalhada"
-                if capturando_breakdown and 'fim justificativa' in linha_clean.lower():
-                    break
-                
-                if capturando_breakdown:
-                    # Remove caracteres especiais
-                    linha_limpa = re.sub(r'[*_#>`~]', '', linha_clean)
-                    linha_limpa = linha_limpa.strip()
-                    
-                    if linha_limpa:
-                        justificativa_linhas.append(linha_limpa)
-        
         #justificativa final da nota
-        justificativa = '\n'.join(justificativa_linhas)
+        nota, justificativa = extrair_nota_e_justificativa(caminho_arquivo)
         
         if len(justificativa) > 4000:
             justificativa = justificativa[:3997] + "..."
@@ -0,0 +1,95 @@
+import os
+import time
+
+# ===================================================================
+# ORÇAMENTO DE TEMPO DOS HOOKS E DAS CHAMADAS AO LLM
+# ===================================================================
+
+#prazo absoluto (epoch) repassado do hook aos subprocessos da IA
+VAR_PRAZO = "CODEWISE_PRAZO"
+
+#tempo total de cada hook, contado a partir do consentimento LGPD; 0 desativa o limite
+VARIAVEIS_TEMPO_HOOK = {"pre-push": "CODEWISE_TEMPO_PRE_PUSH", "pre-commit": "CODEWISE_TEMPO_PRE_COMMIT"}
+TEMPOS_PADRAO_HOOK = {"pre-push": 600, "pre-commit": 120}
+TEMPO_PADRAO_LLM = 120
+
+#reservado no fim do orçamento do pre-push para criar/atualizar o PR com o que ficou pronto
+MARGEM_PUBLICACAO = 15
+
+
+def _ler_segundos(variavel: str, padrao: float):
+    """
+    Returns:
+        float ou None: Segundos configurados na variável, None se o limite estiver desativado (<= 0)
+    """
+    try:
+        segundos = float(os.getenv(variavel, padrao))
+    except ValueError:
+        segundos = float(padrao)
+    return segundos if segundos > 0 else None
+
+
+def tempo_limite_llm():
+    """
+    Returns:
+        float ou None: Tempo máximo de cada chamada ao LLM (CODEWISE_TEMPO_LLM), None sem limite
+    """
+    return _ler_segundos("CODEWISE_TEMPO_LLM", TEMPO_PADRAO_LLM)
+
+
+def calcular_prazo(hook: str):
+    """
+    Calcula o prazo absoluto do hook a partir de agora.
+
+    Args:
+        hook: 'pre-push' ou 'pre-commit'
+
+    Returns:
+        float ou None: Instante (time.time()) em que o orçamento acaba, None sem limite
+    """
+    segundos = _ler_segundos(VARIAVEIS_TEMPO_HOOK[hook], TEMPOS_PADRAO_HOOK[hook])
+    return time.time() + segundos if segundos else None
+
+
+def registrar_prazo(prazo) -> None:
+    """
+    Define o prazo do processo atual (lido por 'tempo_restante' e herdado pelos subprocessos).
+
+    Args:
+        prazo: Instante absoluto do fim do orçamento, None para remover o limite
+    """
+    if prazo is None:
+        os.environ.pop(VAR_PRAZO, None)
+    else:
+        os.environ[VAR_PRAZO] = repr(float(prazo))
+
+
+def tempo_restante(prazo=None):
+    """
+    Args:
+        prazo: Prazo absoluto; se omitido, usa o registrado no processo
+
+    Returns:
+        float ou None: Segundos até o prazo (negativo se já passou), None sem limite
+    """
+    if prazo is None:
+        try:
+            prazo = float(os.environ[VAR_PRAZO])
+        except (KeyError, ValueError):
+            return None
+    return prazo - time.time()
+
+
+def cabe_no_prazo(reserva: float = 0, prazo=None) -> bool:
+    """
+    Indica se ainda dá tempo de começar uma etapa que pode levar até 'reserva' segundos.
+
+    Args:
+        reserva: Duração máxima estimada da etapa
+        prazo: Prazo absoluto; se omitido, usa o registrado no processo
+
+    Returns:
+        bool: True se não há limite ou se sobra mais que 'reserva'
+    """
+    restante = tempo_restante(prazo)
+    return restante is None or restante > (reserva or 0)
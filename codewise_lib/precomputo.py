@@ -0,0 +1,154 @@
+import os
+import sys
+import shutil
+import hashlib
+import subprocess
+from dotenv import load_dotenv
+from .entradagit import obter_dir_codewise
+
+# ===================================================================
+# RESULTADOS PRÉ-CALCULADOS NO POST-COMMIT (.git/codewise/precomputo)
+# ===================================================================
+
+#modos que o post-commit adianta; o pre-push só roda ao vivo os que não estiverem prontos
+MODOS_PRECOMPUTO = ("titulo", "descricao", "analise")
+ARQUIVOS_MODO = {"titulo": "titulo.txt", "descricao": "descricao.md", "analise": "analise.md"}
+ARQUIVO_AVALIACAO = "avaliacao_codigo.md"
+#intervalos guardados por repositório; os mais antigos são descartados
+MAX_PRECOMPUTOS = 10
+
+
+def obter_dir_precomputo(repo_path):
+    """
+    Returns:
+        str ou None: Caminho de '.git/codewise/precomputo', None se não for um repositório Git
+    """
+    dir_codewise = obter_dir_codewise(repo_path)
+    return os.path.join(dir_codewise, "precomputo") if dir_codewise else None
+
+
+def chave_precomputo(base_sha, head_sha) -> str:
+    """
+    Identifica um intervalo pré-calculado. O provedor e o modelo entram na chave para que
+    trocar o .env não reaproveite textos gerados por outro modelo.
+
+    Args:
+        base_sha: SHA da base do intervalo
+        head_sha: SHA do HEAD do intervalo
+
+    Returns:
+        str: Hash que nomeia o diretório do intervalo
+    """
+    load_dotenv()
+    partes = f"{base_sha}|{head_sha}|{os.getenv('AI_PROVIDER', '')}|{os.getenv('AI_MODEL', '')}"
+    return hashlib.sha256(partes.encode("utf-8")).hexdigest()[:24]
+
+
+def caminho_precomputo(repo_path, base_sha, head_sha):
+    """
+    Args:
+        repo_path: Caminho para o repositório Git local
+        base_sha: SHA da base do intervalo
+        head_sha: SHA do HEAD do intervalo
+
+    Returns:
+        str ou None: Diretório onde ficam os resultados do intervalo
+    """
+    dir_precomputo = obter_dir_precomputo(repo_path)
+    return os.path.join(dir_precomputo, chave_precomputo(base_sha, head_sha)) if dir_precomputo else None
+
+
+def salvar_resultado_precomputado(repo_path, base_sha, head_sha, modo, texto):
+    """
+    Grava o resultado de um modo de forma atômica; o pre-push pode ler a qualquer momento.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        base_sha: SHA da base do intervalo
+        head_sha: SHA do HEAD do intervalo
+        modo: Modo da IA ('titulo', 'descricao' ou 'analise')
+        texto: Saída do modo
+    """
+    caminho = caminho_precomputo(repo_path, base_sha, head_sha)
+    if not caminho:
+        return
+    os.makedirs(caminho, exist_ok=True)
+    arquivo = os.path.join(caminho, ARQUIVOS_MODO[modo])
+    temp = f"{arquivo}.{os.getpid()}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(temp, arquivo)
+
+
+def obter_resultados_precomputados(repo_path, base_sha, head_sha, modos) -> dict:
+    """
+    Busca os resultados já calculados para exatamente este intervalo.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        base_sha: SHA da base do intervalo
+        head_sha: SHA do HEAD do intervalo
+        modos: Modos desejados
+
+    Returns:
+        dict: {modo: texto} apenas dos modos prontos
+    """
+    caminho = caminho_precomputo(repo_path, base_sha, head_sha)
+    if not caminho or not os.path.isdir(caminho):
+        return {}
+    resultados = {}
+    for modo in modos:
+        if modo not in ARQUIVOS_MODO:
+            continue
+        try:
+            with open(os.path.join(caminho, ARQUIVOS_MODO[modo]), "r", encoding="utf-8") as f:
+                texto = f.read().strip()
+        except OSError:
+            continue
+        if texto:
+            resultados[modo] = texto
+    return resultados
+
+
+def notificar_avaliacao_precomputada(repo_path, base_sha, head_sha) -> bool:
+    """
+    Envia ao gestor a avaliação de código gerada no pré-cálculo, que roda sem notificar
+    para que a notificação só aconteça quando o push de fato usar a análise.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        base_sha: SHA da base do intervalo
+        head_sha: SHA do HEAD do intervalo
+
+    Returns:
+        bool: True se a notificação foi enviada
+    """
+    from .notificacao_gestor import processar_avaliacao_e_notificar
+
+    caminho = caminho_precomputo(repo_path, base_sha, head_sha)
+    caminho_avaliacao = os.path.join(caminho, ARQUIVO_AVALIACAO) if caminho else None
+    if not caminho_avaliacao or not os.path.exists(caminho_avaliacao):
+        return False
+    try:
+        email_dev = subprocess.check_output(["git", "-C", repo_path, "config", "user.email"], text=True).strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        email_dev = "desconhecido"
+    print("\n📤 Enviando avaliação para o gestor...", file=sys.stderr)
+    return processar_avaliacao_e_notificar(caminho_avaliacao, email_dev, repo_path)
+
+
+def limpar_precomputos_antigos(repo_path, manter=MAX_PRECOMPUTOS):
+    """
+    Remove os intervalos pré-calculados mais antigos, mantendo os 'manter' mais recentes.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        manter: Quantidade de intervalos preservados
+    """
+    dir_precomputo = obter_dir_precomputo(repo_path)
+    if not dir_precomputo or not os.path.isdir(dir_precomputo):
+        return
+    entradas = [os.path.join(dir_precomputo, nome) for nome in os.listdir(dir_precomputo)]
+    entradas = sorted((e for e in entradas if os.path.isdir(e)), key=os.path.getmtime, reverse=True)
+    for antiga in entradas[manter:]:
+        shutil.rmtree(antiga, ignore_errors=True)
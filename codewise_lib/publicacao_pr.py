@@ -0,0 +1,291 @@
+import os
+import re
+import sys
+import json
+from datetime import datetime
+from .entradagit import obter_dir_codewise
+from .cliente_github import ErroGitHub
+from .achados import separar_achados, diferenca_achados, formatar_achado
+
+# ===================================================================
+# PUBLICAÇÃO NO PR: SEÇÕES COM MARCADORES E UM ÚNICO COMENTÁRIO EDITADO
+# ===================================================================
+
+#a descrição e o histórico ficam entre marcadores e são substituídos no lugar a cada push;
+#o que estiver fora deles (texto escrito à mão no PR) é preservado
+MARCADOR_INICIO = "<!-- codewise:inicio:{secao} -->"
+MARCADOR_FIM = "<!-- codewise:fim:{secao} -->"
+MARCADOR_COMENTARIO = "<!-- codewise:comentario -->"
+
+#entradas mantidas no histórico de atualizações do PR; as mais antigas são descartadas
+LIMITE_HISTORICO_PR = 10
+
+#blocos acrescentados ao body pelas versões que não usavam marcadores
+_PADRAO_ATUALIZACAO_ANTIGA = re.compile(r"\n*---\n+\*\*🔄 Atualização em ([^*]+)\*\*\n")
+
+
+def _padrao_secao(secao):
+    return re.compile(
+        re.escape(MARCADOR_INICIO.format(secao=secao)) + r"\n?(.*?)\n?" + re.escape(MARCADOR_FIM.format(secao=secao)),
+        re.DOTALL,
+    )
+
+
+def extrair_secao(texto, secao):
+    """
+    Args:
+        texto: Body do PR
+        secao: Nome da seção (ex: 'descricao')
+
+    Returns:
+        str ou None: Conteúdo entre os marcadores da seção, None se ela não existir
+    """
+    match = _padrao_secao(secao).search(texto or "")
+    return match.group(1) if match else None
+
+
+def substituir_secao(texto, secao, conteudo):
+    """
+    Troca o conteúdo entre os marcadores da seção; sem a seção, ela é acrescentada ao final.
+
+    Args:
+        texto: Body do PR
+        secao: Nome da seção
+        conteudo: Novo conteúdo da seção
+
+    Returns:
+        str: Body com a seção atualizada
+    """
+    bloco = f"{MARCADOR_INICIO.format(secao=secao)}\n{conteudo}\n{MARCADOR_FIM.format(secao=secao)}"
+    texto = texto or ""
+    padrao = _padrao_secao(secao)
+    if padrao.search(texto):
+        #função como substituto: o conteúdo pode ter '\' que o re interpretaria
+        return padrao.sub(lambda _: bloco, texto, count=1)
+    return f"{texto.rstrip()}\n\n{bloco}" if texto.strip() else bloco
+
+
+def _datas_atualizacoes_antigas(body):
+    """
+    Returns:
+        list: Datas dos blocos '🔄 Atualização em ...' acrescentados pelas versões sem marcadores
+    """
+    #split com grupo: [texto, data, bloco, data, bloco, ...]; cada bloco era só a descrição daquele push
+    return [data.strip() for data in _PADRAO_ATUALIZACAO_ANTIGA.split(body)[1::2]]
+
+
+def _tem_marcadores(body):
+    return MARCADOR_INICIO.format(secao="descricao") in body or MARCADOR_INICIO.format(secao="historico") in body
+
+
+def montar_body_pr(body_atual, descricao, titulo, head_sha=None, momento=None):
+    """
+    Monta o body do PR com a descrição atual e o histórico compacto das atualizações.
+    O tamanho não cresce com o número de pushes: a descrição é substituída e o histórico
+    guarda só as LIMITE_HISTORICO_PR entradas mais recentes. Num body com marcadores, o texto
+    fora deles é preservado. Um body sem marcadores vem das versões anteriores, que escreviam
+    o body inteiro (a descrição gerada, seguida ou não dos blocos '🔄 Atualização em ...'):
+    ele é substituído por inteiro, e as datas dos blocos entram no histórico.
+
+    Args:
+        body_atual: Body atual do PR ('' para um PR novo)
+        descricao: Descrição gerada para este push
+        titulo: Título gerado para este push
+        head_sha: SHA do HEAD publicado (opcional)
+        momento: Data da atualização (opcional, padrão: agora)
+
+    Returns:
+        str: Novo body do PR
+    """
+    body, datas_antigas = body_atual or "", []
+    if not _tem_marcadores(body):
+        #body legado, com ou sem blocos de atualização: mantê-lo deixaria o PR com duas descrições
+        datas_antigas = _datas_atualizacoes_antigas(body)
+        body = ""
+
+    #o histórico é exibido do mais recente para o mais antigo; aqui fica em ordem cronológica
+    historico = extrair_secao(body, "historico")
+    entradas = [f"- {data} · (atualização anterior)" for data in datas_antigas]
+    entradas.extend(reversed([linha for linha in (historico or "").splitlines() if linha.startswith("- ")]))
+
+    quando = (momento or datetime.now()).strftime("%d/%m/%Y %H:%M:%S")
+    commit = f" · `{head_sha[:8]}`" if head_sha else ""
+    #o título vai numa linha só; quebras viriam de uma saída fora do padrão
+    entradas.append(f"- {quando}{commit} · {' '.join(titulo.split())}")
+    entradas = entradas[-LIMITE_HISTORICO_PR:]
+
+    conteudo_historico = (
+        f"<details><summary>🔄 Atualizações do CodeWise (últimas {len(entradas)})</summary>\n\n"
+        + "\n".join(reversed(entradas))
+        + "\n\n</details>"
+    )
+    body = substituir_secao(body, "descricao", descricao.strip())
+    return substituir_secao(body, "historico", conteudo_historico)
+
+
+def montar_comentario(analise, head_sha=None, momento=None):
+    """
+    Args:
+        analise: Texto da análise técnica
+        head_sha: SHA do HEAD analisado (opcional)
+        momento: Data da análise (opcional, padrão: agora)
+
+    Returns:
+        str: Corpo do comentário do CodeWise, identificado pelo marcador
+    """
+    quando = (momento or datetime.now()).strftime("%d/%m/%Y %H:%M:%S")
+    commit = f" (commit `{head_sha[:8]}`)" if head_sha else ""
+    return f"{MARCADOR_COMENTARIO}\n{analise.strip()}\n\n---\n_Atualizado pelo CodeWise em {quando}{commit}._"
+
+
+def montar_analise_achados(resumo, novos, resolvidos, mantidos):
+    """
+    Monta o texto publicado quando a análise traz achados estruturados: só os novos e os
+    resolvidos desde a última publicação aparecem por extenso; os que continuam em aberto
+    ficam recolhidos.
+
+    Args:
+        resumo: Resumo executivo da análise
+        novos: Achados que não estavam na última publicação
+        resolvidos: Achados da última publicação que não aparecem mais
+        mantidos: Achados que continuam em aberto
+
+    Returns:
+        str: Texto da análise para 'montar_comentario'
+    """
+    partes = [resumo.strip(), "### Achados desde a última análise"] if resumo.strip() else ["### Achados desde a última análise"]
+    if novos:
+        partes.append(f"**🆕 Novos ({len(novos)})**\n" + "\n".join(formatar_achado(a) for a in novos))
+    if resolvidos:
+        partes.append(f"**✅ Resolvidos ({len(resolvidos)})**\n" + "\n".join(formatar_achado(a) for a in resolvidos))
+    if mantidos:
+        partes.append(
+            f"<details><summary>Em aberto desde análises anteriores ({len(mantidos)})</summary>\n\n"
+            + "\n".join(formatar_achado(a) for a in mantidos)
+            + "\n\n</details>"
+        )
+    if not (novos or resolvidos or mantidos):
+        partes.append("Nenhum achado em aberto.")
+    return "\n\n".join(partes)
+
+
+# ===================================================================
+# ESTADO LOCAL DE CADA PR (.git/codewise/prs)
+# ===================================================================
+
+def _caminho_estado_pr(repo_path, repo_slug, numero):
+    """
+    Returns:
+        str ou None: Caminho de '.git/codewise/prs/<dono>__<repo>__<numero>.json', None se não for um repositório Git
+    """
+    dir_codewise = obter_dir_codewise(repo_path)
+    if not dir_codewise:
+        return None
+    dir_prs = os.path.join(dir_codewise, "prs")
+    os.makedirs(dir_prs, exist_ok=True)
+    return os.path.join(dir_prs, f"{repo_slug.replace('/', '__')}__{numero}.json")
+
+
+def carregar_estado_pr(repo_path, repo_slug, numero):
+    """
+    Returns:
+        dict: Estado salvo do PR ({"comentario_id", "achados"}), vazio se não houver
+    """
+    caminho = _caminho_estado_pr(repo_path, repo_slug, numero)
+    if not caminho:
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def salvar_estado_pr(repo_path, repo_slug, numero, estado):
+    """
+    Grava o estado do PR de forma atômica; o hook e o worker em segundo plano podem gravar ao mesmo tempo.
+    """
+    caminho = _caminho_estado_pr(repo_path, repo_slug, numero)
+    if not caminho:
+        return
+    temp = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, ensure_ascii=False, indent=2)
+        os.replace(temp, caminho)
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o estado do PR: {e}", file=sys.stderr)
+
+
+def publicar_pr(cliente_github, repo_path, repo_slug, pr, titulo=None, body=None, analise=None, head_sha=None, arquivos_analisados=None):
+    """
+    Atualiza título/body e publica a análise no comentário único do CodeWise: o comentário
+    existente é editado e só é criado se ainda não houver um no PR. Quando a análise traz a
+    seção de achados, ela é comparada com a última publicada no PR e o comentário só é
+    editado se houver achados novos ou resolvidos.
+
+    Args:
+        cliente_github: Cliente retornado por 'obter_cliente_github'
+        repo_path: Caminho para o repositório Git local
+        repo_slug: Repositório alvo ('usuario/repo')
+        pr: PR retornado por 'consultar_repositorio' ou 'criar_pr'
+        titulo: Novo título (opcional)
+        body: Novo body, já montado com 'montar_body_pr' (opcional)
+        analise: Texto da análise técnica (opcional)
+        head_sha: SHA do HEAD analisado, exibido no comentário (opcional)
+        arquivos_analisados: Arquivos do intervalo analisado (opcional); achados publicados de
+            arquivos fora dele continuam em aberto em vez de aparecerem como resolvidos
+
+    Returns:
+        bool: True se o comentário foi criado ou editado
+
+    Raises:
+        ErroGitHub: Se a publicação falhar
+    """
+    estado = carregar_estado_pr(repo_path, repo_slug, pr["numero"]) if analise is not None else {}
+    if analise is not None:
+        resumo, achados = separar_achados(analise)
+        if achados is None:
+            #análise sem achados estruturados: vai inteira e a próxima comparação recomeça do zero
+            estado.pop("achados", None)
+        else:
+            anteriores = estado.get("achados") or []
+            if arquivos_analisados is not None:
+                #um arquivo fora do intervalo não foi reanalisado: os achados publicados dele seguem valendo
+                chaves = {a["chave"] for a in achados}
+                fora = set(arquivos_analisados)
+                achados = achados + [a for a in anteriores if a["arquivo"] != "geral" and a["arquivo"] not in fora and a["chave"] not in chaves]
+            novos, resolvidos, mantidos = diferenca_achados(anteriores, achados)
+            if "achados" in estado and not novos and not resolvidos:
+                print("ℹ️ Nenhum achado novo ou resolvido desde a última análise publicada; comentário mantido.", file=sys.stderr)
+                analise = None
+            else:
+                analise = montar_analise_achados(resumo, novos, resolvidos, mantidos)
+                estado["achados"] = achados
+
+    if analise is None:
+        if titulo is not None or body is not None:
+            cliente_github.publicar_no_pr(repo_slug, pr, titulo=titulo, body=body)
+        return False
+
+    id_comentario = estado.get("comentario_id")
+    if not id_comentario:
+        #outra máquina ou uma versão anterior pode ter criado o comentário
+        try:
+            id_comentario = cliente_github.localizar_comentario(repo_slug, pr, MARCADOR_COMENTARIO)
+        except ErroGitHub as e:
+            print(f"⚠️ Não foi possível procurar o comentário do CodeWise no PR: {e}", file=sys.stderr)
+
+    comentario = montar_comentario(analise, head_sha)
+    try:
+        novo_id = cliente_github.publicar_no_pr(repo_slug, pr, titulo=titulo, body=body, comentario=comentario, id_comentario=id_comentario)
+    except ErroGitHub as e:
+        if not id_comentario:
+            raise
+        #o comentário salvo pode ter sido apagado no GitHub; cria outro
+        print(f"⚠️ Não foi possível editar o comentário do CodeWise ({e}). Criando um novo...", file=sys.stderr)
+        novo_id = cliente_github.publicar_no_pr(repo_slug, pr, titulo=titulo, body=body, comentario=comentario)
+
+    estado["comentario_id"] = novo_id
+    salvar_estado_pr(repo_path, repo_slug, pr["numero"], estado)
+    return True
@@ -1,17 +1,38 @@
 import os
 from crewai import LLM
 import sys
+from .orcamento_tempo import tempo_limite_llm
+
+def parametros_cache_prompt(provider: str) -> dict:
+    """
+    Monta os parâmetros extras do litellm para cache de prompt do provedor.
+    OpenAI e Gemini 2.5 já reaproveitam prefixos iguais automaticamente; o cache explícito
+    (context caching do Gemini) é ativado com CODEWISE_PROMPT_CACHE=1 no .env.
+    
+    Args:
+        provider: Nome do provedor ('GEMINI', 'OPENAI', 'GROQ', 'COHERE')
+        
+    Returns:
+        dict: Parâmetros repassados ao LLM, vazio se não houver suporte
+    """
+    if os.getenv("CODEWISE_PROMPT_CACHE", "0") != "1":
+        return {}
+    if provider == "GEMINI":
+        #marca a mensagem do usuário (que começa com o contexto compartilhado) como cacheável
+        return {"cache_control_injection_points": [{"location": "message", "role": "user"}]}
+    return {}
 
 def create_llm(provider:str, model:str)-> LLM:
     """
     Cria e configura uma instância de LLM baseada no provedor especificado.
     
     Args:
-        provider: Nome do provedor ('GEMINI', 'OPENAI', 'GROQ', 'COHERE')
+        provider: Nome do provedor ('GEMINI', 'OPENAI', 'GROQ', 'COHERE', 'LOCAL')
         model: Nome do modelo a ser utilizado
         
     Returns:
-        LLM: Instância configurada do modelo de linguagem
+        LLM: Instância configurada do modelo de linguagem; cada chamada é cancelada
+            depois de CODEWISE_TEMPO_LLM segundos
         
     Raises:
         SystemExit: Se a API key não estiver configurada ou houver erro na inicialização
@@ -23,7 +44,9 @@ def create_llm(provider:str, model:str)-> LLM:
         try:
             return LLM(
                 model= "gemini/" + model,
-                temperature=0.7
+                temperature=0.7,
+                timeout=tempo_limite_llm(),
+                **parametros_cache_prompt(provider)
             )
         except Exception as e:
             print(f"Erro ao inicializar o LLM. Verifique sua chave de API e dependências. Erro: {e}")
@@ -36,6 +59,7 @@ def create_llm(provider:str, model:str)-> LLM:
             return LLM(
                 model= "openai/" + model,
                 temperature=0.7,
+                timeout=tempo_limite_llm(),
             )
         except Exception as e:
             print(f"Erro ao inicializar o LLM. Verifique sua chave de API e dependências. Erro: {e}")
@@ -48,6 +72,24 @@ def create_llm(provider:str, model:str)-> LLM:
             return LLM(
                 model= "groq/" + model,
                 temperature=0.7,
+                timeout=tempo_limite_llm(),
+            )
+        except Exception as e:
+            print(f"Erro ao inicializar o LLM. Verifique sua chave de API e dependências. Erro: {e}")
+            sys.exit(1)
+    elif provider == "LOCAL":
+        #qualquer servidor compatível com a API da OpenAI (Ollama, llama.cpp, vLLM ou um stand-in de testes)
+        base_url = os.getenv("LOCAL_LLM_BASE_URL")
+        if not base_url:
+            print("Erro: A variável de ambiente LOCAL_LLM_BASE_URL não foi definida.")
+            sys.exit(1)
+        try:
+            return LLM(
+                model= "openai/" + model,
+                base_url=base_url,
+                api_key=os.getenv("LOCAL_LLM_API_KEY", "local"),
+                temperature=0.7,
+                timeout=tempo_limite_llm(),
             )
         except Exception as e:
             print(f"Erro ao inicializar o LLM. Verifique sua chave de API e dependências. Erro: {e}")
@@ -60,6 +102,7 @@ def create_llm(provider:str, model:str)-> LLM:
             return LLM(
                 model= "cohere_chat/" + model,
                 temperature=0.7,
+                timeout=tempo_limite_llm(),
             )
         except Exception as e:
             print(f"Erro ao inicializar o LLM. Verifique sua chave de API e dependências. Erro: {e}")
@@ -0,0 +1,292 @@
+import os
+import re
+from collections import Counter
+from dotenv import load_dotenv
+
+# ===================================================================
+# TÍTULO E DESCRIÇÃO DE PR GERADOS LOCALMENTE, SEM LLM
+# ===================================================================
+
+#tipos aceitos no título, na ordem usada para desempatar
+TIPOS_CONVENCIONAIS = ("feat", "fix", "refactor", "perf", "docs", "test", "build", "ci", "chore", "style")
+
+#'ia' (padrão): só o LLM; 'local': só o gerador local; 'refinar': o rascunho local vai junto para o LLM
+MODOS_TEXTOS_PR = ("ia", "local", "refinar")
+
+LIMITE_TITULO = 72
+LIMITE_ARQUIVOS_DESCRICAO = 30
+LIMITE_FUNCOES_ARQUIVO = 8
+
+_PADRAO_CONVENCIONAL = re.compile(r"^(" + "|".join(TIPOS_CONVENCIONAIS) + r")(?:\(([^)]+)\))?!?:\s*(.+)$", re.IGNORECASE)
+
+#palavras dos commits que indicam o tipo, em português e inglês; a ordem também desempata
+PALAVRAS_TIPO = (
+    ("fix", ("corrige", "correção", "corrigido", "conserta", "fix", "bug", "erro", "hotfix")),
+    ("refactor", ("refatora", "refatoração", "refactor", "reorganiza", "renomeia", "rename", "simplifica", "limpeza")),
+    ("perf", ("otimiza", "otimização", "desempenho", "performance", "perf", "acelera")),
+    ("docs", ("documenta", "documentação", "readme", "docs", "docstring")),
+    ("test", ("teste", "testes", "test", "tests")),
+    ("feat", ("adiciona", "implementa", "cria", "novo", "nova", "suporte", "add", "feature")),
+)
+
+VERBOS_TIPO = {
+    "feat": "adiciona mudanças em",
+    "fix": "corrige problemas em",
+    "refactor": "refatora",
+    "perf": "otimiza",
+    "docs": "atualiza a documentação de",
+    "test": "atualiza os testes de",
+    "build": "atualiza o build e as dependências de",
+    "ci": "atualiza a integração contínua de",
+    "chore": "atualiza",
+    "style": "ajusta a formatação de",
+}
+
+#nomes definidos ou alterados, lidos das linhas adicionadas e do contexto dos cabeçalhos '@@'
+_PADRAO_DEFINICAO = re.compile(r"^\s*(?:export\s+)?(?:async\s+)?(?:def|class|function|func|fn)\s+([A-Za-z_][A-Za-z0-9_]*)\s*[(:<{]")
+
+
+def modo_textos_pr() -> str:
+    """
+    Returns:
+        str: Modo configurado em CODEWISE_TEXTOS_PR ('ia', 'local' ou 'refinar'); 'ia' se inválido
+    """
+    load_dotenv()
+    modo = os.getenv("CODEWISE_TEXTOS_PR", "ia").strip().lower()
+    return modo if modo in MODOS_TEXTOS_PR else "ia"
+
+
+def _categoria_arquivo(caminho: str):
+    """
+    Returns:
+        str ou None: Tipo implicado só pelo caminho ('docs', 'test', 'ci', 'build'), None para código
+    """
+    caminho_min = caminho.lower()
+    nome = os.path.basename(caminho_min)
+    partes = caminho_min.split("/")
+    if caminho_min.startswith(".github/workflows/") or nome in (".gitlab-ci.yml", ".travis.yml", "azure-pipelines.yml"):
+        return "ci"
+    if nome.endswith((".md", ".rst", ".txt")) and not nome.startswith("requirements") or "docs" in partes[:-1]:
+        return "docs"
+    if nome.startswith("test_") or nome.endswith(("_test.py", ".test.js", ".test.ts", ".spec.js", ".spec.ts", "_test.go")) or partes[0] in ("tests", "test"):
+        return "test"
+    if nome in ("setup.py", "setup.cfg", "pyproject.toml", "package.json", "dockerfile", "makefile") or nome.startswith("requirements"):
+        return "build"
+    return None
+
+
+def _arquivo_novo(arquivo) -> bool:
+    """
+    Returns:
+        bool: True se o diff do arquivo começa do zero ('@@ -0,0 ...'), ou seja, o arquivo foi criado
+    """
+    return bool(arquivo.hunks) and arquivo.hunks[0].startswith("@@ -0,0 ")
+
+
+def funcoes_alteradas(arquivo) -> list:
+    """
+    Extrai os nomes de funções e classes definidas ou tocadas pelos trechos do diff do arquivo.
+
+    Args:
+        arquivo: ArquivoAlterado com os hunks aparados
+
+    Returns:
+        list: Nomes na ordem em que aparecem, sem repetição
+    """
+    nomes = []
+    for linha in arquivo.hunks:
+        if linha.startswith("@@"):
+            #o git coloca depois do segundo '@@' a linha da função que contém o trecho
+            texto = linha.split("@@", 2)[-1]
+        elif linha.startswith("+") and not linha.startswith("+++"):
+            texto = linha[1:]
+        else:
+            continue
+        match = _PADRAO_DEFINICAO.match(texto)
+        if match and match.group(1) not in nomes:
+            nomes.append(match.group(1))
+    return nomes
+
+
+def _separar_convencional(mensagem: str):
+    """
+    Returns:
+        tuple: (tipo ou None, escopo ou None, assunto sem o prefixo)
+    """
+    match = _PADRAO_CONVENCIONAL.match(mensagem.strip())
+    if not match:
+        return None, None, mensagem.strip()
+    return match.group(1).lower(), match.group(2), match.group(3).strip()
+
+
+def _mais_frequente(contagem: Counter, ordem):
+    """
+    Returns:
+        str ou None: Chave mais frequente, desempatando pela posição em 'ordem'
+    """
+    if not contagem:
+        return None
+    return max(contagem, key=lambda tipo: (contagem[tipo], -list(ordem).index(tipo)))
+
+
+def inferir_tipo(contexto) -> str:
+    """
+    Infere o tipo Conventional Commits do intervalo: caminhos, depois prefixos e palavras
+    dos commits e, por fim, as estatísticas do diff.
+
+    Args:
+        contexto: GitContext do intervalo
+
+    Returns:
+        str: Um dos TIPOS_CONVENCIONAIS
+    """
+    categorias = {_categoria_arquivo(a.caminho) for a in contexto.arquivos}
+    if len(categorias) == 1 and None not in categorias:
+        return categorias.pop()
+
+    prefixos = Counter(t for t, _, _ in map(_separar_convencional, contexto.commits) if t)
+    tipo = _mais_frequente(prefixos, TIPOS_CONVENCIONAIS)
+    if tipo:
+        return tipo
+
+    palavras = Counter()
+    for mensagem in contexto.commits:
+        tokens = set(re.findall(r"\w+", mensagem.lower()))
+        for tipo, chaves in PALAVRAS_TIPO:
+            if tokens.intersection(chaves):
+                palavras[tipo] += 1
+    tipo = _mais_frequente(palavras, [t for t, _ in PALAVRAS_TIPO])
+    if tipo:
+        return tipo
+
+    if not any(_arquivo_novo(a) for a in contexto.arquivos) and contexto.total_removidas() >= contexto.total_adicionadas():
+        return "refactor"
+    return "feat"
+
+
+def inferir_escopo(contexto):
+    """
+    Usa o escopo comum dos commits ou, se não houver, o diretório (ou arquivo) comum às mudanças de código.
+
+    Args:
+        contexto: GitContext do intervalo
+
+    Returns:
+        str ou None: Escopo do título
+    """
+    escopos = {e for _, e, _ in map(_separar_convencional, contexto.commits) if e}
+    if len(escopos) == 1:
+        return escopos.pop()
+
+    caminhos = [a.caminho for a in contexto.arquivos if _categoria_arquivo(a.caminho) is None] or [a.caminho for a in contexto.arquivos]
+    if len(caminhos) == 1:
+        return os.path.splitext(os.path.basename(caminhos[0]))[0]
+    partes = [c.split("/") for c in caminhos]
+    if all(len(p) > 1 for p in partes):
+        primeiros = {p[0] for p in partes}
+        if len(primeiros) == 1:
+            raiz = primeiros.pop()
+            segundos = {p[1] for p in partes if len(p) > 2}
+            #'src/' e 'lib/' dizem pouco: desce um nível se todos estiverem no mesmo pacote
+            if raiz in ("src", "lib") and len(segundos) == 1 and all(len(p) > 2 for p in partes):
+                return segundos.pop()
+            return raiz
+    return None
+
+
+def gerar_titulo_local(contexto) -> str:
+    """
+    Monta o título do PR no padrão Conventional Commits, de forma determinística.
+
+    Args:
+        contexto: GitContext do intervalo
+
+    Returns:
+        str: Título no formato 'tipo(escopo): assunto'
+    """
+    tipo = inferir_tipo(contexto)
+    escopo = inferir_escopo(contexto)
+
+    separados = [_separar_convencional(c) for c in contexto.commits]
+    do_tipo = [assunto for t, _, assunto in separados if t == tipo]
+    if len(separados) == 1:
+        assunto = separados[0][2]
+    elif do_tipo:
+        #o log vem do mais novo para o mais antigo; o primeiro commit costuma nomear a mudança
+        assunto = do_tipo[-1]
+    else:
+        if escopo:
+            alvo = escopo
+        elif len(contexto.arquivos) == 1:
+            alvo = os.path.basename(contexto.arquivos[0].caminho)
+        else:
+            alvo = f"{len(contexto.arquivos)} arquivos"
+        assunto = f"{VERBOS_TIPO[tipo]} {alvo}"
+
+    assunto = assunto.rstrip(". ")
+    prefixo = f"{tipo}({escopo})" if escopo else tipo
+    titulo = f"{prefixo}: {assunto}"
+    if len(titulo) > LIMITE_TITULO:
+        titulo = titulo[:LIMITE_TITULO - 3].rstrip() + "..."
+    return titulo
+
+
+def gerar_descricao_local(contexto) -> str:
+    """
+    Monta a descrição do PR a partir de commits, arquivos, estatísticas e funções alteradas.
+
+    Args:
+        contexto: GitContext do intervalo
+
+    Returns:
+        str: Descrição em Markdown
+    """
+    escopo = inferir_escopo(contexto)
+    foco = f", com foco em `{escopo}`" if escopo else ""
+    linhas = [
+        "## Resumo",
+        "",
+        f"{len(contexto.commits)} commit(s) alterando {len(contexto.arquivos)} arquivo(s) "
+        f"(+{contexto.total_adicionadas()} -{contexto.total_removidas()}){foco}.",
+    ]
+
+    if contexto.commits:
+        linhas += ["", "## Commits", ""]
+        linhas += [f"- {mensagem}" for mensagem in reversed(contexto.commits)]
+
+    if contexto.arquivos:
+        linhas += ["", "## Arquivos alterados", ""]
+        for arquivo in contexto.arquivos[:LIMITE_ARQUIVOS_DESCRICAO]:
+            if arquivo.binario:
+                detalhe = "binário"
+            else:
+                detalhe = f"+{arquivo.adicionadas} -{arquivo.removidas}"
+                if _arquivo_novo(arquivo):
+                    detalhe += ", novo"
+            linha = f"- `{arquivo.caminho}` ({detalhe})"
+            funcoes = funcoes_alteradas(arquivo)
+            if funcoes:
+                nomes = ", ".join(f"`{f}`" for f in funcoes[:LIMITE_FUNCOES_ARQUIVO])
+                if len(funcoes) > LIMITE_FUNCOES_ARQUIVO:
+                    nomes += f" e mais {len(funcoes) - LIMITE_FUNCOES_ARQUIVO}"
+                linha += f": {nomes}"
+            linhas.append(linha)
+        if len(contexto.arquivos) > LIMITE_ARQUIVOS_DESCRICAO:
+            linhas.append(f"- ... e mais {len(contexto.arquivos) - LIMITE_ARQUIVOS_DESCRICAO} arquivo(s)")
+
+    return "\n".join(linhas)
+
+
+def anexar_rascunho(entrada: str, rascunho: str) -> str:
+    """
+    Acrescenta o rascunho local ao contexto enviado ao LLM no modo 'refinar'.
+    O contexto vem primeiro para o prefixo do prompt continuar igual entre as tarefas.
+
+    Args:
+        entrada: Contexto compacto das mudanças
+        rascunho: Título ou descrição gerados localmente
+
+    Returns:
+        str: Texto para o placeholder '{input}'
+    """
+    return f"{entrada}\n\n{'='*80}\nRascunho gerado automaticamente a partir do diff (revise, corrija e melhore):\n{rascunho}"
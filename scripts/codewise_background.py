@@ -0,0 +1,265 @@
+import subprocess
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from codewise_lib.entradagit import obter_dir_codewise, listar_arquivos_intervalo
+
+# ===================================================================
+# FILA LOCAL DE JOBS EM SEGUNDO PLANO (.git/codewise/jobs)
+# ===================================================================
+
+def obter_dir_jobs(repo_path):
+    """
+    Retorna o diretório onde ficam os jobs em segundo plano do repositório.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+
+    Returns:
+        str: Caminho de '.git/codewise/jobs'
+    """
+    dir_codewise = obter_dir_codewise(repo_path)
+    if not dir_codewise:
+        sys.exit("❌ Erro: Não foi possível localizar o diretório '.git' do repositório.")
+    dir_jobs = os.path.join(dir_codewise, "jobs")
+    os.makedirs(dir_jobs, exist_ok=True)
+    return dir_jobs
+
+def salvar_job(job_dir, job):
+    """
+    Grava o estado do job de forma atômica para que 'codewise-status' nunca leia um arquivo pela metade.
+
+    Args:
+        job_dir: Diretório do job
+        job: Dicionário com os dados e o status do job
+    """
+    caminho = os.path.join(job_dir, "job.json")
+    temp = caminho + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(job, f, ensure_ascii=False, indent=2)
+    os.replace(temp, caminho)
+
+def carregar_job(job_dir):
+    """
+    Lê o estado de um job.
+
+    Args:
+        job_dir: Diretório do job
+
+    Returns:
+        dict ou None: Dados do job, None se não existir ou estiver corrompido
+    """
+    try:
+        with open(os.path.join(job_dir, "job.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def enfileirar_analise(repo_path, dados_job):
+    """
+    Registra um job de análise e inicia o worker desacoplado do processo do hook.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        dados_job: Dados do PR e do intervalo fixo (base/head) a analisar
+
+    Returns:
+        str: Identificador do job criado
+    """
+    job_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{(dados_job.get('head') or 'head')[:8]}"
+    job_dir = os.path.join(obter_dir_jobs(repo_path), job_id)
+    os.makedirs(job_dir, exist_ok=True)
+
+    job = dict(dados_job)
+    job.update({"id": job_id, "repo_path": repo_path, "status": "pendente", "criado_em": datetime.now().isoformat(timespec="seconds")})
+    salvar_job(job_dir, job)
+
+    iniciar_worker_desacoplado(["scripts.codewise_background", "--job", job_dir], repo_path, os.path.join(job_dir, "log.txt"))
+    return job_id
+
+def iniciar_worker_desacoplado(argumentos, repo_path, caminho_log, baixa_prioridade=False):
+    """
+    Inicia 'python -m <argumentos>' desacoplado do processo do hook, com a saída no log informado.
+
+    Args:
+        argumentos: Módulo e argumentos do worker (ex: ['scripts.codewise_background', '--job', dir])
+        repo_path: Caminho para o repositório Git local
+        caminho_log: Arquivo onde stdout e stderr do worker são acrescentados
+        baixa_prioridade: Se True, no Windows o worker já nasce com prioridade abaixo do normal
+            (no POSIX o próprio worker chama 'os.nice')
+    """
+    env = os.environ.copy()
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = f"{project_root}{os.pathsep}{env.get('PYTHONPATH', '')}"
+    env['PYTHONIOENCODING'] = 'utf-8'
+
+    #o worker sobrevive ao fim do hook: nova sessão no POSIX, processo desacoplado no Windows
+    opcoes = {}
+    if sys.platform == 'win32':
+        opcoes["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        if baixa_prioridade:
+            opcoes["creationflags"] |= subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    else:
+        opcoes["start_new_session"] = True
+
+    with open(caminho_log, "a", encoding="utf-8") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", *argumentos],
+            cwd=repo_path, env=env, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            **opcoes
+        )
+
+# ===================================================================
+# WORKER: ANÁLISE + AVALIAÇÃO + NOTIFICAÇÃO + COMENTÁRIO NO PR
+# ===================================================================
+
+def executar_job(job_dir):
+    """
+    Executa um job enfileirado: roda o modo 'analise' no intervalo fixo e comenta o resultado no PR.
+
+    Args:
+        job_dir: Diretório do job
+
+    Returns:
+        int: Código de saída do worker (0 sucesso, 1 falha)
+    """
+    job = carregar_job(job_dir)
+    if job is None:
+        print(f"❌ Job não encontrado em '{job_dir}'.", file=sys.stderr)
+        return 1
+
+    job.update({"status": "executando", "pid": os.getpid(), "iniciado_em": datetime.now().isoformat(timespec="seconds")})
+    salvar_job(job_dir, job)
+    try:
+        return _processar_job(job_dir, job)
+    except (Exception, SystemExit) as e:
+        #qualquer falha fica registrada; sem isso o job seguiria como 'executando' no 'codewise-status'
+        erro = str(e) if not isinstance(e, SystemExit) else f"Execução encerrada com código {e.code}."
+        job.update({"status": "falhou", "erro": erro or type(e).__name__, "finalizado_em": datetime.now().isoformat(timespec="seconds")})
+        salvar_job(job_dir, job)
+        print(f"❌ Job {job.get('id')} falhou: {job['erro']}", file=sys.stderr)
+        return 1
+
+def _processar_job(job_dir, job):
+    """
+    Corpo de 'executar_job': análise, criação do PR se preciso e publicação do comentário.
+
+    Args:
+        job_dir: Diretório do job
+        job: Dados do job, já marcado como 'executando'
+
+    Returns:
+        int: Código de saída do worker (0 sucesso, 1 falha)
+    """
+    from .codewise_review_win import run_codewise_mode
+    from codewise_lib.cliente_github import obter_cliente_github, ErroGitHub
+    from codewise_lib.publicacao_pr import montar_body_pr, publicar_pr
+    from codewise_lib.precomputo import obter_resultados_precomputados, notificar_avaliacao_precomputada
+
+    repo_path = job["repo_path"]
+    print(f"🚀 Job {job['id']} iniciado para '{job['branch']}' ({job['base'][:8]}..{job['head'][:8]})", file=sys.stderr)
+
+    #o post-commit pode já ter analisado exatamente este intervalo
+    analise_tecnica = obter_resultados_precomputados(repo_path, job["base"], job["head"], ["analise"]).get("analise")
+    if analise_tecnica:
+        print("♻️ Análise técnica reaproveitada do pré-cálculo do post-commit.", file=sys.stderr)
+        notificar_avaliacao_precomputada(repo_path, job["base"], job["head"])
+    else:
+        analise_tecnica = run_codewise_mode("analise", repo_path, job["branch"], job["base"], job["head"])
+    if not analise_tecnica:
+        job.update({"status": "falhou", "erro": "A análise técnica não gerou resultado.", "finalizado_em": datetime.now().isoformat(timespec="seconds")})
+        salvar_job(job_dir, job)
+        return 1
+
+    analise_path = os.path.join(job_dir, "analise.md")
+    with open(analise_path, "w", encoding="utf-8") as f:
+        f.write(analise_tecnica)
+
+    repo_alvo_pr = job["repo_alvo"]
+    try:
+        cliente_github = obter_cliente_github(repo_path)
+        #uma consulta traz o PR aberto com o identificador usado na publicação do comentário
+        pr = cliente_github.consultar_repositorio(repo_alvo_pr, job["head_branch_completa"].split(":")[0], job["branch"])["pr"]
+        if not pr:
+            #no primeiro push de uma branch o PR não pôde ser criado no hook; agora o push já terminou
+            print("🆕 Criando Pull Request após o push...", file=sys.stderr)
+            body = montar_body_pr("", job["descricao"], job["titulo"], job["head"])
+            pr = cliente_github.criar_pr(repo_alvo_pr, job["base_branch"], job["head_branch_completa"], job["titulo"], body)
+    except ErroGitHub as e:
+        print(f"⚠️ Não foi possível obter ou criar o PR: {e}", file=sys.stderr)
+        pr = None
+
+    job["pr_numero"] = pr["numero"] if pr else None
+    if not pr:
+        job.update({"status": "concluido_sem_pr", "finalizado_em": datetime.now().isoformat(timespec="seconds")})
+        salvar_job(job_dir, job)
+        print(f"⚠️ Análise salva em '{analise_path}', mas nenhum PR foi encontrado para comentar.", file=sys.stderr)
+        return 0
+
+    print(f"💬 Comentando análise técnica no PR #{pr['numero']}...", file=sys.stderr)
+    try:
+        #edita o comentário do CodeWise já existente no PR em vez de acrescentar outro
+        if publicar_pr(cliente_github, repo_path, repo_alvo_pr, pr, analise=analise_tecnica, head_sha=job["head"],
+                       arquivos_analisados=listar_arquivos_intervalo(repo_path, job["base"], job["head"])):
+            print("✅ Comentário postado com sucesso.", file=sys.stderr)
+        job["status"] = "concluido"
+    except ErroGitHub as e:
+        job.update({"status": "falhou", "erro": f"Falha ao comentar no PR: {e}"})
+        print(f"❌ {job['erro']}", file=sys.stderr)
+
+    job["finalizado_em"] = datetime.now().isoformat(timespec="seconds")
+    salvar_job(job_dir, job)
+    return 0 if job["status"] == "concluido" else 1
+
+# ===================================================================
+# LÓGICA DO COMANDO 'codewise-status'
+# ===================================================================
+
+def main_status():
+    """
+    Lista os jobs em segundo plano do repositório atual ou exibe o log de um deles.
+    """
+    parser = argparse.ArgumentParser(description="Status das análises do CodeWise em segundo plano.")
+    parser.add_argument("--log", type=str, required=False, help="Exibe o log do job informado.")
+    parser.add_argument("--limite", type=int, default=10, help="Quantidade de jobs listados (padrão: 10).")
+    args = parser.parse_args()
+
+    dir_jobs = obter_dir_jobs(os.getcwd())
+
+    if args.log:
+        caminho_log = os.path.join(dir_jobs, args.log, "log.txt")
+        if not os.path.exists(caminho_log):
+            sys.exit(f"❌ Job '{args.log}' não encontrado.")
+        with open(caminho_log, "r", encoding="utf-8", errors="ignore") as f:
+            print(f.read())
+        return
+
+    jobs = sorted(os.listdir(dir_jobs), reverse=True)[:args.limite]
+    if not jobs:
+        print("Nenhuma análise em segundo plano registrada neste repositório.")
+        return
+
+    for job_id in jobs:
+        job = carregar_job(os.path.join(dir_jobs, job_id))
+        if job is None:
+            continue
+        pr = f"PR #{job['pr_numero']}" if job.get("pr_numero") else "sem PR"
+        print(f"{job_id}  {job['status']:<16} {job['branch']}  ({pr})")
+        if job.get("erro"):
+            print(f"    ↳ {job['erro']}")
+
+
+def main():
+    """
+    Ponto de entrada do worker, chamado como 'python -m scripts.codewise_background --job <dir>'.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--job", required=True, type=str, help="Diretório do job a executar.")
+    args = parser.parse_args()
+    sys.exit(executar_job(args.job))
+
+
+if __name__ == "__main__":
+    main()
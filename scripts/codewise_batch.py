@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# ===================================================================
+# LÓGICA DO COMANDO 'codewise-batch' (REVISÃO DE VÁRIOS REPOSITÓRIOS)
+# ===================================================================
+
+def ler_lista_jobs(caminho_lista):
+    """
+    Lê a lista de repositórios a revisar, uma entrada por linha: 'caminho_repo branch [base..head]'.
+    Linhas vazias e iniciadas por '#' são ignoradas.
+
+    Args:
+        caminho_lista: Arquivo com a lista de repositórios
+
+    Returns:
+        list: Lista de dicionários com repo, branch, base e head
+    """
+    jobs = []
+    with open(caminho_lista, "r", encoding="utf-8") as f:
+        for numero, linha in enumerate(f, start=1):
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            partes = linha.split()
+            if len(partes) not in (2, 3):
+                print(f"⚠️ Linha {numero} ignorada (esperado 'caminho_repo branch [base..head]'): {linha}", file=sys.stderr)
+                continue
+            base, head = None, None
+            if len(partes) == 3:
+                if ".." not in partes[2]:
+                    print(f"⚠️ Linha {numero} ignorada (intervalo deve ser 'base..head'): {linha}", file=sys.stderr)
+                    continue
+                base, head = partes[2].split("..", 1)
+            jobs.append({"repo": os.path.abspath(partes[0]), "branch": partes[1], "base": base, "head": head or None})
+    return jobs
+
+def chave_job(job):
+    """
+    Identificador estável de um job, usado para retomar execuções interrompidas.
+
+    Args:
+        job: Dicionário do job
+
+    Returns:
+        str: Chave 'repo|branch|base..head'
+    """
+    return f"{job['repo']}|{job['branch']}|{job['base'] or ''}..{job['head'] or ''}"
+
+def carregar_concluidos(caminho_saida):
+    """
+    Lê o JSONL de uma execução anterior e retorna os jobs que já terminaram.
+
+    Args:
+        caminho_saida: Caminho do JSONL consolidado
+
+    Returns:
+        set: Chaves dos jobs concluídos ou sem mudanças
+    """
+    concluidos = set()
+    if not os.path.exists(caminho_saida):
+        return concluidos
+    with open(caminho_saida, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                #última linha pode ter ficado pela metade se o processo foi morto
+                continue
+            if registro.get("status") in ("concluido", "sem_mudancas"):
+                concluidos.add(registro["chave"])
+    return concluidos
+
+_runners_por_thread = threading.local()
+
+def obter_runner_da_thread():
+    """
+    Retorna o CodewiseRunner do worker atual. Agentes, tarefas e crews montados no primeiro job
+    são reaproveitados nos seguintes; cada thread tem o seu porque as tarefas guardam a saída da última execução.
+
+    Returns:
+        CodewiseRunner: Runner exclusivo da thread
+    """
+    if not hasattr(_runners_por_thread, "runner"):
+        from codewise_lib.cw_runner import CodewiseRunner
+        _runners_por_thread.runner = CodewiseRunner()
+    return _runners_por_thread.runner
+
+def revisar_repositorio(job, notificar, locks_repo):
+    """
+    Executa o modo 'analise' do CodewiseRunner para um job e coleta nota e relatórios.
+
+    Args:
+        job: Dicionário do job
+        notificar: Se True, envia a avaliação ao gestor como no pre-push
+        locks_repo: Locks por repositório, para que dois jobs do mesmo repo não escrevam os relatórios juntos
+
+    Returns:
+        dict: Registro consolidado do job
+    """
+    from codewise_lib.notificacao_gestor import extrair_nota_e_justificativa
+
+    registro = {
+        "chave": chave_job(job), "repo": job["repo"], "branch": job["branch"],
+        "base": job["base"], "head": job["head"], "status": "falhou",
+        "nota": None, "relatorios": {}, "erro": None,
+    }
+    inicio = time.time()
+
+    try:
+        with locks_repo[job["repo"]]:
+            runner = obter_runner_da_thread()
+            try:
+                runner.executar(job["repo"], job["branch"], "analise", job["base"], job["head"], notificar=notificar)
+            except SystemExit as e:
+                #o runner encerra com sys.exit(0) quando não há commits novos no intervalo;
+                #outros códigos são falhas (ex: chave do provedor ausente, configuração inválida)
+                if e.code in (0, None):
+                    registro["status"] = "sem_mudancas"
+                else:
+                    registro["erro"] = e.code if isinstance(e.code, str) else f"Execução encerrada com código {e.code}."
+                return registro
+
+        dir_relatorios = os.path.join(job["repo"], "analises-concluidas")
+        if os.path.isdir(dir_relatorios):
+            for nome in sorted(os.listdir(dir_relatorios)):
+                caminho = os.path.join(dir_relatorios, nome)
+                #ignora relatórios antigos que esta execução não reescreveu
+                if os.path.getmtime(caminho) >= inicio:
+                    registro["relatorios"][nome] = caminho
+
+        if "avaliacao_codigo.md" in registro["relatorios"]:
+            registro["nota"], _ = extrair_nota_e_justificativa(registro["relatorios"]["avaliacao_codigo.md"])
+        registro["status"] = "concluido"
+    except Exception as e:
+        registro["erro"] = str(e)
+    finally:
+        registro["duracao_s"] = round(time.time() - inicio, 1)
+        registro["finalizado_em"] = datetime.now().isoformat(timespec="seconds")
+    return registro
+
+def main():
+    """
+    Ponto de entrada do 'codewise-batch': revisa uma lista de repositórios com um pool de workers,
+    cache de respostas e limite de requisições compartilhados, gravando um JSONL consolidado.
+    """
+    parser = argparse.ArgumentParser(description="Revisão em lote de vários repositórios com o CodeWise.")
+    parser.add_argument("lista", type=str, help="Arquivo com uma entrada por linha: 'caminho_repo branch [base..head]'.")
+    parser.add_argument("--saida", type=str, default="codewise-batch.jsonl", help="JSONL consolidado de notas e relatórios.")
+    parser.add_argument("--workers", type=int, default=4, help="Quantidade de repositórios revisados em paralelo.")
+    parser.add_argument("--max-rpm", type=int, default=os.getenv("CODEWISE_MAX_RPM", "30"), help="Limite de requisições por minuto ao LLM, somando todos os workers.")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Diretório do cache de respostas do LLM (padrão: ~/.cache/codewise/llm).")
+    parser.add_argument("--notificar", action="store_true", help="Envia cada avaliação ao gestor via Telegram.")
+    parser.add_argument("--autorizar-envio", action="store_true", help="Confirma o envio do código ao provedor de IA (execução sem prompt LGPD).")
+    args = parser.parse_args()
+
+    if not args.autorizar_envio:
+        sys.exit("❌ O modo em lote não exibe o aviso LGPD. Use --autorizar-envio para confirmar o envio dos dados ao provedor.")
+
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    from codewise_lib.llm_compartilhado import configurar_cache_llm, configurar_limitador
+    from codewise_lib.cache_usuario import obter_dir_cache_usuario
+    configurar_cache_llm(args.cache_dir or obter_dir_cache_usuario("llm"))
+    configurar_limitador(args.max_rpm)
+
+    jobs = ler_lista_jobs(args.lista)
+    concluidos = carregar_concluidos(args.saida)
+    pendentes = [j for j in jobs if chave_job(j) not in concluidos]
+    print(f"📋 {len(jobs)} job(s) na lista, {len(jobs) - len(pendentes)} já concluído(s), {len(pendentes)} a executar.", file=sys.stderr)
+
+    locks_repo = {j["repo"]: threading.Lock() for j in pendentes}
+    lock_saida = threading.Lock()
+    falhas = 0
+
+    with open(args.saida, "a", encoding="utf-8") as saida, ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futuros = {pool.submit(revisar_repositorio, job, args.notificar, locks_repo): job for job in pendentes}
+        for futuro in as_completed(futuros):
+            registro = futuro.result()
+            if registro["status"] == "falhou":
+                falhas += 1
+            with lock_saida:
+                saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                saida.flush()
+            nota = f"nota {registro['nota']}" if registro["nota"] is not None else registro["status"]
+            print(f"   - {registro['repo']} [{registro['branch']}]: {nota} ({registro['duracao_s']}s)", file=sys.stderr)
+
+    print(f"\n🎉 Lote finalizado. Resultados em '{args.saida}'.", file=sys.stderr)
+    if falhas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+from codewise_lib.historico import conectar_historico, medias_por, medias_criterios, ultimas_execucoes, caminho_historico
+
+# ===================================================================
+# CONSULTAS AO HISTÓRICO LOCAL DE EXECUÇÕES ('codewise-history')
+# ===================================================================
+
+
+def _epoch_data(texto: str) -> float:
+    """
+    Returns:
+        float: Epoch do início do dia informado em 'AAAA-MM-DD'
+    """
+    try:
+        return datetime.strptime(texto, "%Y-%m-%d").timestamp()
+    except ValueError:
+        sys.exit(f"❌ Data inválida '{texto}'; use AAAA-MM-DD.")
+
+
+def _periodo(args) -> tuple:
+    """
+    Returns:
+        tuple: (desde, ate) em epoch; sem datas, o mês atual (ou tudo, com --tudo)
+    """
+    if args.tudo:
+        return None, None
+    if args.desde or args.ate:
+        return (_epoch_data(args.desde) if args.desde else None), (_epoch_data(args.ate) if args.ate else None)
+    inicio_mes = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return inicio_mes.timestamp(), None
+
+
+def _formatar_numero(valor, casas=2) -> str:
+    return "-" if valor is None else f"{valor:.{casas}f}"
+
+
+def main():
+    """
+    Consulta o histórico local de execuções: médias por desenvolvedor ou repositório,
+    média por critério da avaliação e últimas execuções.
+    """
+    parser = argparse.ArgumentParser(description="Consulta o histórico local de execuções do CodeWise.")
+    parser.add_argument("consulta", nargs="?", default="devs", choices=["devs", "repos", "criterios", "ultimas"],
+                        help="devs (padrão): média por desenvolvedor; repos: média por repositório; "
+                             "criterios: média por critério; ultimas: últimas execuções.")
+    parser.add_argument("--desde", type=str, help="Data inicial (AAAA-MM-DD). Padrão: início do mês atual.")
+    parser.add_argument("--ate", type=str, help="Data final, exclusiva (AAAA-MM-DD).")
+    parser.add_argument("--tudo", action="store_true", help="Considera todo o histórico.")
+    parser.add_argument("--dev", type=str, help="Filtra pelo email do desenvolvedor.")
+    parser.add_argument("--repo", type=str, help="Filtra pelo caminho do repositório ('.' para o atual).")
+    parser.add_argument("--modo", type=str, help="Filtra pelo modo (titulo, descricao, analise, lint).")
+    parser.add_argument("--limite", type=int, default=20, help="Quantidade de execuções em 'ultimas' (padrão: 20).")
+    args = parser.parse_args()
+
+    if not os.path.exists(caminho_historico()):
+        print("Nenhuma execução registrada no histórico ainda.")
+        return
+
+    desde, ate = _periodo(args)
+    repo = os.path.abspath(args.repo) if args.repo else None
+    filtros = {"desde": desde, "ate": ate, "dev": args.dev, "repo": repo, "modo": args.modo}
+
+    inicio = time.perf_counter()
+    with conectar_historico() as conexao:
+        if args.consulta in ("devs", "repos"):
+            linhas = medias_por("dev" if args.consulta == "devs" else "repo", conexao, **filtros)
+            titulo = "Desenvolvedor" if args.consulta == "devs" else "Repositório"
+            if linhas:
+                print(f"{titulo:<45} {'média':>6} {'avaliações':>10} {'menor':>6} {'maior':>6}")
+            for grupo, media, total, menor, maior in linhas:
+                print(f"{(grupo or 'desconhecido'):<45} {media:>6.2f} {total:>10} {menor:>6.1f} {maior:>6.1f}")
+        elif args.consulta == "criterios":
+            linhas = medias_criterios(conexao, **filtros)
+            for criterio, media, maximo, total in linhas:
+                print(f"{criterio:<45} {media:>5.2f}/{_formatar_numero(maximo, 1):<5} ({total} avaliação(ões))")
+        else:
+            linhas = ultimas_execucoes(conexao, args.limite, **filtros)
+            for criado_em, repo_linha, branch, head_sha, email, modo, nota, t_prompt, t_resposta, duracao in linhas:
+                data = datetime.fromtimestamp(criado_em).strftime("%d/%m/%Y %H:%M")
+                tokens = f"{t_prompt or 0}+{t_resposta or 0} tokens"
+                print(f"{data}  {modo:<9} nota {_formatar_numero(nota, 1):>4}  {tokens:<18} {_formatar_numero(duracao, 1)}s  "
+                      f"{os.path.basename(repo_linha)}@{branch or '?'} ({(head_sha or '')[:8]})  {email or ''}")
+
+    if not linhas:
+        print("Nenhuma execução encontrada para os filtros informados.")
+    print(f"\n({len(linhas)} linha(s) em {(time.perf_counter() - inicio) * 1000:.1f} ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+from datetime import datetime
+from dotenv import load_dotenv
+from codewise_lib.entradagit import run_git_command, resolver_intervalo, resolver_sha
+from codewise_lib.metadados_repo import obter_branch_padrao
+from codewise_lib.precomputo import (
+    MODOS_PRECOMPUTO, ARQUIVO_AVALIACAO, caminho_precomputo, salvar_resultado_precomputado,
+    obter_resultados_precomputados, limpar_precomputos_antigos, obter_dir_precomputo,
+)
+from .codewise_background import iniciar_worker_desacoplado
+
+# ===================================================================
+# PRÉ-CÁLCULO EM SEGUNDO PLANO DISPARADO PELO HOOK POST-COMMIT
+# ===================================================================
+
+#espera antes de começar; commits em sequência rápida só pagam o último intervalo
+ATRASO_PADRAO_SEGUNDOS = 20
+
+
+def main_precomputar():
+    """
+    Ponto de entrada do hook post-commit ('codewise-precomputar'): agenda o pré-cálculo do
+    intervalo 'base..HEAD' da branch atual e retorna imediatamente, sem acessar a rede.
+    """
+    repo_path = os.getcwd()
+    branch = run_git_command(["git", "rev-parse", "--abbrev-ref", "HEAD"], repo_path)
+    if not branch or branch == "HEAD":
+        #HEAD destacado (rebase, bisect): não há branch para abrir PR
+        return
+    if branch == obter_branch_padrao(repo_path, "origin"):
+        return
+
+    head_sha = resolver_sha("HEAD", repo_path)
+    dir_precomputo = obter_dir_precomputo(repo_path)
+    if not dir_precomputo:
+        return
+    os.makedirs(dir_precomputo, exist_ok=True)
+
+    iniciar_worker_desacoplado(
+        ["scripts.codewise_precomputo", "--repo", repo_path, "--branch", branch, "--head", head_sha],
+        repo_path, os.path.join(dir_precomputo, "log.txt"), baixa_prioridade=True
+    )
+    print(f"🕒 CodeWise: pré-cálculo de '{branch}' ({head_sha[:8]}) agendado em segundo plano.", file=sys.stderr)
+
+
+def head_mudou(repo_path, branch, head_sha) -> bool:
+    """
+    Returns:
+        bool: True se a branch já aponta para outro commit (o intervalo deste job ficou obsoleto)
+    """
+    return resolver_sha(branch, repo_path) != head_sha
+
+
+def consentimento_lgpd_valido() -> bool:
+    """
+    O post-commit não tem como perguntar ao usuário: só envia dados se o julgamento LGPD do
+    provedor/modelo atual estiver em cache, dentro da validade e aprovado.
+
+    Returns:
+        bool: True se o pré-cálculo pode chamar o provedor
+    """
+    from codewise_lib.lgpd import obter_caminhos_cache_lgpd, verifica_se_existe_analise_lgpd, ler_metadados_lgpd
+
+    load_dotenv()
+    _, policy_file_path, lgpd_judge_file_path = obter_caminhos_cache_lgpd()
+    if not verifica_se_existe_analise_lgpd(policy_file_path, lgpd_judge_file_path):
+        return False
+    return bool((ler_metadados_lgpd(lgpd_judge_file_path) or {}).get("aprovado"))
+
+
+def executar_precomputo(repo_path, branch, head_sha):
+    """
+    Gera título, descrição e análise do intervalo 'base..head_sha' e guarda os resultados
+    para o pre-push. Para assim que a branch recebe outro commit.
+
+    Args:
+        repo_path: Caminho para o repositório Git local
+        branch: Branch em que o commit foi feito
+        head_sha: SHA do commit que disparou o hook
+
+    Returns:
+        int: Código de saída do worker (0 concluído ou descartado, 1 falha)
+    """
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+    print(f"\n[{datetime.now().isoformat(timespec='seconds')}] 🕒 Pré-cálculo de '{branch}' ({head_sha[:8]})", file=sys.stderr)
+    time.sleep(float(os.getenv("CODEWISE_PRECOMPUTO_ATRASO", ATRASO_PADRAO_SEGUNDOS)))
+    if head_mudou(repo_path, branch, head_sha):
+        print("⏭️ Um commit mais novo chegou; este pré-cálculo foi descartado.", file=sys.stderr)
+        return 0
+
+    if not consentimento_lgpd_valido():
+        print("⏭️ Sem julgamento LGPD aprovado e válido para o provedor/modelo atual; nada foi enviado.", file=sys.stderr)
+        print("   Rode o pre-push (ou 'codewise-lgpd-refresh') uma vez para registrar o julgamento.", file=sys.stderr)
+        return 0
+
+    #mesma base que o pre-push resolve, mas sem 'git fetch': se o remoto andar, o pre-push gera ao vivo
+    base_ref, _ = resolver_intervalo(repo_path, branch, buscar_remoto=False)
+    base_sha = resolver_sha(base_ref, repo_path)
+    if base_sha == base_ref:
+        print(f"⏭️ Base '{base_ref}' não encontrada localmente; nada a pré-calcular.", file=sys.stderr)
+        return 0
+
+    from codewise_lib.cw_runner import CodewiseRunner
+    runner = CodewiseRunner()
+    prontos = obter_resultados_precomputados(repo_path, base_sha, head_sha, MODOS_PRECOMPUTO)
+
+    for modo in MODOS_PRECOMPUTO:
+        if modo in prontos:
+            continue
+        if head_mudou(repo_path, branch, head_sha):
+            print("⏭️ Um commit mais novo chegou; pré-cálculo interrompido.", file=sys.stderr)
+            return 0
+        print(f"--- *! Pré-calculando [modo: {modo}] !* ---", file=sys.stderr)
+        try:
+            #a notificação ao gestor fica para o push que de fato usar a análise
+            texto = runner.executar(repo_path, branch, modo, base_sha, head_sha, notificar=False)
+        except Exception as e:
+            print(f"❌ Falha no pré-cálculo do modo '{modo}': {e}", file=sys.stderr)
+            return 1
+        if not texto:
+            continue
+        salvar_resultado_precomputado(repo_path, base_sha, head_sha, modo, texto)
+        if modo == "analise":
+            caminho_avaliacao = os.path.join(repo_path, "analises-concluidas", ARQUIVO_AVALIACAO)
+            if os.path.exists(caminho_avaliacao):
+                shutil.copyfile(caminho_avaliacao, os.path.join(caminho_precomputo(repo_path, base_sha, head_sha), ARQUIVO_AVALIACAO))
+
+    limpar_precomputos_antigos(repo_path)
+    print(f"✅ Pré-cálculo concluído para {base_sha[:8]}..{head_sha[:8]}.", file=sys.stderr)
+    return 0
+
+
+def main():
+    """
+    Ponto de entrada do worker, chamado como 'python -m scripts.codewise_precomputo'.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repo", required=True, type=str, help="Caminho para o repositório Git.")
+    parser.add_argument("--branch", required=True, type=str, help="Branch em que o commit foi feito.")
+    parser.add_argument("--head", required=True, type=str, help="SHA do commit que disparou o hook.")
+    args = parser.parse_args()
+    sys.exit(executar_precomputo(args.repo, args.branch, args.head))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,43 @@
-import shutil
 import subprocess
 import os
 import sys
 import re
-import json
 import argparse
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from dotenv import load_dotenv
+from codewise_lib.entradagit import resolver_intervalo, resolver_sha, obter_contexto_git, listar_arquivos_intervalo
+from codewise_lib.lgpd import obter_caminhos_cache_lgpd, verifica_se_existe_analise_lgpd, limpar_cache_lgpd
+from codewise_lib.cliente_github import obter_cliente_github, erro_branch_head_inexistente, ErroGitHub
+from codewise_lib.publicacao_pr import montar_body_pr, publicar_pr
+from codewise_lib.metadados_repo import obter_remotes, obter_branch_padrao, registrar_branch_padrao
+from codewise_lib.precomputo import obter_resultados_precomputados, notificar_avaliacao_precomputada
+from codewise_lib.orcamento_tempo import calcular_prazo, tempo_restante, MARGEM_PUBLICACAO
+from codewise_lib.sintese_local import TIPOS_CONVENCIONAIS, modo_textos_pr, gerar_titulo_local, gerar_descricao_local
+from .codewise_background import enfileirar_analise
 
 # ===================================================================
 # SEÇÃO DE FUNÇÕES AUXILIARES (COMPARTILHADAS)
 # ===================================================================
 
-def run_codewise_mode(mode, repo_path, branch_name):
-    """Executa a IA como um MÓDULO e captura a saída, resolvendo o ImportError."""
-    print(f"\n--- *! Executando IA [modo: {mode}] !* ---")
+def iniciar_codewise_mode(mode, repo_path, branch_name, base_ref=None, head_ref=None, aguardar_liberacao=False):
+    """
+    Inicia a IA como um MÓDULO em um subprocesso, sem esperar o resultado.
+    
+    Args:
+        mode: Modo de operação do CodewiseRunner
+        repo_path: Caminho para o repositório Git local
+        branch_name: Nome da branch analisada
+        base_ref: Referência base fixa do intervalo (opcional)
+        head_ref: Referência final fixa do intervalo (opcional)
+        aguardar_liberacao: Se True, o subprocesso coleta o contexto e monta as crews,
+            mas só chama o LLM depois de 'liberar_codewise_mode'
+        
+    Returns:
+        subprocess.Popen: Processo em execução
+    """
+    if not aguardar_liberacao:
+        print(f"\n--- *! Executando IA [modo: {mode}] !* ---")
     
     command = [
         sys.executable, "-m", "codewise_lib.main",
@@ -21,31 +45,78 @@ def run_codewise_mode(mode, repo_path, branch_name):
         "--branch", branch_name,
         "--mode", mode
     ]
+    if base_ref:
+        command.extend(["--base", base_ref])
+    if head_ref:
+        command.extend(["--head", head_ref])
+    if aguardar_liberacao:
+        command.append("--aguardar-liberacao")
+
+    env = os.environ.copy()
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = f"{project_root}{os.pathsep}{env.get('PYTHONPATH', '')}"
+
+    return subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE if aguardar_liberacao else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='ignore',
+        env=env
+    )
+
+def liberar_codewise_mode(processo, mode, autorizado=True, prazo=None):
+    """
+    Responde ao subprocesso iniciado com 'aguardar_liberacao': 'S' dispara as chamadas ao LLM.
+    
+    Args:
+        processo: Processo retornado por 'iniciar_codewise_mode'
+        mode: Modo de operação do subprocesso
+        autorizado: False encerra o subprocesso sem enviar dados
+        prazo: Instante absoluto (time.time()) até o qual o subprocesso pode começar novas etapas
+    """
+    if autorizado:
+        print(f"\n--- *! Executando IA [modo: {mode}] !* ---")
+    resposta = "N"
+    if autorizado:
+        resposta = f"S {prazo!r}" if prazo else "S"
     try:
-        env = os.environ.copy()
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        env['PYTHONPATH'] = f"{project_root}{os.pathsep}{env.get('PYTHONPATH', '')}"
+        processo.stdin.write(f"{resposta}\n")
+        processo.stdin.flush()
+    except (BrokenPipeError, OSError, ValueError):
+        #o subprocesso já terminou (ex: nenhum commit novo para analisar)
+        pass
+
+def aguardar_codewise_mode(processo, mode, prazo=None):
+    """
+    Espera o subprocesso da IA terminar e trata as falhas.
+    
+    Args:
+        processo: Processo retornado por 'iniciar_codewise_mode'
+        mode: Modo de operação, usado nas mensagens de erro
+        prazo: Instante absoluto em que o subprocesso é cancelado (opcional)
         
-        result = subprocess.run(
-            command, 
-            check=True, 
-            capture_output=True, 
-            text=True, 
-            encoding='utf-8', 
-            errors='ignore', 
-            env=env,
-            stdin=subprocess.DEVNULL
-        )
-
-        #if result.stderr:
-            #print(result.stderr, file=sys.stderr)
-
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        error_output = e.stderr or ""
-        if "429" in error_output and "RESOURCE_EXHAUSTED" in error_output:
-            # Imprime a mensagem amigável e formatada
-            print("""
+    Returns:
+        str ou None: Saída da IA, None em caso de falha ou de prazo esgotado
+    """
+    restante = tempo_restante(prazo) if prazo else None
+    try:
+        stdout, stderr = processo.communicate(timeout=max(restante, 0) if restante is not None else None)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+        processo.communicate()
+        print(f"⏱️ O modo '{mode}' excedeu o orçamento de tempo do hook e foi cancelado.", file=sys.stderr)
+        return None
+
+    if processo.returncode == 0:
+        return stdout.strip()
+
+    error_output = stderr or ""
+    if "429" in error_output and "RESOURCE_EXHAUSTED" in error_output:
+        # Imprime a mensagem amigável e formatada
+        print("""
     ================================================================
     ❌ ERRO: Limite de Uso da API Atingido (Erro 429)
     ================================================================
@@ -60,37 +131,109 @@ def run_codewise_mode(mode, repo_path, branch_name):
         cada 24 horas. Você pode tentar novamente amanhã.
   
             """, file=sys.stderr)
-        else:
-            print(f"❌ FALHA Inesperada no modo '{mode}': O subprocesso falhou com o código de saída {e.returncode}", file=sys.stderr)
-            print("\n--- Saída de Erro (stderr) do Subprocesso ---", file=sys.stderr)
-            print(e.stderr if e.stderr else "Nenhuma saída de erro foi capturada.")
-            print("---------------------------------------------", file=sys.stderr)
-        return None 
+    else:
+        print(f"❌ FALHA Inesperada no modo '{mode}': O subprocesso falhou com o código de saída {processo.returncode}", file=sys.stderr)
+        print("\n--- Saída de Erro (stderr) do Subprocesso ---", file=sys.stderr)
+        print(stderr if stderr else "Nenhuma saída de erro foi capturada.")
+        print("---------------------------------------------", file=sys.stderr)
+    return None
 
-def obter_branch_padrao_remota(repo_path):
+def run_codewise_mode(mode, repo_path, branch_name, base_ref=None, head_ref=None):
+    """Executa a IA como um MÓDULO e captura a saída, resolvendo o ImportError."""
+    return aguardar_codewise_mode(iniciar_codewise_mode(mode, repo_path, branch_name, base_ref, head_ref), mode)
+
+def preparar_modos(modos, repo_path, branch_name, branch_base=None):
     """
-    Obtém o nome da branch padrão do repositório remoto no GitHub.
+    Busca o remoto uma única vez, fixa o intervalo analisado e já inicia os subprocessos da IA,
+    que coletam o diff e montam as crews enquanto o usuário responde ao aviso LGPD.
+    Modos que o post-commit já calculou para exatamente este intervalo não sobem subprocesso.
     
     Args:
+        modos: Modos a preparar (ex: ['titulo', 'descricao', 'analise'])
         repo_path: Caminho para o repositório Git local
+        branch_name: Nome da branch analisada
+        branch_base: Branch de destino do PR, usada como base do diff de uma branch nova (opcional)
         
     Returns:
-        str: Nome da branch padrão (ex: 'main', 'master') ou 'main' como fallback
+        tuple: ({modo: subprocess.Popen}, (base_sha, head_sha), {modo: texto pré-calculado})
+    """
+    base_ref, head_ref = resolver_intervalo(repo_path, branch_name, branch_base=branch_base)
+    intervalo = (resolver_sha(base_ref, repo_path), resolver_sha(head_ref, repo_path))
+    prontos = obter_resultados_precomputados(repo_path, intervalo[0], intervalo[1], modos)
+    processos = {
+        modo: iniciar_codewise_mode(modo, repo_path, branch_name, intervalo[0], intervalo[1], aguardar_liberacao=True)
+        for modo in modos if modo not in prontos
+    }
+    return processos, intervalo, prontos
+
+def preparar_pr(cliente_github, repo_alvo_pr, dono_head, target_selecionado, repo_path, branch_name, modos):
     """
+    Etapa do pre-push que roda em paralelo com o aviso LGPD: consulta o GitHub e prepara os modos da IA.
+    A consulta vem antes para que os subprocessos usem a mesma branch principal do PR como base do diff.
+    
+    Args:
+        cliente_github: Cliente retornado por 'obter_cliente_github'
+        repo_alvo_pr: Repositório alvo do PR ('usuario/repo')
+        dono_head: Dono do repositório de onde vem a branch
+        target_selecionado: Nome do remote alvo
+        repo_path: Caminho para o repositório Git local
+        branch_name: Nome da branch enviada
+        modos: Modos da IA a preparar
+        
+    Returns:
+        tuple: (dados_github, base_branch_target, {modo: subprocess.Popen}, (base_sha, head_sha),
+            {modo: texto pré-calculado}); sem processos se a branch enviada for a principal
+    """
+    #branch padrão e PR aberto (com a descrição atual) chegam em uma única consulta
     try:
-        remote_url_result = subprocess.check_output(["git", "config", "--get", "remote.origin.url"], cwd=repo_path, text=True, encoding='utf-8').strip()
-        match = re.search(r'github\.com/([^/]+/[^/]+?)(\.git)?$', remote_url_result)
-        if not match: return "main"
-        repo_slug = match.group(1)
-        result = subprocess.check_output(
-            ["gh", "repo", "view", repo_slug, "--json", "defaultBranchRef", "-q", ".defaultBranchRef.name"],
-            text=True, encoding='utf-8', stderr=subprocess.DEVNULL
-        ).strip()
-        if not result: return "main"
-        print(f"✅ Branch principal detectada no GitHub: '{result}'", file=sys.stderr)
-        return result
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return "main"
+        dados_github = cliente_github.consultar_repositorio(repo_alvo_pr, dono_head, branch_name)
+    except ErroGitHub as e:
+        print(f"⚠️ Não foi possível consultar o GitHub ({e}). Usando a branch principal em cache.", file=sys.stderr)
+        dados_github = {"branch_padrao": None, "pr": None}
+
+    if dados_github["branch_padrao"]:
+        base_branch_target = dados_github["branch_padrao"]
+        #fica em cache para quando o GitHub não responder nos próximos pushes
+        registrar_branch_padrao(repo_path, target_selecionado, base_branch_target)
+    else:
+        base_branch_target = obter_branch_padrao(repo_path, target_selecionado)
+
+    if branch_name == base_branch_target:
+        return dados_github, base_branch_target, {}, None, {}
+
+    #a base do diff é a mesma branch de destino do PR, também quando o alvo é o 'upstream'
+    processos, intervalo, prontos = preparar_modos(modos, repo_path, branch_name, base_branch_target)
+    return dados_github, base_branch_target, processos, intervalo, prontos
+
+def executar_em_thread(funcao, *args):
+    """
+    Executa 'funcao' numa thread daemon. As threads do ThreadPoolExecutor são aguardadas no fim do
+    interpretador, mesmo após 'shutdown(wait=False)'; esta não segura um sys.exit do hook.
+
+    Returns:
+        Future: Resultado (ou exceção, inclusive SystemExit) de 'funcao'
+    """
+    futuro = Future()
+
+    def alvo():
+        try:
+            futuro.set_result(funcao(*args))
+        except BaseException as e:
+            futuro.set_exception(e)
+
+    threading.Thread(target=alvo, daemon=True).start()
+    return futuro
+
+
+def recusar_processos_preparados(futuro_preparacao):
+    """
+    Responde 'N' aos subprocessos iniciados por 'preparar_pr', que encerram sem enviar dados.
+    """
+    if futuro_preparacao.exception() is not None:
+        return
+    for modo, processo in futuro_preparacao.result()[2].items():
+        liberar_codewise_mode(processo, modo, autorizado=False)
+
 
 def extrair_titulo_valido(texto):
     """
@@ -102,37 +245,26 @@ def extrair_titulo_valido(texto):
     Returns:
         str ou None: Título extraído se encontrado (str), None caso contrário
     """
-    match = re.search(r"(feat|fix|refactor|docs):\s.+", texto, re.IGNORECASE)
+    match = re.search(r"(" + "|".join(TIPOS_CONVENCIONAIS) + r")(\([^)\n]+\))?!?:\s.+", texto, re.IGNORECASE)
     if match: return match.group(0).strip()
     return None
 
-def obter_pr_aberto_para_branch(branch, repo_dir, repo_slug):
+def gerar_textos_locais(repo_path, branch_name, intervalo):
     """
-    Verifica se existe um Pull Request aberto para uma branch específica.
+    Monta título e descrição com o gerador local (sem LLM), a partir do intervalo fixado na preparação.
     
     Args:
-        branch: Nome da branch a verificar
-        repo_dir: Diretório do repositório local
-        repo_slug: Identificador do repositório no formato 'usuario/repo'
+        repo_path: Caminho para o repositório Git local
+        branch_name: Nome da branch enviada
+        intervalo: (base_sha, head_sha) fixado na preparação
         
     Returns:
-        int ou None: Número do PR se encontrado (int), None caso contrário
+        tuple ou None: (titulo, descricao), None se não houver commits novos no intervalo
     """
-    try:
-        comando_list = [
-            "gh", "pr", "list",
-            "--repo", repo_slug,  # Diz ao 'gh' em qual repositório procurar
-            "--head", branch,
-            "--state", "open",
-            "--json", "number"
-        ]
-        
-        result = subprocess.run(comando_list, check=True, capture_output=True, text=True, encoding='utf-8', cwd=repo_dir)
-        
-        pr_list = json.loads(result.stdout)
-        return pr_list[0]['number'] if pr_list else None
-    except (subprocess.CalledProcessError, json.JSONDecodeError):
+    contexto = obter_contexto_git(repo_path, branch_name, intervalo[0], intervalo[1]) if intervalo else None
+    if contexto is None:
         return None
+    return gerar_titulo_local(contexto), gerar_descricao_local(contexto)
 
 def obter_repo_slug(remote_name, repo_path):
     """
@@ -145,17 +277,7 @@ def obter_repo_slug(remote_name, repo_path):
     Returns:
         str ou None: Slug no formato 'usuario/repo' se encontrado (str), None caso contrário
     """
-    try:
-        remote_url = subprocess.check_output(
-            ["git", "config", "--get", f"remote.{remote_name}.url"],
-            cwd=repo_path, text=True, encoding='utf-8'
-        ).strip()
-        match = re.search(r'github\.com[/:]([^/]+/[^/]+?)(\.git)?$', remote_url)
-        if match:
-            return match.group(1)
-        return None
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return None
+    return obter_remotes(repo_path).get(remote_name, {}).get("slug")
 
 def verificar_remote_existe(remote_name, repo_path):
     """
@@ -168,11 +290,7 @@ def verificar_remote_existe(remote_name, repo_path):
     Returns:
         bool: True se o remote existe, False caso contrário
     """
-    try:
-        remotes = subprocess.check_output(["git", "remote"], cwd=repo_path, text=True, encoding='utf-8')
-        return remote_name in remotes.split()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+    return remote_name in obter_remotes(repo_path)
 
 # ===================================================================
 # LÓGICA DO COMANDO 'codewise-lint' (PARA PRE-COMMIT)
@@ -188,11 +306,21 @@ def main_lint():
     except Exception:
         current_branch = ""
 
+    #o diff staged é coletado pelo subprocesso enquanto o usuário responde ao aviso LGPD
+    processo_lint = iniciar_codewise_mode("lint", repo_path, current_branch, aguardar_liberacao=True)
+
     # Chamando função que pergunta ao usuário se ele gostaria de continuar (enviar os dados para provedor ou não)
     lgpd_check_user_choice(repo_path, current_branch)
         
     print("--- 🔍 Executando análise rápida pré-commit do CodeWise ---", file=sys.stderr)
-    sugestoes = run_codewise_mode("lint", repo_path, current_branch)
+    prazo = calcular_prazo("pre-commit")
+    liberar_codewise_mode(processo_lint, "lint", prazo=prazo)
+    sugestoes = aguardar_codewise_mode(processo_lint, "lint", prazo)
+
+    if sugestoes is None and prazo and tempo_restante(prazo) <= 0:
+        #a análise rápida é consultiva: sem resposta a tempo, o commit segue
+        print("--- ⏱️ A análise rápida não terminou a tempo. O commit seguirá sem sugestões. ---", file=sys.stderr)
+        return
 
     if sugestoes is None:
         print("--- ❌ A análise rápida falhou. Verifique os erros acima. ---", file=sys.stderr)
@@ -217,13 +345,15 @@ def main_lint():
 # LÓGICA DO COMANDO 'codewise-pr' (PARA PRE-PUSH)
 # ===================================================================
 
-def run_pr_logic(target_selecionado, pushed_branch):
+def run_pr_logic(target_selecionado, pushed_branch, em_segundo_plano=False):
     """
     Função principal que contém toda a lógica de criação de Pull Request.
     
     Args:
         target_selecionado: Nome do remote alvo ('origin' ou 'upstream')
         pushed_branch: Nome da branch que está sendo enviada
+        em_segundo_plano: Se True, só título e descrição rodam no hook; análise, avaliação
+            e notificação vão para um worker em segundo plano que comenta no PR ao terminar
     """
 
     current_branch = subprocess.check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"], text=True).strip()
@@ -232,137 +362,187 @@ def run_pr_logic(target_selecionado, pushed_branch):
         print(f" ⚠️ Hook de Push ignorado: Você está na branch '{current_branch}', mas o push é para a branch '{pushed_branch}'. Push será feito sem o Hook.", file=sys.stderr)
         sys.exit(0)  # Sai do script com sucesso, sem fazer nada.
 
-    if not shutil.which("gh"):
-        print("❌ Erro: GitHub CLI ('gh') não foi encontrado no seu sistema.", file=sys.stderr)
-        print("   Por favor, instale-a a partir de: https://cli.github.com/", file=sys.stderr)
-        sys.exit(1)
-
     os.environ['PYTHONIOENCODING'] = 'utf-8'
     repo_path = os.getcwd()
 
-    # Chamando função que pergunta ao usuário se ele gostaria de continuar (enviar os dados para provedor ou não)
-    lgpd_check_user_choice(repo_path, current_branch)
-
-    upstream_existe = verificar_remote_existe('upstream', repo_path)
-    upstream_renomeado = False
-
     try:
-        if target_selecionado == 'origin' and upstream_existe:
-            print("Renomeando 'upstream' temporariamente para evitar bug do gh...", file=sys.stderr)
-            subprocess.run(["git", "remote", "rename", "upstream", "upstream_temp"], cwd=repo_path, check=True, capture_output=True)
-            upstream_renomeado = True
-
-        print(f"📍 Analisando o repositório em: {repo_path}", file=sys.stderr)
-        print(f"🎯 Alvo do Pull Request definido para: '{target_selecionado}'", file=sys.stderr)
-
-        if target_selecionado == 'upstream' and not upstream_existe:
-            sys.exit("❌ Erro: O alvo é 'upstream', mas o remote 'upstream' não está configurado.")
-
-        try:
-            current_branch = subprocess.check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"], encoding='utf-8', cwd=repo_path).strip()
-        except Exception as e:
-            sys.exit(f"❌ Erro ao detectar a branch Git: {e}")
-
-        base_branch_target = obter_branch_padrao_remota(repo_path)
-        if current_branch == base_branch_target:
-            sys.exit(f"❌ A automação não pode ser executada na branch principal ('{base_branch_target}').")
-
-        origin_slug = obter_repo_slug('origin', repo_path)
-        if not origin_slug:
-            sys.exit("❌ Falha crítica: Não foi possível determinar o repositório 'origin'.")
-
-        head_branch_completa = f"{origin_slug.split('/')[0]}:{current_branch}"
-        repo_alvo_pr = obter_repo_slug(target_selecionado, repo_path)
-
-        print("\n--- 🤖 Executando IA para documentação do PR ---", file=sys.stderr)
-
-        titulo_bruto = run_codewise_mode("titulo", repo_path, current_branch)
-        titulo_final = ""  # Inicializa a variável
-        if titulo_bruto:
-            titulo_final = extrair_titulo_valido(titulo_bruto) or f"feat: Modificações da branch {current_branch}"
-            print(f" ✅ Título gerado: {titulo_final}", file=sys.stderr)
-
-        descricao = run_codewise_mode("descricao", repo_path, current_branch)
-        if descricao:
-            print("\n ✅ Descrição gerada:", file=sys.stderr)
-            print("-" * 40, file=sys.stderr)
-            print(descricao, file=sys.stderr)
-            print("-" * 40, file=sys.stderr)
+        cliente_github = obter_cliente_github(repo_path)
+    except ErroGitHub as e:
+        print(f"❌ Erro: {e}", file=sys.stderr)
+        print("   Defina GITHUB_TOKEN no .env ou instale a GitHub CLI: https://cli.github.com/", file=sys.stderr)
+        sys.exit(1)
 
-        analise_tecnica = run_codewise_mode("analise", repo_path, current_branch)
+    #o repositório alvo vai explícito em cada operação (API ou '--repo' do gh); nada no '.git/config' é alterado
+    upstream_existe = verificar_remote_existe('upstream', repo_path)
 
-        if not all([titulo_final, descricao, analise_tecnica]):
-            sys.exit("❌ Falha ao gerar um ou mais textos necessários da IA.")
+    print(f"📍 Analisando o repositório em: {repo_path}", file=sys.stderr)
+    print(f"🎯 Alvo do Pull Request definido para: '{target_selecionado}'", file=sys.stderr)
 
-        temp_analise_path = os.path.join(repo_path, ".codewise_analise_temp.txt")
-        with open(temp_analise_path, "w", encoding='utf-8') as f:
-            f.write(analise_tecnica)
+    if target_selecionado == 'upstream' and not upstream_existe:
+        sys.exit("❌ Erro: O alvo é 'upstream', mas o remote 'upstream' não está configurado.")
 
-        pr_numero = obter_pr_aberto_para_branch(current_branch, repo_path, repo_alvo_pr)
+    origin_slug = obter_repo_slug('origin', repo_path)
+    if not origin_slug:
+        sys.exit("❌ Falha crítica: Não foi possível determinar o repositório 'origin'.")
 
-        if pr_numero:
-            print(f"⚠️ PR #{pr_numero} já existente. Acrescentando nova análise...", file=sys.stderr)
-            try:
-                descricao_antiga_raw = subprocess.check_output(
-                    ["gh", "pr", "view", str(pr_numero), "--json", "body", "--repo", repo_alvo_pr],
-                    cwd=repo_path, text=True, encoding='utf-8'
-                )
-                descricao_antiga = json.loads(descricao_antiga_raw).get("body", "")
-                timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-                nova_entrada_descricao = (
-                    f"\n\n---\n\n"
-                    f"**🔄 Atualização em {timestamp}**\n\n"
-                    f"{descricao}"
-                )
-                body_final = descricao_antiga + nova_entrada_descricao
-                subprocess.run(["gh", "pr", "edit", str(pr_numero), "--title", titulo_final, "--body", body_final, "--repo", repo_alvo_pr], check=False, cwd=repo_path)
-                print(f"✅ Descrição do PR #{pr_numero} atualizada com novas informações.")
-            except Exception as e:
-                print(f"⚠️ Não foi possível buscar a descrição antiga. Substituindo pela nova. Erro: {e}", file=sys.stderr)
-                subprocess.run(["gh", "pr", "edit", str(pr_numero), "--title", titulo_final, "--body", descricao, "--repo", repo_alvo_pr], check=False, cwd=repo_path)
+    dono_head = origin_slug.split('/')[0]
+    head_branch_completa = f"{dono_head}:{current_branch}"
+    repo_alvo_pr = obter_repo_slug(target_selecionado, repo_path)
+    if not repo_alvo_pr:
+        sys.exit(f"❌ Falha crítica: Não foi possível determinar o repositório '{target_selecionado}'.")
 
+    #GitHub, fetch, coleta do diff e montagem das crews acontecem enquanto o usuário lê o aviso LGPD;
+    #os subprocessos só chamam o LLM depois do consentimento
+    #com CODEWISE_TEXTOS_PR=local, título e descrição saem do gerador local, sem subprocesso
+    textos_locais = modo_textos_pr() == "local"
+    modos = [] if textos_locais else ["titulo", "descricao"]
+    if not em_segundo_plano:
+        modos.append("analise")
+    futuro_preparacao = executar_em_thread(preparar_pr, cliente_github, repo_alvo_pr, dono_head, target_selecionado, repo_path, current_branch, modos)
 
+    try:
+        # Chamando função que pergunta ao usuário se ele gostaria de continuar (enviar os dados para provedor ou não)
+        lgpd_check_user_choice(repo_path, current_branch)
+    except SystemExit:
+        #recusa (ou falha na verificação): o hook encerra sem esperar GitHub, fetch e subprocessos;
+        #se a preparação ainda não terminou, os subprocessos dela leem o fim da stdin e também encerram
+        futuro_preparacao.add_done_callback(recusar_processos_preparados)
+        raise
+
+    dados_github, base_branch_target, processos, intervalo_fixo, prontos = futuro_preparacao.result()
+
+    if dados_github["branch_padrao"]:
+        print(f"✅ Branch principal detectada no GitHub: '{base_branch_target}'", file=sys.stderr)
+    if current_branch == base_branch_target:
+        sys.exit(f"❌ A automação não pode ser executada na branch principal ('{base_branch_target}').")
+
+    print("\n--- 🤖 Executando IA para documentação do PR ---", file=sys.stderr)
+
+    #orçamento do hook contado a partir do consentimento; a margem final fica para publicar no GitHub
+    prazo = calcular_prazo("pre-push")
+    prazo_ia = prazo - MARGEM_PUBLICACAO if prazo else None
+
+    #as saídas são lidas em paralelo para nenhum subprocesso travar com o pipe cheio
+    pool_ia = ThreadPoolExecutor(max_workers=max(1, len(processos)))
+    futuros_ia = {}
+    for modo, processo in processos.items():
+        liberar_codewise_mode(processo, modo, prazo=prazo_ia)
+        futuros_ia[modo] = pool_ia.submit(aguardar_codewise_mode, processo, modo, prazo_ia)
+    pool_ia.shutdown(wait=False)
+    for modo, texto in prontos.items():
+        #gerado pelo post-commit para o mesmo intervalo base..HEAD, provedor e modelo
+        print(f"\n--- ♻️ [modo: {modo}] reaproveitado do pré-cálculo do post-commit ---")
+        futuros_ia[modo] = Future()
+        futuros_ia[modo].set_result(texto)
+
+    titulo_bruto = futuros_ia["titulo"].result() if "titulo" in futuros_ia else None
+    descricao = futuros_ia["descricao"].result() if "descricao" in futuros_ia else None
+
+    if titulo_bruto == "" and descricao == "":
+        #os subprocessos terminaram sem erro e sem saída: não há commits novos no intervalo
+        print("Nenhum commit novo para documentar no PR.", file=sys.stderr)
+        sys.exit(0)
+
+    #saída do LLM fora do padrão Conventional Commits também cai no gerador local
+    titulo_final = extrair_titulo_valido(titulo_bruto) if titulo_bruto else None
+
+    if not titulo_final or not descricao:
+        if textos_locais:
+            print("⚡ Título e descrição gerados localmente (CODEWISE_TEXTOS_PR=local).", file=sys.stderr)
         else:
-            print("🆕 Nenhum PR aberto. Criando Pull Request...", file=sys.stderr)
-            try:
-                comando_pr = [
-                    "gh", "pr", "create", "--repo", repo_alvo_pr,
-                    "--base", base_branch_target, "--head", head_branch_completa,
-                    "--title", titulo_final, "--body", descricao
-                ]
-                result = subprocess.run(comando_pr, check=True, capture_output=True, text=True, encoding='utf-8', cwd=repo_path)
-                pr_url = result.stdout.strip()
-                match = re.search(r"/pull/(\d+)", pr_url)
-                if match:
-                    pr_numero = match.group(1)
-                else:
-                    raise Exception(f"Não foi possível extrair o número do PR da URL: {pr_url}")
-                print(f"✅ PR #{pr_numero} criado: {pr_url}", file=sys.stderr)
-            except Exception as e:
+            #último degrau: o PR sai com textos montados localmente em vez de não sair
+            print("⚠️ A IA não gerou título e/ou descrição válidos a tempo. Usando textos gerados localmente.", file=sys.stderr)
+        textos = gerar_textos_locais(repo_path, current_branch, intervalo_fixo)
+        if textos is None:
+            print("Nenhum commit novo para documentar no PR.", file=sys.stderr)
+            sys.exit(0)
+        titulo_local, descricao_local = textos
+        titulo_final = titulo_final or titulo_local
+        descricao = descricao or descricao_local
+
+    print(f" ✅ Título gerado: {titulo_final}", file=sys.stderr)
+
+    if descricao:
+        print("\n ✅ Descrição gerada:", file=sys.stderr)
+        print("-" * 40, file=sys.stderr)
+        print(descricao, file=sys.stderr)
+        print("-" * 40, file=sys.stderr)
+
+    analise_tecnica = None
+    if not em_segundo_plano:
+        #em segundo plano o intervalo fixado na preparação vai para o worker
+        analise_tecnica = futuros_ia["analise"].result()
+
+        if not analise_tecnica:
+            #o que ficou pronto é publicado; a análise pode ser refeita com 'codewise-pr'
+            print("⚠️ Análise técnica indisponível (falha ou orçamento de tempo esgotado). O PR será publicado sem o comentário.", file=sys.stderr)
+        elif "analise" in prontos:
+            #o pré-cálculo não notifica; a avaliação só vai ao gestor quando o push a usa
+            notificar_avaliacao_precomputada(repo_path, *intervalo_fixo)
+
+    pr = dados_github["pr"]
+
+    if pr:
+        print(f"⚠️ PR #{pr['numero']} já existente. Atualizando descrição e análise...", file=sys.stderr)
+        #descrição e histórico são substituídos entre marcadores: o body não cresce a cada push
+        body_final = montar_body_pr(pr["body"], descricao, titulo_final, intervalo_fixo[1])
+        #edição e comentário vão juntos; em segundo plano o comentário fica para o worker
+        print(f"💬 Atualizando o PR #{pr['numero']}{' e a análise técnica' if analise_tecnica else ''}...", file=sys.stderr)
+        try:
+            publicar_pr(cliente_github, repo_path, repo_alvo_pr, pr, titulo=titulo_final, body=body_final,
+                        analise=analise_tecnica, head_sha=intervalo_fixo[1],
+                        arquivos_analisados=listar_arquivos_intervalo(repo_path, *intervalo_fixo))
+            print(f"✅ PR #{pr['numero']} atualizado com novas informações.", file=sys.stderr)
+        except ErroGitHub as e:
+            print(f"❌ Falha ao atualizar o PR #{pr['numero']}: {e}", file=sys.stderr)
 
+    else:
+        print("🆕 Nenhum PR aberto. Criando Pull Request...", file=sys.stderr)
+        try:
+            body_novo = montar_body_pr("", descricao, titulo_final, intervalo_fixo[1])
+            pr = cliente_github.criar_pr(repo_alvo_pr, base_branch_target, head_branch_completa, titulo_final, body_novo)
+            print(f"✅ PR #{pr['numero']} criado: {pr['url']}", file=sys.stderr)
+        except ErroGitHub as e:
+            #só a branch ainda inexistente no remote é esperada; token, permissão e limites aparecem como erro
+            branch_nova = erro_branch_head_inexistente(e)
+            if em_segundo_plano:
+                #o worker tenta criar o PR de novo quando o push já tiver chegado ao remote
+                if branch_nova:
+                    print("⚠️ PR ainda não pôde ser criado (branch nova). O worker tentará novamente após o push.", file=sys.stderr)
+                else:
+                    print(f"⚠️ Não foi possível criar o PR: {e}. O worker tentará novamente após o push.", file=sys.stderr)
+                pr = None
+            else:
                 print("\n⚠️ AVISO: Não foi possível criar o Pull Request automaticamente.", file=sys.stderr)
-                print("   Isso é normal no primeiro push para uma nova branch.", file=sys.stderr)
+                print(f"   Erro do GitHub: {e}", file=sys.stderr)
+                if branch_nova:
+                    print("   Isso é normal no primeiro push para uma nova branch.", file=sys.stderr)
                 print("   O seu git push continuará normalmente.", file=sys.stderr)
-                print("   Após o push, rode 'codewise-pr' manualmente para criar o PR para o 'upstream'.", file=sys.stderr)
-                if os.path.exists(temp_analise_path):
-                    os.remove(temp_analise_path)
+                print(f"   Após o push, rode 'codewise-pr-{target_selecionado}' manualmente para criar o PR.", file=sys.stderr)
                 sys.exit(0)
 
-        if pr_numero:
-            print(f"💬 Comentando análise técnica no PR #{pr_numero}...", file=sys.stderr)
+        if pr and analise_tecnica:
+            print(f"💬 Comentando análise técnica no PR #{pr['numero']}...", file=sys.stderr)
             try:
-                subprocess.run(["gh", "pr", "comment", str(pr_numero), "--body-file", temp_analise_path, "--repo", repo_alvo_pr], check=True, capture_output=True, text=True, encoding='utf-8', cwd=repo_path)
-                print("✅ Comentário postado com sucesso.", file=sys.stderr)
-            except subprocess.CalledProcessError as e:
-                print(f"❌ Falha ao comentar no PR: {e.stderr}", file=sys.stderr)
-            finally:
-                if os.path.exists(temp_analise_path):
-                    print("🧹 Limpando arquivo temporário...", file=sys.stderr)
-                    os.remove(temp_analise_path)
-    finally:
-        if upstream_renomeado:
-            print(" Restaurando nome do remote 'upstream'...", file=sys.stderr)
-            subprocess.run(["git", "remote", "rename", "upstream_temp", "upstream"], cwd=repo_path, check=True, capture_output=True)
+                if publicar_pr(cliente_github, repo_path, repo_alvo_pr, pr, analise=analise_tecnica, head_sha=intervalo_fixo[1],
+                               arquivos_analisados=listar_arquivos_intervalo(repo_path, *intervalo_fixo)):
+                    print("✅ Comentário postado com sucesso.", file=sys.stderr)
+            except ErroGitHub as e:
+                print(f"❌ Falha ao comentar no PR: {e}", file=sys.stderr)
+
+    if em_segundo_plano:
+        job_id = enfileirar_analise(repo_path, {
+            "branch": current_branch,
+            "base": intervalo_fixo[0],
+            "head": intervalo_fixo[1],
+            "repo_alvo": repo_alvo_pr,
+            "base_branch": base_branch_target,
+            "head_branch_completa": head_branch_completa,
+            "pr_numero": pr["numero"] if pr else None,
+            "titulo": titulo_final,
+            "descricao": descricao,
+        })
+        print(f"🕒 Análise técnica enfileirada em segundo plano (job {job_id}). Acompanhe com 'codewise-status'.", file=sys.stderr)
 
 
 def main_pr_origin():
@@ -371,6 +551,7 @@ def main_pr_origin():
     """
     parser = argparse.ArgumentParser()
     parser.add_argument("--pushed-branch", required=False, type=str, help="A branch que está sendo enviada.")
+    parser.add_argument("--background", action="store_true", help="Executa análise, avaliação e notificação em segundo plano.")
     args = parser.parse_args()
 
     if args.pushed_branch:
@@ -382,7 +563,7 @@ def main_pr_origin():
         except Exception as e:
             sys.exit(f"❌ Erro ao detectar a branch atual: {e}")
 
-    run_pr_logic(target_selecionado="origin", pushed_branch=pushed_branch)
+    run_pr_logic(target_selecionado="origin", pushed_branch=pushed_branch, em_segundo_plano=args.background)
 
 
 def main_pr_upstream():
@@ -391,6 +572,7 @@ def main_pr_upstream():
     """
     parser = argparse.ArgumentParser()
     parser.add_argument("--pushed-branch", required=False, type=str, help="A branch que está sendo enviada.")
+    parser.add_argument("--background", action="store_true", help="Executa análise, avaliação e notificação em segundo plano.")
     args = parser.parse_args()
 
     if args.pushed_branch:
@@ -402,7 +584,7 @@ def main_pr_upstream():
         except Exception as e:
             sys.exit(f"❌ Erro ao detectar a branch atual: {e}")
 
-    run_pr_logic(target_selecionado="upstream", pushed_branch=pushed_branch)
+    run_pr_logic(target_selecionado="upstream", pushed_branch=pushed_branch, em_segundo_plano=args.background)
 
 
 
@@ -412,11 +594,7 @@ def main_pr_interactive():
     """
     repo_path = os.getcwd()
 
-    try:
-        remotes_output = subprocess.check_output(["git", "remote"], cwd=repo_path, text=True, encoding='utf-8')
-        remotes = remotes_output.strip().splitlines()
-    except subprocess.CalledProcessError:
-        sys.exit("❌ Erro: Não foi possível listar os remotes do Git.")
+    remotes = list(obter_remotes(repo_path))
 
     if not remotes:
         sys.exit("❌ Nenhum remote foi encontrado no repositório.")
@@ -445,6 +623,31 @@ def main_pr_interactive():
     run_pr_logic(target_selecionado=target_selecionado, pushed_branch=current_branch)
 
 
+# ===================================================================
+# LÓGICA DO COMANDO 'codewise-lgpd-refresh'
+# ===================================================================
+
+def main_lgpd_refresh():
+    """
+    Descarta o julgamento LGPD em cache e executa a verificação novamente para o provedor/modelo do .env.
+    """
+    parser = argparse.ArgumentParser(description="Refaz a verificação LGPD do provedor e modelo configurados.")
+    parser.add_argument("--todos", action="store_true", help="Apaga o cache LGPD de todos os provedores e modelos.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    limpar_cache_lgpd(todos=args.todos)
+    print("🧹 Cache LGPD removido. Refazendo a verificação...", file=sys.stderr)
+
+    repo_path = os.getcwd()
+    run_codewise_mode("lgpd_verify", repo_path, "")
+    _, policy_file_path, lgpd_judge_file_path = obter_caminhos_cache_lgpd()
+    if verifica_se_existe_analise_lgpd(policy_file_path, lgpd_judge_file_path):
+        print(f"✅ Julgamento LGPD atualizado em '{lgpd_judge_file_path}'.", file=sys.stderr)
+    else:
+        sys.exit("❌ A verificação LGPD não foi concluída.")
+
 # ===================================================================
 # LÓGICA DO MODO INTERNO LGPD_VERIFY QUE CAPTURA INPUT DO USUÁRIO
 # ===================================================================
@@ -461,13 +664,15 @@ def lgpd_check_user_choice(repo_path:str, branch_atual:str):
     Returns:
         bool: True se o usuário autorizou, encerra o programa caso contrário
     """
-    caminho_dir_lgpd = os.path.join(repo_path, "analises-julgamento-lgpd")
-    lgpd_judge_file_path = os.path.join(caminho_dir_lgpd, "julgamento_lgpd.md")
+    load_dotenv()
+    _, policy_file_path, lgpd_judge_file_path = obter_caminhos_cache_lgpd()
 
-    run_codewise_mode("lgpd_verify", repo_path, branch_atual)    
+    # Consulta o cache do usuário no próprio processo; só sobe o subprocesso da lgpd_crew quando precisa
+    if not verifica_se_existe_analise_lgpd(policy_file_path, lgpd_judge_file_path):
+        run_codewise_mode("lgpd_verify", repo_path, branch_atual)
 
-    if not os.path.exists(caminho_dir_lgpd):
-        sys.exit("Erro: A pasta analises-julgamento-lgpd não existe! Execute novamente para efetuar a verificação LGPD.")
+    if not os.path.exists(lgpd_judge_file_path):
+        sys.exit("Erro: O julgamento LGPD não foi gerado! Execute novamente para efetuar a verificação LGPD.")
     
     try:
         with open(lgpd_judge_file_path, "r", encoding="utf-8") as f:
@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import uuid
+import shutil
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime
+from codewise_lib.cache_usuario import obter_dir_cache_usuario
+
+# ===================================================================
+# LÓGICA DO COMANDO 'codewise-server' (JOBS DE REVISÃO VIA HTTP)
+# ===================================================================
+
+MODOS_PERMITIDOS = ("titulo", "descricao", "analise")
+TAMANHO_MAXIMO_CORPO = 1024 * 1024
+
+STATUS_HTTP = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class ServidorCodewise:
+    """
+    Servidor HTTP assíncrono que recebe jobs de revisão, enfileira com limite e executa
+    cada modo do CodewiseRunner em um subprocesso com timeout.
+    """
+    def __init__(self, dir_resultados: str, workers: int, tamanho_fila: int, timeout_padrao: int, token: str = None):
+        """
+        Inicializa o servidor.
+
+        Args:
+            dir_resultados: Diretório onde os resultados e relatórios de cada job são gravados
+            workers: Quantidade de jobs executados ao mesmo tempo
+            tamanho_fila: Máximo de jobs aguardando na fila (acima disso responde 503)
+            timeout_padrao: Tempo máximo de um job em segundos, quando o job não informa outro
+            token: Token exigido no cabeçalho 'Authorization: Bearer' (opcional)
+        """
+        self.dir_resultados = dir_resultados
+        self.workers = workers
+        self.timeout_padrao = timeout_padrao
+        self.token = token
+        self.fila = asyncio.Queue(maxsize=tamanho_fila)
+        #só os jobs na fila ou em execução ficam em memória; os finalizados são lidos do 'job.json'
+        self.jobs = {}
+        os.makedirs(dir_resultados, exist_ok=True)
+
+    # ---------------------------------------------------------------
+    # jobs
+    # ---------------------------------------------------------------
+
+    def validar_job(self, dados: dict) -> str:
+        """
+        Valida o corpo de um POST /jobs.
+
+        Args:
+            dados: JSON recebido
+
+        Returns:
+            str ou None: Mensagem de erro, None se o job for válido
+        """
+        if not isinstance(dados, dict):
+            return "O corpo deve ser um objeto JSON."
+        if bool(dados.get("repo")) == bool(dados.get("bundle")):
+            return "Informe exatamente um entre 'repo' (caminho de um repositório/mirror local) e 'bundle' (arquivo git bundle)."
+        origem = dados.get("repo") or dados.get("bundle")
+        if not isinstance(origem, str):
+            return "'repo' e 'bundle' devem ser caminhos (texto)."
+        if not os.path.exists(origem):
+            return f"Caminho não encontrado: {origem}"
+        if not isinstance(dados.get("base"), str) or not isinstance(dados.get("head"), str) or not dados["base"] or not dados["head"]:
+            return "Informe 'base' e 'head' (SHAs ou referências do intervalo a revisar)."
+        if dados.get("branch") is not None and not isinstance(dados["branch"], str):
+            return "'branch' deve ser texto."
+        modos = dados.get("modos", ["analise"])
+        if not isinstance(modos, list) or not modos or any(not isinstance(m, str) or m not in MODOS_PERMITIDOS for m in modos):
+            return f"'modos' deve ser uma lista com os modos válidos: {', '.join(MODOS_PERMITIDOS)}."
+        timeout = dados.get("timeout_s", self.timeout_padrao)
+        #bool é subclasse de int no Python; 'true' não é um timeout
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            return "'timeout_s' deve ser um número de segundos maior que zero."
+        return None
+
+    def carregar_job(self, job_id: str) -> dict:
+        """
+        Lê um job gravado em disco, para consultas de jobs de execuções anteriores do servidor.
+
+        Args:
+            job_id: Identificador do job
+
+        Returns:
+            dict ou None: Dados do job, None se não existir
+        """
+        #o id vira nome de diretório; só hexadecimal, como os gerados por 'uuid4().hex'
+        if not job_id or any(c not in "0123456789abcdef" for c in job_id):
+            return None
+        try:
+            with open(os.path.join(self.dir_resultados, job_id, "job.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def salvar_job(self, job: dict) -> None:
+        dir_job = os.path.join(self.dir_resultados, job["id"])
+        os.makedirs(dir_job, exist_ok=True)
+        with open(os.path.join(dir_job, "job.json"), "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, indent=2)
+
+    async def preparar_workspace(self, job: dict, workspace: str) -> None:
+        """
+        Cria um clone local descartável do repositório (ou bundle) para o job, sem tocar na origem.
+        Cada job tem seu próprio diretório de relatórios, então jobs do mesmo repositório não colidem.
+
+        Args:
+            job: Dados do job
+            workspace: Diretório temporário do job
+        """
+        if job.get("bundle"):
+            comando = ["git", "clone", "--quiet", "--no-checkout", job["bundle"], workspace]
+        else:
+            comando = ["git", "clone", "--quiet", "--shared", "--no-checkout", job["repo"], workspace]
+        processo = await asyncio.create_subprocess_exec(*comando, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        _, erro = await processo.communicate()
+        if processo.returncode != 0:
+            raise RuntimeError(f"Falha ao preparar o repositório: {erro.decode('utf-8', errors='ignore').strip()}")
+
+    async def executar_modo(self, job: dict, workspace: str, modo: str, prazo: float) -> str:
+        """
+        Executa um modo do CodeWise em subprocesso, matando o processo se o prazo do job acabar.
+
+        Args:
+            job: Dados do job
+            workspace: Clone do repositório usado pelo job
+            modo: Modo de operação ('titulo', 'descricao', 'analise')
+            prazo: Instante (loop.time()) em que o job estoura o timeout
+
+        Returns:
+            str: Saída do modo
+        """
+        comando = [
+            sys.executable, "-m", "codewise_lib.main",
+            "--repo", workspace, "--branch", job.get("branch") or "HEAD", "--mode", modo,
+            "--base", job["base"], "--head", job["head"],
+            #o workspace é um clone temporário; o histórico registra o repositório (ou bundle) de origem
+            "--repo-historico", os.path.abspath(job.get("bundle") or job["repo"]),
+        ]
+        if not job.get("notificar", False):
+            comando.append("--sem-notificacao")
+
+        env = os.environ.copy()
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = f"{project_root}{os.pathsep}{env.get('PYTHONPATH', '')}"
+        env['PYTHONIOENCODING'] = 'utf-8'
+
+        processo = await asyncio.create_subprocess_exec(
+            *comando, cwd=workspace, env=env,
+            stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        restante = prazo - asyncio.get_running_loop().time()
+        try:
+            saida, erro = await asyncio.wait_for(processo.communicate(), timeout=max(restante, 0.1))
+        except asyncio.TimeoutError:
+            processo.kill()
+            await processo.wait()
+            raise
+        if processo.returncode != 0:
+            raise RuntimeError(erro.decode("utf-8", errors="ignore").strip()[-2000:] or f"Modo '{modo}' falhou com código {processo.returncode}.")
+        return saida.decode("utf-8", errors="ignore").strip()
+
+    async def processar_job(self, job: dict) -> None:
+        """
+        Executa todos os modos pedidos por um job e grava o resultado e os relatórios markdown.
+
+        Args:
+            job: Dados do job
+        """
+        job.update({"status": "executando", "iniciado_em": datetime.now().isoformat(timespec="seconds")})
+        self.salvar_job(job)
+        prazo = asyncio.get_running_loop().time() + job["timeout_s"]
+        workspace = tempfile.mkdtemp(prefix=f"codewise-job-{job['id'][:8]}-")
+        try:
+            await self.preparar_workspace(job, workspace)
+            for modo in job["modos"]:
+                job["resultados"][modo] = await self.executar_modo(job, workspace, modo, prazo)
+
+            dir_relatorios = os.path.join(workspace, "analises-concluidas")
+            if os.path.isdir(dir_relatorios):
+                destino = os.path.join(self.dir_resultados, job["id"], "analises-concluidas")
+                shutil.copytree(dir_relatorios, destino, dirs_exist_ok=True)
+                for nome in sorted(os.listdir(destino)):
+                    with open(os.path.join(destino, nome), "r", encoding="utf-8", errors="ignore") as f:
+                        job["relatorios"][nome] = f.read()
+            job["status"] = "concluido"
+        except asyncio.TimeoutError:
+            job.update({"status": "timeout", "erro": f"O job excedeu o limite de {job['timeout_s']}s."})
+        except Exception as e:
+            job.update({"status": "falhou", "erro": str(e)})
+        finally:
+            job["finalizado_em"] = datetime.now().isoformat(timespec="seconds")
+            self.salvar_job(job)
+            #gravado antes de sair da memória: um GET /jobs/<id> passa a ler o arquivo
+            self.jobs.pop(job["id"], None)
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    async def worker(self) -> None:
+        while True:
+            job = await self.fila.get()
+            try:
+                await self.processar_job(job)
+            finally:
+                self.fila.task_done()
+
+    # ---------------------------------------------------------------
+    # HTTP
+    # ---------------------------------------------------------------
+
+    async def responder(self, writer, status: int, corpo: dict) -> None:
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        cabecalho = (
+            f"HTTP/1.1 {status} {STATUS_HTTP.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(dados)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(cabecalho.encode("latin-1") + dados)
+        await writer.drain()
+
+    async def tratar_requisicao(self, metodo: str, caminho: str, cabecalhos: dict, corpo: bytes) -> tuple:
+        """
+        Roteia uma requisição HTTP.
+
+        Returns:
+            tuple: (status HTTP, corpo JSON)
+        """
+        if self.token and cabecalhos.get("authorization") != f"Bearer {self.token}":
+            return 401, {"erro": "Token inválido."}
+
+        if metodo == "GET" and caminho == "/health":
+            return 200, {"status": "ok", "na_fila": self.fila.qsize(), "workers": self.workers}
+
+        if metodo == "POST" and caminho == "/jobs":
+            try:
+                dados = json.loads(corpo.decode("utf-8") or "{}")
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return 400, {"erro": "JSON inválido."}
+            erro = self.validar_job(dados)
+            if erro:
+                return 400, {"erro": erro}
+
+            job = {
+                "id": uuid.uuid4().hex, "status": "na_fila",
+                "repo": dados.get("repo"), "bundle": dados.get("bundle"), "branch": dados.get("branch"),
+                "base": dados["base"], "head": dados["head"], "modos": dados.get("modos", ["analise"]),
+                "notificar": bool(dados.get("notificar", False)),
+                "timeout_s": dados.get("timeout_s", self.timeout_padrao),
+                "criado_em": datetime.now().isoformat(timespec="seconds"),
+                "resultados": {}, "relatorios": {}, "erro": None,
+            }
+            try:
+                self.fila.put_nowait(job)
+            except asyncio.QueueFull:
+                return 503, {"erro": "Fila cheia. Tente novamente mais tarde."}
+            self.jobs[job["id"]] = job
+            self.salvar_job(job)
+            return 202, {"id": job["id"], "status": job["status"], "url": f"/jobs/{job['id']}"}
+
+        if metodo == "GET" and caminho.startswith("/jobs/"):
+            job_id = caminho[len("/jobs/"):]
+            job = self.jobs.get(job_id) or self.carregar_job(job_id)
+            if job is None:
+                return 404, {"erro": "Job não encontrado."}
+            return 200, job
+
+        return 404, {"erro": "Rota não encontrada."}
+
+    async def atender_conexao(self, reader, writer) -> None:
+        try:
+            linha = (await reader.readline()).decode("latin-1").strip()
+            partes = linha.split()
+            if len(partes) != 3:
+                await self.responder(writer, 400, {"erro": "Requisição inválida."})
+                return
+            metodo, caminho, _ = partes
+
+            cabecalhos = {}
+            while True:
+                linha_cabecalho = (await reader.readline()).decode("latin-1").strip()
+                if not linha_cabecalho:
+                    break
+                nome, _, valor = linha_cabecalho.partition(":")
+                cabecalhos[nome.strip().lower()] = valor.strip()
+
+            tamanho = int(cabecalhos.get("content-length", "0") or 0)
+            if tamanho > TAMANHO_MAXIMO_CORPO:
+                await self.responder(writer, 413, {"erro": "Corpo da requisição muito grande."})
+                return
+            corpo = await reader.readexactly(tamanho) if tamanho else b""
+
+            status, resposta = await self.tratar_requisicao(metodo, caminho.split("?", 1)[0], cabecalhos, corpo)
+            await self.responder(writer, status, resposta)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def iniciar(self, host: str, porta: int) -> None:
+        servidor = await asyncio.start_server(self.atender_conexao, host, porta)
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        print(f"🚀 CodeWise server ouvindo em http://{host}:{porta} ({self.workers} worker(s), fila de {self.fila.maxsize}).", file=sys.stderr)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            for w in workers:
+                w.cancel()
+
+
+def main():
+    """
+    Ponto de entrada do 'codewise-server'.
+    """
+    parser = argparse.ArgumentParser(description="Servidor HTTP local de jobs de revisão do CodeWise.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1).")
+    parser.add_argument("--porta", type=int, default=8765, help="Porta de escuta (padrão: 8765).")
+    parser.add_argument("--workers", type=int, default=2, help="Jobs executados em paralelo.")
+    parser.add_argument("--fila", type=int, default=50, help="Máximo de jobs aguardando na fila.")
+    parser.add_argument("--timeout", type=int, default=900, help="Timeout padrão por job, em segundos.")
+    parser.add_argument("--dir-resultados", type=str, default=None, help="Onde gravar resultados e relatórios (padrão: ~/.cache/codewise/server).")
+    parser.add_argument("--autorizar-envio", action="store_true", help="Confirma o envio do código dos jobs ao provedor de IA (execução sem prompt LGPD).")
+    args = parser.parse_args()
+
+    if not args.autorizar_envio:
+        sys.exit("❌ O servidor não exibe o aviso LGPD. Use --autorizar-envio para confirmar o envio do código dos jobs ao provedor.")
+    if args.timeout <= 0:
+        sys.exit("❌ --timeout deve ser maior que zero.")
+
+    servidor = ServidorCodewise(args.dir_resultados or obter_dir_cache_usuario("server"), max(1, args.workers), max(1, args.fila), args.timeout, os.getenv("CODEWISE_SERVER_TOKEN"))
+    try:
+        asyncio.run(servidor.iniciar(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,27 @@ Ferramenta para análise de código, documentação automática e geração de P
   codewise-lint
     → Analisa os arquivos staged antes do commit (modo leve, sem IA de PR).
 
+  codewise-init --push --background
+    → O pre-push gera só título e descrição; análise técnica, avaliação e notificação rodam em segundo plano.
+
+  codewise-init --precompute
+    → Instala o post-commit que adianta título, descrição e análise em segundo plano; o push reaproveita o resultado.
+
+  codewise-lgpd-refresh
+    → Descarta o julgamento LGPD em cache (~/.cache/codewise/lgpd) e refaz a verificação do provedor/modelo do .env.
+
+  codewise-status
+    → Lista as análises em segundo plano do repositório. Use --log <job> para ver o log de um job.
+
+  codewise-batch repos.txt --autorizar-envio
+    → Revisa vários repositórios em paralelo (uma linha por repo: 'caminho branch [base..head]') e grava notas em JSONL.
+
+  codewise-server --porta 8765 --workers 2 --autorizar-envio
+    → Sobe um servidor HTTP local que recebe jobs de revisão (POST /jobs) e responde o status em GET /jobs/<id>.
+
+  codewise-history [devs|repos|criterios|ultimas]
+    → Consulta o histórico local de execuções: média de notas por dev ou repositório (padrão: mês atual), por critério ou as últimas execuções.
+
 💡 Dica:
 
 - Rode codewise-pr após fazer commits e **antes do push**, para evitar erros silenciosos (ex: falta do `.env`, falha no gh, conflito de branch).
@@ -14,12 +14,48 @@ exit 0
 
 PRE_COMMIT_CONTENT = """#!/bin/sh
 set -e
+# Nada no stage: não há o que analisar e o Python nem é iniciado
+if git diff --cached --quiet; then
+    if ! git diff --quiet; then
+        echo "AVISO: Nenhuma mudança na 'staging area', mas existem modificações não adicionadas."
+        echo "Use 'git add <arquivo>' para prepará-las para a análise."
+    fi
+    exit 0
+fi
 echo "--- [HOOK PRE-COMMIT CodeWise ATIVADO] ---"
 codewise-lint
 echo "--- [HOOK PRE-COMMIT CodeWise CONCLUÍDO] ---"
 exit 0
 """
 
+POST_COMMIT_CONTENT = """#!/bin/sh
+# Agenda o pré-cálculo do CodeWise em segundo plano; nunca atrasa nem falha o commit
+# HEAD destacado (rebase, bisect) ou branch principal: nada a pré-calcular
+branch_atual=$(git symbolic-ref --quiet --short HEAD || true)
+branch_principal=$(git symbolic-ref --quiet --short refs/remotes/origin/HEAD 2>/dev/null || true)
+if [ -z "$branch_atual" ] || [ "$branch_atual" = "${branch_principal#origin/}" ]; then
+    exit 0
+fi
+codewise-precomputar || true
+exit 0
+"""
+
+def confirmar_precomputo():
+    """
+    Pede o consentimento explícito para o pré-cálculo: o post-commit envia o diff ao provedor
+    sem a pergunta do pre-push (desde que o julgamento LGPD em cache esteja aprovado).
+
+    Returns:
+        bool: True se o usuário confirmou
+    """
+    print("\n⚠️ AVISO: Com o pré-cálculo ativo, cada commit envia o diff da branch para o provedor da API key")
+    print("   configurada em segundo plano, sem a confirmação feita no pre-push. O envio só acontece enquanto")
+    print("   o julgamento LGPD em cache do provedor/modelo estiver válido e aprovado.")
+    try:
+        return input("Ativar o pré-cálculo no post-commit? [S/N]: ").strip().upper() == "S"
+    except (KeyboardInterrupt, EOFError):
+        return False
+
 def verificar_remote_existe(remote_name):
     """
     Verifica se um remote Git com o nome especificado existe no repositório atual.
@@ -75,18 +111,26 @@ def main():
     parser.add_argument('--commit', action='store_true', help='Instala o hook pre-commit.')
     parser.add_argument('--push', action='store_true', help='Instala o hook pre-push.')
     parser.add_argument('--all', action='store_true', help='Instala ambos os hooks.')
+    parser.add_argument('--background', action='store_true', help='No pre-push, gera só título/descrição e roda a análise em segundo plano.')
+    parser.add_argument('--precompute', action='store_true', help='Instala o hook post-commit que adianta título, descrição e análise em segundo plano.')
     args = parser.parse_args()
 
     print("🚀 Iniciando configuração de hooks do CodeWise...")
     repo_root = os.getcwd()
 
-    if not any([args.commit, args.push, args.all]):
-        print("Nenhum hook especificado. Use --commit, --push, ou --all.", file=sys.stderr)
+    if not any([args.commit, args.push, args.all, args.precompute]):
+        print("Nenhum hook especificado. Use --commit, --push, --precompute ou --all.", file=sys.stderr)
         sys.exit(1)
 
     if args.commit or args.all:
         install_hook('pre-commit', PRE_COMMIT_CONTENT, repo_root)
 
+    if args.precompute:
+        if confirmar_precomputo():
+            install_hook('post-commit', POST_COMMIT_CONTENT, repo_root)
+        else:
+            print("Hook post-commit não instalado.")
+
     if args.push or args.all:
         try:
             remotes_raw = subprocess.check_output(["git", "remote"], cwd=repo_root, text=True, encoding='utf-8')
@@ -112,6 +156,8 @@ def main():
                         push_command = "codewise-pr-upstream"
                     else:
                         push_command = f"codewise-pr --target {remote_escolhido}"
+                    if args.background:
+                        push_command += " --background"
                     break
                 else:
                     print("Opção inválida. Digite um número válido.")
@@ -122,14 +168,46 @@ def main():
         pre_push_content_dinamico = f"""#!/bin/sh
 set -e
 
+# Filtra em sh os refs que o CodeWise ignoraria, sem iniciar o Python: tags, remoções de branch,
+# pushes sem commits novos, a branch principal e branches diferentes da atual
+branch_atual=$(git symbolic-ref --quiet --short HEAD || true)
+branch_principal=$(git symbolic-ref --quiet --short refs/remotes/{remote_escolhido}/HEAD 2>/dev/null || true)
+branch_principal=${{branch_principal#{remote_escolhido}/}}
+pushed_branch=""
+
 while read local_ref local_sha remote_ref remote_sha
 do
-    pushed_branch=$(basename "$local_ref")
-    echo "--- [HOOK PRE-PUSH CodeWise ATIVADO (Alvo: {remote_escolhido})] ---"
-    {push_command} --pushed-branch "$pushed_branch"
-    echo "--- [HOOK PRE-PUSH CodeWise CONCLUÍDO] ---"
+    case "$local_ref" in
+        refs/heads/*) ;;
+        *) continue ;;
+    esac
+    case "$local_sha" in
+        *[!0]*) ;;
+        *) continue ;;
+    esac
+    if [ "$local_sha" = "$remote_sha" ]; then
+        continue
+    fi
+    branch=${{local_ref#refs/heads/}}
+    if [ "$branch" = "$branch_principal" ]; then
+        continue
+    fi
+    if [ "$branch" != "$branch_atual" ]; then
+        echo " ⚠️ Hook de Push ignorado para '$branch': você está na branch '$branch_atual'." >&2
+        continue
+    fi
+    pushed_branch="$branch"
 done
 
+# Uma única execução depois de ler todos os refs
+if [ -z "$pushed_branch" ]; then
+    exit 0
+fi
+
+echo "--- [HOOK PRE-PUSH CodeWise ATIVADO (Alvo: {remote_escolhido})] ---"
+{push_command} --pushed-branch "$pushed_branch"
+echo "--- [HOOK PRE-PUSH CodeWise CONCLUÍDO] ---"
+
 exit 0
 """
         install_hook('pre-push', pre_push_content_dinamico, repo_root)
@@ -27,6 +27,12 @@ setup(
             'codewise-pr-origin=scripts.codewise_review_win:main_pr_origin',   
             'codewise-pr-upstream=scripts.codewise_review_win:main_pr_upstream', 
             'codewise-lint=scripts.codewise_review_win:main_lint',
+            'codewise-status=scripts.codewise_background:main_status',
+            'codewise-precomputar=scripts.codewise_precomputo:main_precomputar',
+            'codewise-lgpd-refresh=scripts.codewise_review_win:main_lgpd_refresh',
+            'codewise-batch=scripts.codewise_batch:main',
+            'codewise-server=scripts.codewise_server:main',
+            'codewise-history=scripts.codewise_history:main',
             'codewise-init=scripts.install_hook:main',
             'codewise-help=scripts.help:main',
         ],